@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+紧凑的文章记录类型
+各爬虫共用，替代每篇文章一个字典：
+- 字段存放在 __slots__ 中，没有每条记录的哈希表开销
+- 字段顺序（记录的"形状"）按元组共享，同一爬虫产生的记录共用一个元组
+- journal / source / data_source 等重复值多的字符串使用 sys.intern 共享
+支持字典接口（get、[]、keys、items ...），可与原有的字典 / CSV 行无损互转，
+save_results、generate_report 和去重索引无需修改
+"""
+
+import sys
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, Tuple
+
+# 各爬虫用到的全部字段
+FIELDS = (
+    'pmid', 'doi', 'title', 'authors', 'journal', 'pub_date', 'source',
+    'link', 'url', 'abstract', 'mesh_terms', 'summary', 'snippet', 'data_source',
+    'issn', 'published_date', 'citation_count',
+)
+
+# 取值重复率高、需要驻留的字段
+INTERNED_FIELDS = frozenset({'journal', 'source', 'data_source'})
+
+_FIELD_SET = frozenset(FIELDS)
+
+# 共享的字段顺序元组
+_SHAPES: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def _shape(keys: Tuple[str, ...]) -> Tuple[str, ...]:
+    return _SHAPES.setdefault(keys, keys)
+
+
+class Article(MutableMapping):
+    """
+    文章记录
+    Article(title=..., journal=...) 按关键字参数的顺序记录字段，
+    to_dict() 按相同顺序还原为字典；FIELDS 以外的字段存放在额外字典中
+    """
+
+    __slots__ = FIELDS + ('_keys', '_extra')
+
+    def __init__(self, **fields):
+        self._keys: Tuple[str, ...] = ()
+        self._extra = None
+        for key, value in fields.items():
+            self[key] = value
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Article':
+        article = cls()
+        article.update(data)
+        return article
+
+    def to_dict(self) -> Dict:
+        return {key: self[key] for key in self._keys}
+
+    def __getitem__(self, key: str):
+        if key not in self._keys:
+            raise KeyError(key)
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        return self._extra[key]
+
+    def get(self, key: str, default=None):
+        if key not in self._keys:
+            return default
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value):
+        if key in INTERNED_FIELDS and type(value) is str:
+            value = sys.intern(value)
+        if key in _FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+        if key not in self._keys:
+            self._keys = _shape(self._keys + (key,))
+
+    def __delitem__(self, key: str):
+        if key not in self._keys:
+            raise KeyError(key)
+        if key in _FIELD_SET:
+            delattr(self, key)
+        else:
+            del self._extra[key]
+        self._keys = _shape(tuple(k for k in self._keys if k != key))
+
+    def __contains__(self, key) -> bool:
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return f'Article({self.to_dict()!r})'
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state: Dict):
+        self._keys = ()
+        self._extra = None
+        self.update(state)
+
+
+def to_json(obj):
+    """
+    json.dump 的 default 参数：将 Article 转换为字典
+    """
+    if isinstance(obj, Article):
+        return obj.to_dict()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+离线基准测试
+启动本地模拟服务（mock_services.py），对各爬虫路径分别统计
+记录数、耗时、记录/秒、请求数和峰值内存，可保存为JSON并与基线比较（用于CI）
+
+使用方法:
+  python benchmark.py
+  python benchmark.py --records 5000 --latency 0.02 --error-rate 0.05 --burst-every 50 --burst-length 3
+  python benchmark.py --scenarios journal.concurrent subscription.rss --feeds 300
+  python benchmark.py --save baseline.json
+  python benchmark.py --compare baseline.json --tolerance 0.25
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from combined_scraper import ScholarPubMedScraper
+from http_transport import HttpTransport
+from journalScraper import JournalScraper
+from mock_services import MockConfig, MockServices
+from rate_limiter import HostRateLimiter
+from subscription_scraper import SubscriptionScraper
+
+
+class BenchmarkContext:
+    """
+    为每个场景创建指向模拟服务的爬虫，使用独立的传输层和限速器
+    """
+
+    def __init__(self, services: MockServices, rate: float, backoff: float, feeds: int, output_dir: str):
+        self.services = services
+        self.rate = rate
+        self.backoff = backoff
+        self.feeds = feeds
+        self.output_dir = output_dir
+
+    def transport(self) -> HttpTransport:
+        limiter = HostRateLimiter(rates={self.services.host: self.rate}, default_rate=self.rate)
+        return HttpTransport(backoff_base=self.backoff, backoff_max=max(self.backoff * 8, 1.0),
+                             rate_limiter=limiter, cache=None)
+
+    def _attach(self, scraper):
+        scraper.transport = self.transport()
+        scraper.rate_limiter = scraper.transport.rate_limiter
+        scraper.OUTPUT_DIR = self.output_dir
+        scraper.PUBMED_BASE_URL = self.services.eutils_url
+        scraper.CROSSREF_WORKS_URL = self.services.crossref_url
+        return scraper
+
+    def journal_scraper(self) -> JournalScraper:
+        return self._attach(JournalScraper())
+
+    def combined_scraper(self) -> ScholarPubMedScraper:
+        scraper = self._attach(ScholarPubMedScraper())
+        scraper.SERPAPI_URL = self.services.serpapi_url
+        return scraper
+
+    def subscription_scraper(self) -> SubscriptionScraper:
+        scraper = self._attach(SubscriptionScraper())
+        feeds = self.services.rss_feeds(self.feeds)
+        half = len(feeds) // 2
+        names = list(feeds)
+        scraper.NATURE_FEEDS = {name: feeds[name] for name in names[:half]}
+        scraper.SCIENCE_FEEDS = {name: feeds[name] for name in names[half:]}
+        return scraper
+
+
+def _journal_serial(ctx: BenchmarkContext):
+    scraper = ctx.journal_scraper()
+    scraper.scrape_all(concurrent=False)
+    return scraper.results, scraper.errors
+
+
+def _journal_concurrent(ctx: BenchmarkContext):
+    scraper = ctx.journal_scraper()
+    scraper.scrape_all(concurrent=True)
+    return scraper.results, scraper.errors
+
+
+def _combined_pubmed(ctx: BenchmarkContext):
+    scraper = ctx.combined_scraper()
+    results = scraper.search_pubmed(use_history=True)
+    return results, scraper.errors
+
+
+def _combined_scholar(ctx: BenchmarkContext):
+    scraper = ctx.combined_scraper()
+    results = scraper.search_google_scholar_serpapi(api_key='mock')
+    return results, scraper.errors
+
+
+def _subscription_rss(ctx: BenchmarkContext):
+    scraper = ctx.subscription_scraper()
+    results = scraper.scrape_feeds([
+        (scraper.NATURE_FEEDS, 'prism_doi', scraper.NATURE_KEYWORDS),
+        (scraper.SCIENCE_FEEDS, 'dc_identifier', scraper.SCIENCE_KEYWORDS),
+    ])
+    return results, scraper.errors
+
+
+def _subscription_all(ctx: BenchmarkContext):
+    scraper = ctx.subscription_scraper()
+    scraper.scrape_all_simple()
+    return scraper.results, scraper.errors
+
+
+SCENARIOS: Dict[str, Callable[[BenchmarkContext], tuple]] = {
+    'journal.serial': _journal_serial,
+    'journal.concurrent': _journal_concurrent,
+    'combined.pubmed_history': _combined_pubmed,
+    'combined.scholar': _combined_scholar,
+    'subscription.rss': _subscription_rss,
+    'subscription.all': _subscription_all,
+}
+
+
+def run_scenario(name: str, ctx: BenchmarkContext, track_memory: bool = True, verbose: bool = False) -> Dict:
+    """
+    运行单个场景，返回统计结果
+    吞吐在不开启 tracemalloc 的一次运行中测量；峰值内存另跑一次统计
+    （tracemalloc 的Python堆分配，不含进程池子进程）
+    """
+    ctx.services.reset_stats()
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    start = time.perf_counter()
+    with output:
+        records, errors = SCENARIOS[name](ctx)
+    elapsed = time.perf_counter() - start
+    stats = dict(ctx.services.stats)
+
+    peak = 0
+    if track_memory:
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            SCENARIOS[name](ctx)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        'scenario': name,
+        'records': len(records),
+        'wall_seconds': round(elapsed, 4),
+        'records_per_sec': round(len(records) / elapsed, 1) if elapsed > 0 else 0.0,
+        'requests': stats.get('requests', 0),
+        'faults': sum(v for k, v in stats.items() if k.startswith('status_')),
+        'errors': errors,
+        'peak_memory_mb': round(peak / 1024 / 1024, 2),
+    }
+
+
+def print_table(results: List[Dict]):
+    header = f"{'场景':<26}{'记录数':>8}{'耗时(s)':>10}{'记录/秒':>12}{'请求数':>8}{'注入错误':>9}{'失败':>6}{'峰值内存(MB)':>14}"
+    print("\n" + "=" * 93)
+    print(header)
+    print("-" * 93)
+    for r in results:
+        print(f"{r['scenario']:<26}{r['records']:>8}{r['wall_seconds']:>10.3f}{r['records_per_sec']:>12.1f}"
+              f"{r['requests']:>8}{r['faults']:>9}{r['errors']:>6}{r['peak_memory_mb']:>14.2f}")
+    print("=" * 93)
+
+
+def compare(results: List[Dict], baseline_path: str, tolerance: float) -> List[str]:
+    """
+    与基线比较：记录数变化或记录/秒下降超过 tolerance 视为回退
+    """
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {r['scenario']: r for r in json.load(f)['results']}
+    regressions = []
+    for r in results:
+        base = baseline.get(r['scenario'])
+        if base is None:
+            continue
+        if r['records'] != base['records']:
+            regressions.append(f"{r['scenario']}: 记录数 {base['records']} → {r['records']}")
+        if r['records_per_sec'] < base['records_per_sec'] * (1 - tolerance):
+            regressions.append(f"{r['scenario']}: 记录/秒 {base['records_per_sec']} → {r['records_per_sec']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='爬虫离线基准测试')
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--records', type=int, default=500, help='每个检索返回的结果数')
+    parser.add_argument('--feeds', type=int, default=50, help='RSS源数量')
+    parser.add_argument('--rss-items', type=int, default=50, help='每个RSS源的条目数')
+    parser.add_argument('--latency', type=float, default=0.0, help='每个请求的固定延迟（秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='每个请求的随机附加延迟上限（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回503的概率')
+    parser.add_argument('--burst-every', type=int, default=0, help='每隔多少个请求出现一次429突发')
+    parser.add_argument('--burst-length', type=int, default=0, help='每次429突发的请求数')
+    parser.add_argument('--retry-after', type=int, default=None, help='429响应的Retry-After秒数')
+    parser.add_argument('--rate', type=float, default=1000.0, help='对模拟服务的请求速率上限（次/秒）')
+    parser.add_argument('--backoff', type=float, default=0.05, help='重试退避基数（秒）')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--no-memory', action='store_true', help='不统计峰值内存（省去额外的一次运行）')
+    parser.add_argument('--verbose', action='store_true', help='显示爬虫输出')
+    parser.add_argument('--save', help='把结果保存为JSON')
+    parser.add_argument('--compare', help='与基线JSON比较，出现回退时以非零状态退出')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='允许的记录/秒下降比例')
+    args = parser.parse_args()
+
+    # 基准测试不读写本地缓存、检索索引和检查点（只在命令行运行时设置，导入本模块不影响其他代码）
+    os.environ['AICRAWLER_NO_CACHE'] = '1'
+    os.environ['AICRAWLER_NO_INDEX'] = '1'
+    os.environ['AICRAWLER_NO_CHECKPOINT'] = '1'
+
+    # 模拟服务在本进程的线程中运行，fork 出的解析子进程可能继承被占用的锁（开启 tracemalloc 时尤甚）
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        multiprocessing.set_start_method('forkserver', force=True)
+
+    config = MockConfig(records=args.records, latency=args.latency, jitter=args.jitter,
+                        error_rate=args.error_rate, burst_every=args.burst_every,
+                        burst_length=args.burst_length, retry_after=args.retry_after,
+                        rss_items=args.rss_items, seed=args.seed)
+
+    results = []
+    with MockServices(config) as services, tempfile.TemporaryDirectory(prefix='aicrawler_bench_') as output_dir:
+        ctx = BenchmarkContext(services, args.rate, args.backoff, args.feeds, output_dir)
+        print(f"模拟服务: {services.base_url}  结果集: {args.records}  RSS源: {args.feeds}")
+        for name in args.scenarios:
+            print(f"  运行 {name}...")
+            results.append(run_scenario(name, ctx, not args.no_memory, args.verbose))
+
+    print_table(results)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'config': vars(config), 'results': results}, f, ensure_ascii=False, indent=2)
+        print(f"✓ 结果已保存: {args.save}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        if regressions:
+            print("\n✗ 性能回退:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print("\n✓ 与基线相比无回退")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+断点续爬检查点
+一次爬取由若干工作单元组成（一个检索式、一个期刊的游标分页……），
+每完成一批就在同一个事务中写入该批记录和单元进度（批次偏移、Crossref游标、WebEnv 等）。
+中途失败后重新运行，已完成的单元直接读取保存的记录，未完成的单元从最后进度继续，
+全部单元成功后清除该次爬取的检查点
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from article import Article, to_json
+
+DEFAULT_CHECKPOINT_PATH = '/mnt/user-data/outputs/checkpoint.sqlite'
+
+# 工作单元状态
+NEW, PARTIAL, DONE = 'new', 'partial', 'done'
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS units (
+    run TEXT,
+    unit TEXT,
+    status TEXT,
+    progress TEXT,
+    updated_at REAL,
+    PRIMARY KEY (run, unit)
+);
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    run TEXT,
+    unit TEXT,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_records_unit ON records(run, unit);
+'''
+
+
+class Checkpoint:
+    """
+    单次爬取（run，如 'journal:2025'）的检查点
+    连接可在多个线程间共享（并发模式下各期刊同时写入）
+    """
+
+    def __init__(self, run: str, path: str = DEFAULT_CHECKPOINT_PATH):
+        self.run = run
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def state(self, unit: str) -> Tuple[str, Dict]:
+        """
+        返回 (状态, 进度)，未开始的单元为 ('new', {})
+        """
+        with self._lock:
+            row = self._conn.execute('SELECT status, progress FROM units WHERE run = ? AND unit = ?',
+                                     (self.run, unit)).fetchone()
+        if row is None:
+            return NEW, {}
+        return row[0], json.loads(row[1] or '{}')
+
+    def records(self, unit: str) -> List[Article]:
+        """
+        读取单元已保存的记录（按写入顺序）
+        """
+        with self._lock:
+            rows = self._conn.execute('SELECT data FROM records WHERE run = ? AND unit = ? ORDER BY id',
+                                      (self.run, unit)).fetchall()
+        return [Article.from_dict(json.loads(row[0])) for row in rows]
+
+    def _write(self, unit: str, status: str, progress: Dict, records: Iterable[Dict]):
+        rows = [(self.run, unit, json.dumps(record, ensure_ascii=False, default=to_json)) for record in records]
+        with self._lock, self._conn:
+            if rows:
+                self._conn.executemany('INSERT INTO records (run, unit, data) VALUES (?, ?, ?)', rows)
+            self._conn.execute('''
+                INSERT INTO units (run, unit, status, progress, updated_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(run, unit) DO UPDATE SET
+                    status = excluded.status, progress = excluded.progress, updated_at = excluded.updated_at
+            ''', (self.run, unit, status, json.dumps(progress, ensure_ascii=False), time.time()))
+
+    def advance(self, unit: str, progress: Dict, records: Iterable[Dict] = ()):
+        """
+        追加一批记录并更新单元进度（同一事务）
+        """
+        self._write(unit, PARTIAL, progress, records)
+
+    def complete(self, unit: str, records: Iterable[Dict] = (), progress: Optional[Dict] = None):
+        """
+        标记单元完成，可同时写入最后一批记录
+        """
+        self._write(unit, DONE, progress or {}, records)
+
+    def reset(self, unit: str):
+        """
+        丢弃单元的进度和记录（如游标已失效，需要从头获取）
+        """
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM records WHERE run = ? AND unit = ?', (self.run, unit))
+            self._conn.execute('DELETE FROM units WHERE run = ? AND unit = ?', (self.run, unit))
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute('SELECT status, COUNT(*) FROM units WHERE run = ? GROUP BY status',
+                                      (self.run,)).fetchall()
+        return dict(rows)
+
+    def clear(self):
+        """
+        清除本次爬取的全部检查点（所有单元成功后调用）
+        """
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM records WHERE run = ?', (self.run,))
+            self._conn.execute('DELETE FROM units WHERE run = ?', (self.run,))
+
+    def close(self):
+        self._conn.close()
+
+
+def open_checkpoint(run: str, path: Optional[str] = None) -> Optional[Checkpoint]:
+    """
+    打开一次爬取的检查点，有未完成的单元时提示将从断点继续
+    环境变量 AICRAWLER_CHECKPOINT_PATH 指定文件，AICRAWLER_NO_CHECKPOINT=1 时不使用检查点
+    """
+    if os.environ.get('AICRAWLER_NO_CHECKPOINT'):
+        return None
+    checkpoint = Checkpoint(run, path or os.environ.get('AICRAWLER_CHECKPOINT_PATH', DEFAULT_CHECKPOINT_PATH))
+    summary = checkpoint.summary()
+    if summary:
+        print(f"↻ 从检查点继续: 已完成 {summary.get(DONE, 0)} 个单元，"
+              f"{summary.get(PARTIAL, 0)} 个单元进行到一半")
+    return checkpoint
+
+
+def close_checkpoint(checkpoint: Optional[Checkpoint], succeeded: bool):
+    """
+    爬取结束：全部成功时清除检查点，否则保留已完成的单元供下次继续
+    """
+    if checkpoint is None:
+        return
+    if succeeded:
+        checkpoint.clear()
+    else:
+        print(f"⚠️  部分请求失败，已完成的进度保存在 {checkpoint.path}，重新运行将从断点继续")
+    checkpoint.close()
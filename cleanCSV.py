@@ -3,6 +3,8 @@ Author: Diana Tang
 '''
 import pandas as pd
 
+from dedup_index import DedupIndex
+
 # 1. 读取 CSV 文件
 df = pd.read_csv("csv-NatureJour-set.csv")
 
@@ -10,9 +12,10 @@ df = pd.read_csv("csv-NatureJour-set.csv")
 print("列名：", df.columns.tolist())
 
 # 3. 去重
-# 如果文件中有唯一标识列（比如 PMID、Title 等），可以指定 subset
-# 例如 subset=['PMID'] 或 ['Title', 'Authors']
-df_dedup = df.drop_duplicates(subset=['Title'], keep='first')
+# 使用统一去重索引：DOI、PMID、Title 任一相同即视为重复（DOI/标题先规范化），保留第一条
+index = DedupIndex()
+keep = [index.add(row) for row in df.to_dict('records')]
+df_dedup = df[keep]
 
 # 4. 输出去重后的结果
 output_path = "csv-NatureJour-set-dedup.csv"
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+列式导出（Parquet / Arrow）
+- journal、data_source、source 等重复值多的列使用字典编码
+- 结果按批追加为行组（row group）
+- 读取时内存映射文件，统计只读取需要的列，不必重新解析CSV/JSON
+
+依赖 pyarrow（可选）：pip install pyarrow
+"""
+
+import os
+import sys
+from typing import Dict, Iterator, List, Optional, Sequence
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# 取值重复率高的列，按字典编码存储
+DICTIONARY_COLUMNS = ('journal', 'data_source', 'source')
+
+DEFAULT_ROW_GROUP_SIZE = 10000
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet 导出需要 pyarrow，请先运行: pip install pyarrow")
+
+
+def _cell(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return '; '.join(str(v) for v in value)
+    return str(value)
+
+
+def build_schema(fieldnames: Sequence[str]):
+    """
+    所有列按字符串存储，DICTIONARY_COLUMNS 中的列使用字典类型
+    """
+    _require_pyarrow()
+    return pa.schema([
+        pa.field(name, pa.dictionary(pa.int32(), pa.string()) if name in DICTIONARY_COLUMNS else pa.string())
+        for name in fieldnames
+    ])
+
+
+class ParquetSink:
+    """
+    Parquet写入器，接口与 output_sinks 中的写入器一致
+    每积累 row_group_size 条写入一个行组；Parquet文件在 close() 写入尾部元数据后才可读取，
+    因此 flush() 不会把不足一个行组的缓冲写出
+    """
+
+    def __init__(self, path: str, fieldnames: Sequence[str], row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+                 compression: str = 'zstd'):
+        _require_pyarrow()
+        self.path = path
+        self.fieldnames = list(fieldnames)
+        self.row_group_size = row_group_size
+        self.count = 0
+        self.schema = build_schema(self.fieldnames)
+        self._buffer: List[Dict] = []
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._writer = pq.ParquetWriter(path, self.schema, compression=compression)
+
+    def _write_row_group(self):
+        if not self._buffer:
+            return
+        columns = []
+        for field in self.schema:
+            array = pa.array([_cell(record.get(field.name)) for record in self._buffer], type=pa.string())
+            if pa.types.is_dictionary(field.type):
+                array = array.dictionary_encode()
+            columns.append(array)
+        self._writer.write_table(pa.Table.from_arrays(columns, schema=self.schema), row_group_size=len(self._buffer))
+        self._buffer = []
+
+    def write(self, record: Dict):
+        self._buffer.append(record)
+        self.count += 1
+        if len(self._buffer) >= self.row_group_size:
+            self._write_row_group()
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self._writer is None:
+            return
+        self._write_row_group()
+        self._writer.close()
+        self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def load_table(path: str, columns: Optional[Sequence[str]] = None, filters=None):
+    """
+    内存映射读取Parquet文件，只解码 columns 指定的列
+    filters 为 pyarrow 过滤条件，如 [('journal', '=', 'Nature')]，可跳过不相关的行组
+    """
+    _require_pyarrow()
+    return pq.read_table(path, columns=list(columns) if columns else None, filters=filters, memory_map=True)
+
+
+def iter_records(path: str, columns: Optional[Sequence[str]] = None) -> Iterator[Dict]:
+    """
+    按行组逐批读取为字典，内存中只保留一个行组
+    """
+    _require_pyarrow()
+    parquet_file = pq.ParquetFile(path, memory_map=True)
+    for batch in parquet_file.iter_batches(columns=list(columns) if columns else None):
+        yield from batch.to_pylist()
+
+
+def count_by(path: str, column: str) -> Dict[str, int]:
+    """
+    按某一列计数（只读取该列，字典编码列直接按编码统计）
+    """
+    counts: Dict[str, int] = {}
+    for item in load_table(path, [column]).column(column).value_counts().to_pylist():
+        key = item['values'] if item['values'] is not None else 'Unknown'
+        counts[key] = counts.get(key, 0) + item['counts']
+    return counts
+
+
+def print_report(path: str, columns: Sequence[str] = ('journal', 'data_source')):
+    """
+    从Parquet文件生成与 generate_report 相同的分组统计
+    """
+    _require_pyarrow()
+    metadata = pq.ParquetFile(path, memory_map=True).metadata
+    print("=" * 70)
+    print(f"📊 统计报告: {path}")
+    print(f"   共 {metadata.num_rows} 条记录，{metadata.num_row_groups} 个行组")
+    print("=" * 70)
+    available = set(metadata.schema.names)
+    for column in columns:
+        if column not in available:
+            continue
+        print(f"\n各 {column} 数量:")
+        for key, count in sorted(count_by(path, column).items(), key=lambda x: x[1], reverse=True):
+            print(f"  • {key}: {count} 篇")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("使用方法: python columnar_store.py <results.parquet> [列名 ...]")
+        return
+    print_report(sys.argv[1], sys.argv[2:] or ('journal', 'data_source'))
+
+
+if __name__ == "__main__":
+    main()
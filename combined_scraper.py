@@ -5,29 +5,79 @@ Google Scholar + PubMed 联合检索工具
 取两个数据库结果的并集
 """
 
-import requests
-import time
-import csv
-import json
-from typing import List, Dict, Set
+from typing import List, Dict, Set, Iterator, Tuple
 from datetime import datetime
 import re
+import os
+
+from article import Article
+from checkpoint import DONE, NEW, close_checkpoint, open_checkpoint
+from crawl_state import CrawlState, load_results, merge_records
+from crossref_enrich import CrossrefEnricher, fill_dois
+from dedup_index import DedupIndex
+from http_transport import get_transport
+from metrics import get_metrics
+from near_dup import drop_near_duplicates, print_clusters
+from output_sinks import StreamWriter, open_sinks
+from pubmed_ids import PubMedIdResolver
+from rate_limiter import get_rate_limiter
+from search_index import update_index
 
 class ScholarPubMedScraper:
-    def __init__(self):
+    # Google Scholar检索式中的主题部分
+    SCHOLAR_TOPIC = '("machine learning" OR "deep learning" OR "artificial intelligence") (medical OR clinical OR diagnosis)'
+
+    PUBMED_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
+    SERPAPI_URL = "https://serpapi.com/search"
+    CROSSREF_WORKS_URL = "https://api.crossref.org/works"
+
+    # 按ID获取详情时 esummary 每批的初始记录数（之后按响应时间和大小自动调整）
+    ESUMMARY_PAGE_SIZE = 100
+
+    OUTPUT_DIR = '/mnt/user-data/outputs'
+    CSV_FIELDS = ['title', 'authors', 'journal', 'pub_date', 'doi', 'pmid', 'link', 'data_source', 'snippet',
+                  'abstract', 'issn', 'published_date', 'citation_count']
+    # 默认输出文件名前缀（{前缀}_{年份}.csv / .json），增量模式读取同名JSON作为上次的结果
+    RESULTS_NAME = 'combined_results'
+
+    def __init__(self, ncbi_api_key: str = None):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
         self.pubmed_results = []
         self.scholar_results = []
         self.merged_results = []
-        
-    def search_pubmed(self, year: int = 2025) -> List[Dict]:
+        self.year = 2025
+        self.errors = 0
+        self.stream = None
+        self.checkpoint = None
+        self.pubmed_tuners = {}
+        self.rate_limiter = get_rate_limiter()
+        self.transport = get_transport()
+        self.metrics = get_metrics()
+        self.ncbi_api_key = ncbi_api_key or os.environ.get('NCBI_API_KEY')
+        if self.ncbi_api_key:
+            self.rate_limiter.set_ncbi_api_key(self.ncbi_api_key)
+
+    def _ncbi_params(self, params: Dict) -> Dict:
         """
-        使用PubMed API进行检索
+        有API key时附加到E-utilities请求参数中
+        """
+        if self.ncbi_api_key:
+            params['api_key'] = self.ncbi_api_key
+        return params
+
+    def id_resolver(self) -> PubMedIdResolver:
+        """
+        按PMID批量取回记录，批次调节器在同一爬虫实例的多次调用间共享
+        """
+        return PubMedIdResolver(self.transport, self.PUBMED_BASE_URL, self._ncbi_params, self.pubmed_tuners,
+                                self.ESUMMARY_PAGE_SIZE)
+
+    def build_pubmed_query(self, year: int = 2025) -> str:
+        """
+        构建PubMed检索式
         """
-        base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
-        
         # 定义期刊列表
         journals = [
             'Nature', 'Nature Medicine', 'Nature Biotechnology', 'Nature Methods',
@@ -39,7 +89,7 @@ class ScholarPubMedScraper:
         # 构建查询
         journal_query = ' OR '.join([f'"{j}"[Journal]' for j in journals])
         
-        query = f'''
+        return f'''
         ({journal_query}) 
         AND (machine learning[Title/Abstract] OR deep learning[Title/Abstract] 
              OR artificial intelligence[Title/Abstract] OR neural network[Title/Abstract]
@@ -50,90 +100,219 @@ class ScholarPubMedScraper:
              OR healthcare[Title/Abstract])
         AND {year}[PDAT]
         '''
+
+    def _emit(self, articles: List[Dict], source: str) -> List[Dict]:
+        """
+        记录该数据源的产出条数；开启流式输出时，每获取一批结果就写入磁盘
+        """
+        self.metrics.record_articles(source, articles)
+        if self.stream is not None:
+            self.stream.emit(articles)
+        return articles
+
+    def _parse_summary(self, summary_data: Dict) -> List[Dict]:
+        """
+        将esummary的JSON结果转换为文章列表
+        """
+        articles = []
+        for pmid, article_data in summary_data.get('result', {}).items():
+            if pmid == 'uids':
+                continue
+            
+            authors = article_data.get('authors', [])
+            author_list = '; '.join([a.get('name', '') for a in authors[:10]])
+            
+            # 提取DOI
+            doi = ''
+            article_ids = article_data.get('articleids', [])
+            for aid in article_ids:
+                if aid.get('idtype') == 'doi':
+                    doi = aid.get('value', '')
+                    break
+            
+            article = Article(
+                pmid=pmid,
+                title=article_data.get('title', ''),
+                authors=author_list,
+                journal=article_data.get('fulljournalname', ''),
+                pub_date=article_data.get('pubdate', ''),
+                doi=doi or article_data.get('elocationid', ''),
+                source=article_data.get('source', ''),
+                link=f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/",
+                data_source='PubMed'
+            )
+            articles.append(article)
+        return articles
+
+    def _history_search(self, year: int, reldate: int = None) -> Dict:
+        """
+        esearch 设置 usehistory=y，只返回结果数和 WebEnv/query_key
+        """
+        search_params = {
+            'db': 'pubmed',
+            'term': self.build_pubmed_query(year),
+            'retmax': 0,
+            'retmode': 'json',
+            'usehistory': 'y',
+            'sort': 'pub_date',
+            'mindate': f'{year}/01/01',
+            'maxdate': f'{year}/12/31'
+        }
+        if reldate:
+            del search_params['mindate'], search_params['maxdate']
+            search_params.update({'datetype': 'edat', 'reldate': reldate})
+        # WebEnv 会在服务器端过期，esearch 结果不能复用缓存
+        response = self.transport.get(f"{self.PUBMED_BASE_URL}esearch.fcgi", params=self._ncbi_params(search_params),
+                                      timeout=30, use_cache=False)
+        search_result = response.json().get('esearchresult', {})
+        return {
+            'webenv': search_result.get('webenv'),
+            'query_key': search_result.get('querykey'),
+            'count': int(search_result.get('count', 0)),
+            'retstart': 0,
+        }
+
+    def iter_pubmed_pages(self, year: int = 2025, page_size: int = 500,
+                          reldate: int = None, history: Dict = None) -> Iterator[List[Dict]]:
+        """
+        使用E-utilities历史服务器分页获取全部结果
+        esearch 设置 usehistory=y 只返回 WebEnv/query_key，
+        之后 esummary 直接从服务器端结果集按 retstart 分页读取，不再传递ID列表
+        每获取一页就 yield 一次
+        reldate 不为空时只检索最近 reldate 天内收录（edat）的记录
+        history 用于断点续爬：传入检查点中的 {'webenv', 'query_key', 'count', 'retstart'} 时跳过 esearch
+        从 retstart 继续（WebEnv 已过期则重新检索，偏移不变）；每 yield 一页后 history 更新为下一页的进度
+        """
+        base_url = self.PUBMED_BASE_URL
+        history = {} if history is None else history
+        
+        resumed = bool(history.get('webenv'))
+        if resumed:
+            print(f"↻ 从第 {history['retstart'] + 1} 篇继续（共 {history['count']} 篇）...")
+        else:
+            history.update(self._history_search(year, reldate))
+            print(f"✓ PubMed找到 {history['count']} 篇文章，通过历史服务器分页获取...")
+        
+        if not history['count'] or not history['webenv']:
+            return
+        
+        while history['retstart'] < history['count']:
+            retstart = history['retstart']
+            print(f"  正在获取第 {retstart+1}-{min(retstart+page_size, history['count'])} 篇...")
+            summary_params = {
+                'db': 'pubmed',
+                'WebEnv': history['webenv'],
+                'query_key': history['query_key'],
+                'retstart': retstart,
+                'retmax': page_size,
+                'retmode': 'json'
+            }
+            response = self.transport.get(f"{base_url}esummary.fcgi", params=self._ncbi_params(summary_params), timeout=60)
+            summary_data = response.json()
+            if resumed and 'result' not in summary_data:
+                # 检查点中的 WebEnv 已过期：重新检索，从原偏移继续（按日期倒序，新收录的记录只会造成重叠）
+                print("  WebEnv 已过期，重新检索...")
+                history.update(self._history_search(year, reldate), retstart=retstart)
+                resumed = False
+                continue
+            resumed = False
+            history['retstart'] = retstart + page_size
+            yield self._parse_summary(summary_data)
+
+    def _restore(self, unit: str) -> Tuple[str, Dict, List[Dict]]:
+        """
+        从检查点恢复工作单元，返回 (状态, 进度, 已保存的记录)
+        """
+        if self.checkpoint is None:
+            return NEW, {}, []
+        status, progress = self.checkpoint.state(unit)
+        records = self.checkpoint.records(unit) if status != NEW else []
+        if records:
+            print(f"  ↻ 检查点中已有 {len(records)} 篇")
+        return status, progress, records
+
+    def search_pubmed(self, year: int = 2025, use_history: bool = False, reldate: int = None) -> List[Dict]:
+        """
+        使用PubMed API进行检索
+        use_history=True 时通过历史服务器分页获取全部结果，不受 retmax 限制
+        reldate 为增量检索的天数窗口（仅历史服务器模式）
+        开启检查点时每获取一批就保存进度和记录，出错时返回已获取的部分
+        """
+        base_url = self.PUBMED_BASE_URL
         
         print("=" * 70)
         print("📚 PubMed 检索中...")
         print("=" * 70)
         
+        articles = []
         try:
-            # 第一步：搜索获取ID
-            search_url = f"{base_url}esearch.fcgi"
-            search_params = {
-                'db': 'pubmed',
-                'term': query,
-                'retmax': 500,  # 增加到500篇
-                'retmode': 'json',
-                'sort': 'pub_date',
-                'mindate': f'{year}/01/01',
-                'maxdate': f'{year}/12/31'
-            }
+            if use_history:
+                unit = f'pubmed-history:{year}:{reldate or 0}'
+                status, history, restored = self._restore(unit)
+                articles.extend(self._emit(restored, 'PubMed'))
+                if status != DONE:
+                    for page in self.iter_pubmed_pages(year, reldate=reldate, history=history):
+                        articles.extend(self._emit(page, 'PubMed'))
+                        if self.checkpoint is not None:
+                            self.checkpoint.advance(unit, history, page)
+                    if self.checkpoint is not None:
+                        self.checkpoint.complete(unit)
+                print(f"✓ PubMed检索完成，共获取 {len(articles)} 篇文章\n")
+                return articles
             
-            response = requests.get(search_url, params=search_params, timeout=30)
-            response.raise_for_status()
-            search_data = response.json()
+            unit = f'pubmed:{year}'
+            status, progress, restored = self._restore(unit)
+            articles.extend(self._emit(restored, 'PubMed'))
+            if status == DONE:
+                print(f"✓ PubMed检索完成，共获取 {len(articles)} 篇文章\n")
+                return articles
             
-            id_list = search_data.get('esearchresult', {}).get('idlist', [])
-            total_count = search_data.get('esearchresult', {}).get('count', 0)
-            print(f"✓ PubMed找到 {total_count} 篇文章，正在获取前 {len(id_list)} 篇详情...")
-            
-            if not id_list:
-                return []
-            
-            # 第二步：批量获取详情（每次100篇）
-            articles = []
-            batch_size = 100
-            
-            for i in range(0, len(id_list), batch_size):
-                batch_ids = id_list[i:i+batch_size]
-                print(f"  正在获取第 {i+1}-{min(i+batch_size, len(id_list))} 篇...")
-                
-                time.sleep(0.5)  # API限制
-                
-                summary_url = f"{base_url}esummary.fcgi"
-                summary_params = {
+            id_list = progress.get('id_list')
+            if id_list is None:
+                # 第一步：搜索获取ID
+                search_url = f"{base_url}esearch.fcgi"
+                search_params = {
                     'db': 'pubmed',
-                    'id': ','.join(batch_ids),
-                    'retmode': 'json'
+                    'term': self.build_pubmed_query(year),
+                    'retmax': 500,  # 增加到500篇
+                    'retmode': 'json',
+                    'sort': 'pub_date',
+                    'mindate': f'{year}/01/01',
+                    'maxdate': f'{year}/12/31'
                 }
                 
-                response = requests.get(summary_url, params=summary_params, timeout=30)
+                response = self.transport.get(search_url, params=self._ncbi_params(search_params), timeout=30)
                 response.raise_for_status()
-                summary_data = response.json()
+                search_data = response.json()
                 
-                for pmid, article_data in summary_data.get('result', {}).items():
-                    if pmid == 'uids':
-                        continue
-                    
-                    authors = article_data.get('authors', [])
-                    author_list = '; '.join([a.get('name', '') for a in authors[:10]])
-                    
-                    # 提取DOI
-                    doi = ''
-                    article_ids = article_data.get('articleids', [])
-                    for aid in article_ids:
-                        if aid.get('idtype') == 'doi':
-                            doi = aid.get('value', '')
-                            break
-                    
-                    article = {
-                        'pmid': pmid,
-                        'title': article_data.get('title', ''),
-                        'authors': author_list,
-                        'journal': article_data.get('fulljournalname', ''),
-                        'pub_date': article_data.get('pubdate', ''),
-                        'doi': doi or article_data.get('elocationid', ''),
-                        'source': article_data.get('source', ''),
-                        'link': f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/",
-                        'data_source': 'PubMed'
-                    }
-                    articles.append(article)
+                id_list = search_data.get('esearchresult', {}).get('idlist', [])
+                total_count = search_data.get('esearchresult', {}).get('count', 0)
+                print(f"✓ PubMed找到 {total_count} 篇文章，正在获取前 {len(id_list)} 篇详情...")
+                
+                if not id_list:
+                    return []
+            
+            # 第二步：epost 提交ID后分批获取详情（批次自动调整），从检查点中的偏移继续
+            offset = progress.get('offset', 0)
+            for fetched, summary_data in self.id_resolver().summaries(id_list[offset:]):
+                print(f"  已获取 {offset + fetched}/{len(id_list)} 篇...")
+                batch = self._parse_summary(summary_data)
+                articles.extend(self._emit(batch, 'PubMed'))
+                if self.checkpoint is not None:
+                    self.checkpoint.advance(unit, {'id_list': id_list, 'offset': offset + fetched}, batch)
             
+            if self.checkpoint is not None:
+                self.checkpoint.complete(unit)
             print(f"✓ PubMed检索完成，共获取 {len(articles)} 篇文章\n")
             return articles
             
         except Exception as e:
-            print(f"✗ PubMed检索错误: {e}\n")
-            return []
+            print(f"✗ PubMed检索错误: {e}")
+            if articles:
+                print(f"  保留已获取的 {len(articles)} 篇")
+            print()
+            self.errors += 1
+            return articles
     
     def search_google_scholar_serpapi(self, year: int = 2025, api_key: str = None) -> List[Dict]:
         """
@@ -162,47 +341,55 @@ class ScholarPubMedScraper:
         all_articles = []
         
         for journal in journals:
-            query = f'source:"{journal}" ("machine learning" OR "deep learning" OR "artificial intelligence") (medical OR clinical OR diagnosis) {year}'
-            
             print(f"  正在搜索 {journal}...")
             
             try:
-                params = {
-                    'engine': 'google_scholar',
-                    'q': query,
-                    'api_key': api_key,
-                    'num': 20,  # 每个期刊获取20篇
-                    'as_ylo': year,
-                    'as_yhi': year
-                }
-                
-                response = requests.get('https://serpapi.com/search', params=params, timeout=30)
-                response.raise_for_status()
-                data = response.json()
-                
-                results = data.get('organic_results', [])
-                
-                for result in results:
-                    article = {
-                        'title': result.get('title', ''),
-                        'authors': result.get('publication_info', {}).get('authors', []),
-                        'journal': journal,
-                        'pub_date': result.get('publication_info', {}).get('summary', ''),
-                        'link': result.get('link', ''),
-                        'snippet': result.get('snippet', ''),
-                        'data_source': 'Google Scholar'
-                    }
-                    all_articles.append(article)
-                
-                time.sleep(1)  # 避免请求过快
+                journal_articles = self.search_google_scholar_journal(journal, year, api_key)
+                all_articles.extend(self._emit(journal_articles, 'Google Scholar'))
                 
             except Exception as e:
                 print(f"    ✗ 错误: {e}")
+                self.errors += 1
                 continue
         
         print(f"✓ Google Scholar检索完成，共获取 {len(all_articles)} 篇文章\n")
         return all_articles
     
+    def search_google_scholar_journal(self, journal: str, year: int, api_key: str, topic: str = None) -> List[Dict]:
+        """
+        检索单个期刊的Google Scholar结果（请求失败时抛出异常）
+        topic 为检索式的主题部分（默认 SCHOLAR_TOPIC）
+        Google Scholar按全文匹配检索式，返回结果不在本地按标题和摘要片段重新过滤
+        """
+        topic = topic or self.SCHOLAR_TOPIC
+        params = {
+            'engine': 'google_scholar',
+            'q': f'source:"{journal}" {topic} {year}',
+            'api_key': api_key,
+            'num': 20,  # 每个期刊获取20篇
+            'as_ylo': year,
+            'as_yhi': year
+        }
+        
+        response = self.transport.get(self.SERPAPI_URL, params=params, timeout=30)
+        response.raise_for_status()
+        data = response.json()
+        
+        results = data.get('organic_results', [])
+        
+        journal_articles = []
+        for result in results:
+            journal_articles.append(Article(
+                title=result.get('title', ''),
+                authors=result.get('publication_info', {}).get('authors', []),
+                journal=journal,
+                pub_date=result.get('publication_info', {}).get('summary', ''),
+                link=result.get('link', ''),
+                snippet=result.get('snippet', ''),
+                data_source='Google Scholar'
+            ))
+        return journal_articles
+    
     def search_google_scholar_manual(self, year: int = 2025) -> List[Dict]:
         """
         Google Scholar手动检索指南（无需API）
@@ -221,7 +408,7 @@ class ScholarPubMedScraper:
         print("\n" + "=" * 70)
         
         for i, journal in enumerate(journals, 1):
-            query = f'source:"{journal}" ("machine learning" OR "deep learning" OR "artificial intelligence") (medical OR clinical OR diagnosis) {year}'
+            query = f'source:"{journal}" {self.SCHOLAR_TOPIC} {year}'
             print(f"\n{i}. {journal}:")
             print(f"   {query}")
         
@@ -246,38 +433,33 @@ class ScholarPubMedScraper:
         
         return []
     
-    def merge_results(self, pubmed_results: List[Dict], scholar_results: List[Dict]) -> List[Dict]:
+    def merge_results(self, pubmed_results: List[Dict], scholar_results: List[Dict],
+                      fuzzy_threshold: float = None) -> List[Dict]:
         """
         合并PubMed和Google Scholar结果，去重
+        Scholar结果先补上从文章链接中提取的DOI，再与PubMed结果按DOI/PMID/标题去重
+        fuzzy_threshold 不为空时再去除标题近似重复（如Scholar截断标题）的记录
         """
         print("=" * 70)
         print("🔄 合并结果并去重...")
         print("=" * 70)
         
-        # 用于去重的集合
-        seen_titles = set()
-        seen_dois = set()
-        merged = []
+        filled = fill_dois(scholar_results)
+        if filled:
+            print(f"✓ 从Google Scholar链接中提取DOI: {filled} 篇")
         
-        # 先添加PubMed结果
-        for article in pubmed_results:
-            title = article.get('title', '').lower().strip()
-            doi = article.get('doi', '').lower().strip()
-            
-            # 标题去重
-            if title and title not in seen_titles:
-                seen_titles.add(title)
-                if doi:
-                    seen_dois.add(doi)
-                merged.append(article)
-        
-        # 再添加Google Scholar结果（跳过重复）
-        for article in scholar_results:
-            title = article.get('title', '').lower().strip()
-            
-            if title and title not in seen_titles:
-                seen_titles.add(title)
-                merged.append(article)
+        # DOI/PMID/标题任一相同即为重复
+        index = DedupIndex()
+        
+        # 先添加PubMed结果，再添加Google Scholar结果（跳过重复）
+        merged = list(index.filter(pubmed_results))
+        merged.extend(index.filter(scholar_results))
+        
+        if fuzzy_threshold:
+            exact_merged = merged
+            merged, clusters = drop_near_duplicates(exact_merged, fuzzy_threshold)
+            print_clusters(exact_merged, clusters)
+            print(f"✓ 近似重复: {len(exact_merged) - len(merged)} 篇 (阈值 {fuzzy_threshold})")
         
         print(f"✓ PubMed结果: {len(pubmed_results)} 篇")
         print(f"✓ Google Scholar结果: {len(scholar_results)} 篇")
@@ -285,33 +467,43 @@ class ScholarPubMedScraper:
         
         return merged
     
-    def save_results(self, results: List[Dict], filename: str = 'combined_results_2025.csv'):
+    def enrich_results(self, results: List[Dict]) -> int:
         """
-        保存结果到CSV和JSON
+        按DOI批量查询Crossref补全记录（Scholar结果的DOI从链接中提取），返回补全的记录数
+        补全失败不影响检索结果，只给出提示
+        """
+        enricher = CrossrefEnricher(self.transport, self.CROSSREF_WORKS_URL)
+        enriched = enricher.enrich(results)
+        if enricher.errors:
+            print(f"⚠️  {enricher.errors} 批DOI补全失败，相应记录保持原样")
+        return enriched
+    
+    def results_path(self, year: int, ext: str = 'csv') -> str:
+        """
+        默认输出文件路径，save_results 写入与增量模式读取的是同一组文件
+        """
+        return f'{self.OUTPUT_DIR}/{self.RESULTS_NAME}_{year}.{ext}'
+    
+    def save_results(self, results: List[Dict], filename: str = None, formats=('csv', 'json')):
+        """
+        保存结果到CSV和JSON，并增量更新本地检索索引
+        filename 默认为 {RESULTS_NAME}_{检索年份}.csv
+        formats 可选 csv / json / jsonl / parquet
         """
         if not results:
             print("⚠️  没有结果可保存\n")
             return None
         
-        output_path = f'/mnt/user-data/outputs/{filename}'
-        
-        # 保存CSV
-        with open(output_path, 'w', newline='', encoding='utf-8-sig') as f:
-            fieldnames = ['title', 'authors', 'journal', 'pub_date', 'doi', 'pmid', 'link', 'data_source', 'snippet']
-            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
-            
-            writer.writeheader()
-            for article in results:
-                writer.writerow(article)
-        
-        print(f"✓ CSV结果已保存: {output_path}")
+        output_path = f'{self.OUTPUT_DIR}/{filename}' if filename else self.results_path(self.year)
         
-        # 保存JSON
-        json_path = output_path.replace('.csv', '.json')
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
+        with self.metrics.stage('combined.save'), \
+                open_sinks(output_path, self.CSV_FIELDS, formats, encoding='utf-8-sig') as sink:
+            sink.write_many(results)
         
-        print(f"✓ JSON结果已保存: {json_path}\n")
+        for path in sink.paths:
+            print(f"✓ 结果已保存: {path}")
+        update_index(results)
+        print()
         
         return output_path
     
@@ -357,37 +549,83 @@ class ScholarPubMedScraper:
             print(f"   🔗 链接: {article.get('link', 'N/A')}")
             print(f"   📊 来源: {article.get('data_source', 'N/A')}")
     
-    def run(self, year: int = 2025, serpapi_key: str = None):
+    def run(self, year: int = 2025, serpapi_key: str = None, incremental: bool = False,
+            previous_results: str = None, stream_to: str = None, metrics_to: str = None,
+            checkpoint: bool = True, enrich: bool = False):
         """
         主执行函数
+        incremental=True 时PubMed只检索上次运行后新收录的记录，
+        结果合并到上次保存的结果（previous_results，默认为同年份的JSON输出）中
+        stream_to 为文件名时，检索过程中边检索边写 CSV 和 JSON Lines
+        metrics_to 为文件名时，结束后把请求与记录统计保存为JSON
+        checkpoint=True 时逐批保存进度，中途失败后重新运行从断点继续
+        enrich=True 时在合并去重前按DOI批量查询Crossref，补全摘要、ISSN、出版日期和被引次数（需额外的网络请求）
         """
         print("\n" + "=" * 70)
         print("🚀 Google Scholar + PubMed 联合检索")
         print("=" * 70)
+        self.year = year
         print(f"检索年份: {year}")
         print(f"目标期刊: Nature/Science/Cell 系列")
         print(f"关键词: 机器学习 + 医学/临床")
         print("=" * 70 + "\n")
         
-        # 1. PubMed检索
-        self.pubmed_results = self.search_pubmed(year)
+        reldate = None
+        if incremental:
+            state = CrawlState()
+            reldate = state.reldate(f'combined:pubmed:{year}')
+            print(f"增量模式: 上次爬取日期 {state.from_date(f'combined:pubmed:{year}') or '无（首次运行，全量爬取）'}")
+        errors_before = self.errors
+        if checkpoint:
+            self.checkpoint = open_checkpoint(f"combined:{year}:{reldate or 'all'}")
+        if stream_to:
+            self.stream = StreamWriter(f'{self.OUTPUT_DIR}/{stream_to}', self.CSV_FIELDS, encoding='utf-8-sig')
         
-        # 2. Google Scholar检索
-        if serpapi_key:
-            self.scholar_results = self.search_google_scholar_serpapi(year, serpapi_key)
-        else:
-            # 提供手动检索指南
-            self.search_google_scholar_manual(year)
-            self.scholar_results = []
+        try:
+            # 1. PubMed检索（历史服务器分页，获取全部结果）
+            with self.metrics.stage('combined.pubmed'):
+                self.pubmed_results = self.search_pubmed(year, use_history=True, reldate=reldate)
+            
+            # 2. Google Scholar检索
+            if serpapi_key:
+                with self.metrics.stage('combined.scholar'):
+                    self.scholar_results = self.search_google_scholar_serpapi(year, serpapi_key)
+            else:
+                # 提供手动检索指南
+                self.search_google_scholar_manual(year)
+                self.scholar_results = []
+        finally:
+            if self.stream is not None:
+                self.stream.close()
+                self.stream = None
+            close_checkpoint(self.checkpoint, self.errors == errors_before)
+            self.checkpoint = None
+        
+        if enrich:
+            with self.metrics.stage('combined.enrich'):
+                self.enrich_results(self.pubmed_results + self.scholar_results)
         
         # 3. 合并结果
-        self.merged_results = self.merge_results(self.pubmed_results, self.scholar_results)
+        with self.metrics.stage('combined.merge'):
+            self.merged_results = self.merge_results(self.pubmed_results, self.scholar_results)
+        
+        if incremental:
+            if self.errors == errors_before:
+                new_count = state.mark(f'combined:pubmed:{year}', self.pubmed_results)
+                state.save()
+                print(f"增量合并: PubMed新增 {new_count} 篇")
+            else:
+                print("⚠️  部分请求失败，本次不更新增量状态")
+            previous_path = previous_results or self.results_path(year, 'json')
+            self.merged_results = merge_records(load_results(previous_path), self.merged_results)
         
         # 4. 保存结果
         if self.merged_results:
             self.save_results(self.merged_results)
             self.generate_report(self.merged_results)
         
+        self.metrics.print_summary()
+        self.metrics.export(self.OUTPUT_DIR, metrics_to)
         print("=" * 70)
         print("✅ 检索完成！")
         print("=" * 70)
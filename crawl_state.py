@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+增量爬取状态
+按数据源保存上次爬取日期和已见过的PMID/DOI/标题，
+下次运行只请求此后新增或更新的记录，并合并到已有结果中
+"""
+
+import json
+import os
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from article import Article
+from dedup_index import DedupIndex, record_identifiers
+
+DEFAULT_STATE_PATH = '/mnt/user-data/outputs/crawl_state.json'
+
+# 合并同一记录的新旧版本时不从旧版本沿用的字段（数据来源以新版本为准）
+_OWN_FIELDS = frozenset({'data_source'})
+
+
+def merge_records(existing: Iterable[Dict], updates: Iterable[Dict]) -> List[Dict]:
+    """
+    将新抓取的记录合并到已有结果中
+    与去重索引相同，PMID、DOI、标题任一相同即为同一记录（只有DOI的Crossref记录与同时有PMID和DOI的PubMed记录合并）
+    同一记录以新版本为准，新版本缺少的字段沿用旧版本；保持原有顺序，新记录追加在末尾
+    """
+    records = list(existing) + list(updates)
+    index = DedupIndex()
+    for article in records:
+        index.add(article)
+
+    merged: Dict[Tuple[str, int], Dict] = {}
+    for i, article in enumerate(records):
+        cluster = index.cluster_of(article)
+        key = ('cluster', cluster) if cluster is not None else ('row', i)
+        previous = merged.get(key)
+        if previous is not None:
+            for field, value in previous.items():
+                if field not in _OWN_FIELDS and value not in (None, '') and not article.get(field):
+                    article[field] = value
+        merged[key] = article
+    return list(merged.values())
+
+
+def seen_before(article: Dict, seen: Set[str]) -> bool:
+    """
+    记录的任一标识符（PMID / DOI / 标题）出现在已见集合中即视为已见过
+    """
+    return any(identifier in seen for identifier in record_identifiers(article))
+
+
+def load_results(json_path: str) -> List[Dict]:
+    """
+    读取上次保存的JSON结果（转换为 Article 记录），文件不存在时返回空列表
+    """
+    if not os.path.exists(json_path):
+        return []
+    with open(json_path, 'r', encoding='utf-8') as f:
+        return [Article.from_dict(record) for record in json.load(f)]
+
+
+class CrawlState:
+    """
+    持久化的增量爬取状态（JSON文件）
+    每个数据源一项：{'last_crawl': 'YYYY-MM-DD', 'seen_ids': [...]}
+    """
+
+    def __init__(self, path: str = DEFAULT_STATE_PATH):
+        self.path = path
+        self.sources: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.sources = json.load(f)
+
+    def last_crawl(self, source: str) -> Optional[date]:
+        value = self.sources.get(source, {}).get('last_crawl')
+        return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+    def reldate(self, source: str) -> Optional[int]:
+        """
+        距上次爬取的天数（多算1天作为重叠窗口），用于PubMed的 reldate 参数
+        从未爬取过时返回 None
+        """
+        last = self.last_crawl(source)
+        if last is None:
+            return None
+        return (date.today() - last).days + 1
+
+    def from_date(self, source: str) -> Optional[str]:
+        """
+        上次爬取日期，用于Crossref的 from-update-date 过滤器
+        """
+        last = self.last_crawl(source)
+        return last.isoformat() if last else None
+
+    def seen(self, source: str) -> Set[str]:
+        return set(self.sources.get(source, {}).get('seen_ids', []))
+
+    def mark(self, source: str, articles: Iterable[Dict], crawl_date: Optional[date] = None) -> int:
+        """
+        记录本次爬取的日期和记录的全部标识符，返回新出现的记录数
+        """
+        entry = self.sources.setdefault(source, {'last_crawl': None, 'seen_ids': []})
+        seen = set(entry['seen_ids'])
+        new_count = 0
+        for article in articles:
+            identifiers = record_identifiers(article)
+            if identifiers and seen.isdisjoint(identifiers):
+                new_count += 1
+            seen.update(identifiers)
+        entry['seen_ids'] = sorted(seen)
+        entry['last_crawl'] = (crawl_date or date.today()).isoformat()
+        return new_count
+
+    def save(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.sources, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
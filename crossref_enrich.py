@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Crossref DOI批量补全
+PubMed esummary 记录没有摘要，Google Scholar 结果没有DOI。
+收集全部结果的DOI（Scholar结果从链接中提取），每次用一个多值 filter=doi:...,doi:... 请求解析一批，
+select 只取需要的字段，再按规范化DOI做哈希连接，把摘要、ISSN、出版日期和被引次数补进已有记录。
+1万条记录约需几十个请求，而不是逐条查询或按期刊重新检索
+"""
+
+import re
+from typing import Dict, Iterable, Sequence
+from urllib.parse import urlparse
+
+import requests
+
+from dedup_index import normalize_doi
+
+CROSSREF_WORKS_URL = 'https://api.crossref.org/works'
+
+# 单个请求解析的DOI数（URL长度受限，请求被拒绝时自动减半）
+DOI_BATCH = 200
+
+# 只请求需要的字段
+SELECT_FIELDS = 'DOI,abstract,ISSN,published,published-print,published-online,is-referenced-by-count'
+
+# Nature 文章页链接中的文章号即 10.1038/ 之后的DOI后缀
+_NATURE_ARTICLE_RE = re.compile(r'^/articles/([a-z0-9.\-]+)$', re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]+>')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def record_doi(record: Dict) -> str:
+    """
+    记录的规范化DOI；没有 doi 字段时从 elocationid 或文章链接中提取
+    """
+    doi = normalize_doi(record.get('doi') or '') or normalize_doi(record.get('elocationid') or '')
+    if doi:
+        return doi
+    for field in ('link', 'url'):
+        link = record.get(field) or ''
+        if not link:
+            continue
+        parsed = urlparse(link)
+        doi = normalize_doi(parsed.path)
+        if doi:
+            return doi
+        match = _NATURE_ARTICLE_RE.match(parsed.path)
+        if match and parsed.hostname and parsed.hostname.endswith('nature.com'):
+            return f'10.1038/{match.group(1).lower()}'
+    return ''
+
+
+def fill_dois(records: Iterable[Dict]) -> int:
+    """
+    为没有 doi 字段的记录补上从 elocationid 或文章链接中提取的DOI（不访问网络），返回补上的条数
+    在去重之前调用，Scholar结果就能按DOI与同一文章的PubMed记录识别为重复
+    """
+    filled = 0
+    for record in records:
+        if record.get('doi'):
+            continue
+        doi = record_doi(record)
+        if doi:
+            record['doi'] = doi
+            filled += 1
+    return filled
+
+
+def _date(item: Dict) -> str:
+    for key in ('published', 'published-print', 'published-online'):
+        parts = (item.get(key) or {}).get('date-parts', [[]])[0]
+        if parts and parts[0]:
+            return '-'.join(f'{p:02d}' if i else str(p) for i, p in enumerate(parts))
+    return ''
+
+
+def _abstract(item: Dict) -> str:
+    """
+    去掉Crossref摘要中的JATS标签
+    """
+    return _SPACE_RE.sub(' ', _TAG_RE.sub(' ', item.get('abstract') or '')).strip()
+
+
+class CrossrefEnricher:
+    """
+    批量解析DOI并补全记录
+    只填充记录中缺失的字段，已有的摘要等不会被覆盖
+    """
+
+    def __init__(self, transport, works_url: str = CROSSREF_WORKS_URL, batch_size: int = DOI_BATCH):
+        self.transport = transport
+        self.works_url = works_url
+        self.batch_size = batch_size
+        self.requests = 0
+        self.errors = 0
+
+    def fetch(self, dois: Sequence[str]) -> Dict[str, Dict]:
+        """
+        批量解析DOI，返回 {规范化DOI: 补全字段}
+        请求因URL过长被拒绝（400 / 414）时批次减半重试
+        """
+        table: Dict[str, Dict] = {}
+        start = 0
+        while start < len(dois):
+            batch = dois[start:start + self.batch_size]
+            params = {
+                'filter': ','.join(f'doi:{doi}' for doi in batch),
+                'select': SELECT_FIELDS,
+                'rows': len(batch),
+            }
+            self.requests += 1
+            try:
+                response = self.transport.get(self.works_url, params=params, timeout=60)
+            except requests.HTTPError as e:
+                status = e.response.status_code if e.response is not None else None
+                if status in (400, 414) and self.batch_size > 1:
+                    self.batch_size = max(1, self.batch_size // 2)
+                    print(f"  ⚠️  Crossref拒绝了 {len(batch)} 个DOI的请求，批次缩小到 {self.batch_size}")
+                    continue
+                print(f"  ✗ Crossref批量解析错误: {e}")
+                self.errors += 1
+                start += len(batch)
+                continue
+            except Exception as e:
+                print(f"  ✗ Crossref批量解析错误: {e}")
+                self.errors += 1
+                start += len(batch)
+                continue
+
+            for item in response.json().get('message', {}).get('items', []):
+                doi = normalize_doi(item.get('DOI', ''))
+                if doi:
+                    table[doi] = {
+                        'abstract': _abstract(item),
+                        'issn': '; '.join(item.get('ISSN') or []),
+                        'published_date': _date(item),
+                        'citation_count': item.get('is-referenced-by-count'),
+                    }
+            start += len(batch)
+        return table
+
+    def enrich(self, records: Iterable[Dict]) -> int:
+        """
+        补全记录（原地修改），返回补全的记录数
+        """
+        records = list(records)
+        keys = [record_doi(record) for record in records]
+        dois = list(dict.fromkeys(doi for doi in keys if doi))
+        if not dois:
+            return 0
+        print(f"正在通过Crossref补全 {len(dois)} 个DOI...")
+        table = self.fetch(dois)
+
+        enriched = 0
+        for record, doi in zip(records, keys):
+            fields = table.get(doi)
+            if fields is None:
+                continue
+            if not record.get('doi'):
+                record['doi'] = doi
+            for key, value in fields.items():
+                if value not in (None, '') and not record.get(key):
+                    record[key] = value
+            enriched += 1
+        print(f"✓ Crossref补全 {enriched} 篇（{self.requests} 个请求，未找到 {len(dois) - len(table)} 个DOI）")
+        return enriched
+
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+统一的基于标识符的去重索引
+对DOI、PMID和标题分别规范化，任一标识符相同即视为同一篇文章，
+用并查集把通过不同标识符关联的记录合并成同一个聚类
+各爬虫、merge_results.py 和 cleanCSV.py 共用，每条记录 O(1) 流式判断
+"""
+
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import tempfile
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from near_dup import normalize_text
+
+_DOI_RE = re.compile(r'10\.\d{4,9}/\S+', re.IGNORECASE)
+_DOI_PREFIX_RE = re.compile(r'^(doi:\s*|https?://(dx\.)?doi\.org/|(dx\.)?doi\.org/)', re.IGNORECASE)
+_PMID_RE = re.compile(r'\d+')
+
+
+def record_field(record: Dict, name: str) -> str:
+    """
+    按 name / NAME / Name 读取字段，兼容脚本输出与数据库导出的列名
+    pandas 读入的 NaN 和浮点型ID 一并处理
+    """
+    for key in (name, name.upper(), name.capitalize()):
+        value = record.get(key)
+        if value is None:
+            continue
+        if isinstance(value, float):
+            if math.isnan(value):
+                continue
+            if value.is_integer():
+                value = int(value)
+        value = str(value).strip()
+        if value:
+            return value
+    return ''
+
+
+def normalize_doi(value: str) -> str:
+    """
+    规范化DOI：去掉 doi:、https://doi.org/ 前缀，统一小写，
+    支持 esummary 的 elocationid（如 "doi: 10.1038/xxx. pii: S..."）
+    """
+    if not value:
+        return ''
+    value = _DOI_PREFIX_RE.sub('', value.strip())
+    match = _DOI_RE.search(value)
+    if not match:
+        return ''
+    return match.group(0).rstrip('.,;').lower()
+
+
+def normalize_pmid(value: str) -> str:
+    """
+    规范化PMID：只保留数字，去掉前导零
+    """
+    match = _PMID_RE.search(value or '')
+    return str(int(match.group(0))) if match else ''
+
+
+def normalize_title(value: str) -> str:
+    """
+    规范化标题：去HTML、截断省略号、标点，统一小写和空白
+    """
+    return normalize_text(value or '')
+
+
+def record_identifiers(record: Dict) -> List[str]:
+    """
+    提取记录的全部规范化标识符，DOI 兼看 elocationid
+    """
+    identifiers = []
+    doi = normalize_doi(record_field(record, 'doi')) or normalize_doi(record_field(record, 'elocationid'))
+    if doi:
+        identifiers.append(f'doi:{doi}')
+    pmid = normalize_pmid(record_field(record, 'pmid'))
+    if pmid:
+        identifiers.append(f'pmid:{pmid}')
+    title = normalize_title(record_field(record, 'title'))
+    if title:
+        identifiers.append(f'title:{title}')
+    return identifiers
+
+
+class DedupIndex:
+    """
+    流式去重索引
+    add(record) 返回 True 表示首次出现，False 表示与已有记录重复
+    """
+
+    def __init__(self):
+        self._owner: Dict[str, int] = {}
+        self._parent: List[int] = []
+
+    def _find(self, node: int) -> int:
+        root = node
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[node] != root:
+            self._parent[node], node = root, self._parent[node]
+        return root
+
+    def add(self, record: Dict) -> bool:
+        identifiers = record_identifiers(record)
+        if not identifiers:
+            return False
+
+        roots = {self._find(self._owner[i]) for i in identifiers if i in self._owner}
+        if roots:
+            # 保留最早的聚类作为代表，把其他聚类并入
+            root = min(roots)
+            for other in roots:
+                self._parent[other] = root
+        else:
+            root = len(self._parent)
+            self._parent.append(root)
+
+        for identifier in identifiers:
+            self._owner.setdefault(identifier, root)
+        return not roots
+
+    def cluster_of(self, record: Dict) -> Optional[int]:
+        """
+        返回记录所属聚类编号（未加入过时返回 None）
+        """
+        for identifier in record_identifiers(record):
+            if identifier in self._owner:
+                return self._find(self._owner[identifier])
+        return None
+
+    def __contains__(self, record: Dict) -> bool:
+        return self.cluster_of(record) is not None
+
+    def __len__(self) -> int:
+        return sum(1 for node, parent in enumerate(self._parent) if node == parent)
+
+    def filter(self, records: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        流式过滤：只放行首次出现的记录
+        """
+        for record in records:
+            if self.add(record):
+                yield record
+
+
+class DiskDedupIndex:
+    """
+    磁盘上的去重集合，用于超大文件的流式合并
+    每个标识符只保存8字节哈希，存放在SQLite中，内存占用与输入规模无关
+    只判断是否重复，不维护聚类
+    """
+
+    def __init__(self, path: Optional[str] = None, commit_every: int = 10000):
+        self._temp_path = None
+        if path is None:
+            fd, path = tempfile.mkstemp(suffix='.sqlite', prefix='dedup_')
+            os.close(fd)
+            self._temp_path = path
+        self.commit_every = commit_every
+        self._pending = 0
+        self._conn = sqlite3.connect(path)
+        self._conn.execute('PRAGMA journal_mode=OFF')
+        self._conn.execute('PRAGMA synchronous=OFF')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS seen (digest BLOB PRIMARY KEY) WITHOUT ROWID')
+
+    @staticmethod
+    def _digest(identifier: str) -> bytes:
+        return hashlib.blake2b(identifier.encode('utf-8'), digest_size=8).digest()
+
+    def add(self, record: Dict) -> bool:
+        digests = [self._digest(i) for i in record_identifiers(record)]
+        if not digests:
+            return False
+        placeholders = ','.join('?' * len(digests))
+        duplicate = self._conn.execute(
+            f'SELECT 1 FROM seen WHERE digest IN ({placeholders}) LIMIT 1', digests
+        ).fetchone() is not None
+        self._conn.executemany('INSERT OR IGNORE INTO seen VALUES (?)', [(d,) for d in digests])
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self._conn.commit()
+            self._pending = 0
+        return not duplicate
+
+    def filter(self, records: Iterable[Dict]) -> Iterator[Dict]:
+        for record in records:
+            if self.add(record):
+                yield record
+
+    def close(self):
+        self._conn.close()
+        if self._temp_path and os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
+
+
+def deduplicate(records: Iterable[Dict], index: Optional[DedupIndex] = None) -> List[Dict]:
+    """
+    去重并保持原有顺序
+    """
+    return list((index or DedupIndex()).filter(records))
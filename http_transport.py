@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+共享HTTP传输层
+- 基于 requests.Session 的长连接池（每个主机一个连接池）
+- 429/5xx 与网络错误自动重试，带抖动的指数退避
+- 遵守 Retry-After 响应头（超过 retry_after_max 秒时不再等待，直接放弃）
+- 按主机熔断，连续失败（网络错误和5xx，不含429）后暂停对该主机的请求
+- 请求前从共享限速器取令牌
+- GET 响应写入共享磁盘缓存，过期后带 ETag/Last-Modified 重新验证
+- 每次请求的延迟、字节数、重试、限速等待和缓存命中写入共享指标表
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import Metrics, get_metrics
+from rate_limiter import HostRateLimiter, get_rate_limiter
+from response_cache import ResponseCache, cache_key, cacheable, get_response_cache
+
+# 需要重试的HTTP状态码
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(requests.RequestException):
+    """目标主机处于熔断状态"""
+
+
+class CircuitBreaker:
+    """
+    单个主机的熔断器
+    连续失败 failure_threshold 次后打开，reset_timeout 秒后放行一次试探请求
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # 半开状态：放行一次，失败则重新计时
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析 Retry-After 头，支持秒数和HTTP日期两种格式
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class HttpTransport:
+    """
+    所有爬虫类共用的HTTP客户端
+    """
+
+    def __init__(self, max_retries: int = 4, backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 pool_maxsize: int = 10, failure_threshold: int = 5, reset_timeout: float = 60.0,
+                 rate_limiter: Optional[HostRateLimiter] = None, cache: Optional[ResponseCache] = None,
+                 metrics: Optional[Metrics] = None, retry_after_max: Optional[float] = None):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # 服务器要求等待的时间超过此值时放弃重试，避免一个工作线程被阻塞数小时
+        self.retry_after_max = backoff_max if retry_after_max is None else retry_after_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.cache = cache
+        self.metrics = metrics or get_metrics()
+
+        # urllib3 为每个主机维护独立的连接池，连接在请求之间保持复用
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self._breakers[host]
+
+    def backoff_delay(self, attempt: int) -> float:
+        """
+        带完全抖动的指数退避
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        发送请求，优先使用缓存
+        未过期的缓存直接返回；已过期的发起条件请求，304时沿用缓存正文
+        流式请求（stream=True）、带分页游标的请求及 use_cache=False 的请求不经过缓存
+        """
+        use_cache = kwargs.pop('use_cache', True) and cacheable(url, kwargs.get('params'))
+        cache = self.cache if use_cache and method.upper() == 'GET' and not kwargs.get('stream') else None
+        if cache is None:
+            return self._send(method, url, **kwargs)
+
+        key = cache_key(method, url, kwargs.get('params'))
+        entry = cache.get(key)
+        if entry is not None and entry.fresh:
+            self.metrics.record_cache('hit')
+            return entry.to_response()
+        if entry is not None:
+            kwargs['headers'] = {**(kwargs.get('headers') or {}), **entry.validators()}
+
+        response = self._send(method, url, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            self.metrics.record_cache('revalidated')
+            cache.refresh(key, entry, url)
+            return entry.to_response()
+        self.metrics.record_cache('miss')
+        if response.status_code == 200:
+            cache.store(key, response, url)
+        return response
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        发送请求，失败时按策略重试
+        重试耗尽后抛出异常，而不是返回错误响应
+        """
+        host = urlparse(url).hostname or url
+        breaker = self.breaker(host)
+        kwargs.setdefault('timeout', 30)
+
+        metrics = self.metrics
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                metrics.record_error(host, 'circuit_open')
+                raise CircuitOpenError(f"{host} 连续失败，已熔断")
+
+            metrics.record_wait(host, self.rate_limiter.acquire(host))
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                metrics.record_request(host, method, e.__class__.__name__, time.perf_counter() - start, 0)
+                breaker.record_failure()
+                if attempt >= self.max_retries:
+                    metrics.record_error(host, e.__class__.__name__)
+                    raise
+                metrics.record_retry(host, e.__class__.__name__)
+                delay = self.backoff_delay(attempt)
+                print(f"  ⟳ {host} 网络错误({e.__class__.__name__})，{delay:.1f}秒后重试...")
+            else:
+                # 流式响应的正文尚未读取，按 Content-Length 计字节数
+                nbytes = (int(response.headers.get('Content-Length') or 0) if kwargs.get('stream')
+                          else len(response.content))
+                metrics.record_request(host, method, response.status_code, time.perf_counter() - start, nbytes)
+                if response.status_code not in RETRY_STATUSES:
+                    breaker.record_success()
+                    response.raise_for_status()
+                    return response
+
+                # 429 表示限流而非主机故障，由 Retry-After / 退避处理，不计入熔断
+                if response.status_code != 429:
+                    breaker.record_failure()
+                if attempt >= self.max_retries:
+                    metrics.record_error(host, str(response.status_code))
+                    response.raise_for_status()
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                if retry_after is not None and retry_after > self.retry_after_max:
+                    metrics.record_error(host, 'retry_after')
+                    print(f"  ✗ {host} 要求 {retry_after:.0f} 秒后重试，超过上限 {self.retry_after_max:.0f} 秒，放弃")
+                    response.raise_for_status()
+                metrics.record_retry(host, response.status_code)
+                delay = retry_after if retry_after is not None else self.backoff_delay(attempt)
+                print(f"  ⟳ {host} 返回 {response.status_code}，{delay:.1f}秒后重试...")
+                response.close()
+
+            attempt += 1
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+
+_shared_transport: Optional[HttpTransport] = None
+_shared_lock = threading.Lock()
+
+
+def get_transport() -> HttpTransport:
+    """
+    获取进程内共享的传输层
+    """
+    global _shared_transport
+    with _shared_lock:
+        if _shared_transport is None:
+            _shared_transport = HttpTransport(cache=get_response_cache())
+        return _shared_transport
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+批量任务运行器
+在一个进程中执行任务清单（JSON / YAML）中的多组检索（年份 × 期刊 × 关键词 × 数据源），
+所有任务共用连接池、响应缓存、PMID记录缓存和去重索引：
+- 多个任务检索到同一篇PubMed文章时只 efetch 一次
+- 完全相同的检索（检索计划、Crossref期刊 + 关键词、Scholar期刊、RSS源）只执行一次
+- 每个任务单独输出，另输出所有任务合并去重后的结果
+
+任务清单示例（JSON）:
+  {
+    "output_dir": "/mnt/user-data/outputs/jobs",
+    "defaults": {"years": [2025], "sources": ["pubmed", "crossref"]},
+    "jobs": [
+      {"name": "medical_ml", "years": [2024, 2025]},
+      {"name": "radiology_dl", "journals": ["Nature Medicine", "Cell Reports Medicine"],
+       "topic": "(deep learning) AND (radiology OR imaging)", "keywords": ["deep learning", "radiology"]}
+    ]
+  }
+
+使用方法:
+  python job_runner.py jobs.json
+  python job_runner.py jobs.yaml --formats csv json jsonl
+"""
+
+import argparse
+import json
+import os
+from typing import Callable, Dict, List, Optional, Sequence
+
+from article import FIELDS
+from combined_scraper import ScholarPubMedScraper
+from dedup_index import DedupIndex, deduplicate
+from journalScraper import JournalScraper
+from metrics import get_metrics
+from output_sinks import open_sinks
+from search_defaults import CROSSREF_KEYWORDS, JOURNAL_FAMILIES, SOURCES
+from subscription_scraper import SubscriptionScraper, parse_feed
+
+DEFAULT_OUTPUT_DIR = '/mnt/user-data/outputs/jobs'
+
+
+def load_spec(path: str) -> Dict:
+    """
+    读取任务清单，.yaml / .yml 需要 PyYAML
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            # PyYAML 为可选依赖，只在需要时导入
+            import yaml
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def normalize_jobs(spec: Dict) -> List[Dict]:
+    """
+    把每个任务补全为完整参数（缺省值取自 defaults，再取内置默认值）
+    journals 可以是期刊列表，也可以是 {系列: [期刊]} 字典
+    """
+    defaults = spec.get('defaults', {})
+    jobs = []
+    for i, raw in enumerate(spec.get('jobs', [])):
+        job = {**defaults, **raw}
+        journals = job.get('journals') or JOURNAL_FAMILIES
+        if isinstance(journals, dict):
+            journals = [journal for family in journals.values() for journal in family]
+        sources = job.get('sources') or ['pubmed', 'crossref']
+        unknown = set(sources) - set(SOURCES)
+        if unknown:
+            raise ValueError(f"任务 {raw.get('name', i)} 包含未知的数据源: {', '.join(sorted(unknown))}")
+        years = job.get('years') or [job.get('year', 2025)]
+        jobs.append({
+            'name': job.get('name') or f'job{i + 1}',
+            'years': [int(year) for year in years],
+            'journals': list(journals),
+            'keywords': list(job.get('keywords') or CROSSREF_KEYWORDS),
+            'topic': job.get('topic') or JournalScraper.TOPIC_QUERY,
+            'scholar_topic': job.get('scholar_topic') or ScholarPubMedScraper.SCHOLAR_TOPIC,
+            'sources': list(sources),
+        })
+    names = [job['name'] for job in jobs]
+    if len(set(names)) != len(names):
+        raise ValueError('任务名不能重复')
+    return jobs
+
+
+class JobRunner:
+    """
+    依次执行任务清单中的全部任务，跨任务复用已完成的检索和已获取的记录
+    """
+
+    def __init__(self, spec: Dict, output_dir: Optional[str] = None, formats: Optional[Sequence[str]] = None,
+                 serpapi_key: Optional[str] = None):
+        self.jobs = normalize_jobs(spec)
+        self.output_dir = output_dir or spec.get('output_dir', DEFAULT_OUTPUT_DIR)
+        self.formats = list(formats or spec.get('formats') or ('csv', 'json'))
+        self.combined_name = spec.get('combined', 'all_jobs')
+        self.serpapi_key = serpapi_key or spec.get('serpapi_key') or os.environ.get('SERPAPI_KEY')
+
+        # 三个爬虫共用进程内的连接池、响应缓存和限速器
+        self.journal = JournalScraper()
+        self.combined = ScholarPubMedScraper()
+        self.subscription = SubscriptionScraper()
+        self.metrics = get_metrics()
+
+        # PMID -> 文章记录，以及已完成检索的结果
+        self.pmid_cache: Dict[str, Dict] = {}
+        self._memo: Dict[str, object] = {}
+        self.reused_pmids = 0
+        self.reused_searches = 0
+        self.combined_index = DedupIndex()
+
+    @property
+    def errors(self) -> int:
+        return self.journal.errors + self.combined.errors + self.subscription.errors
+
+    def _reuse(self, key: str, compute: Callable[[], object]):
+        """
+        相同的检索只执行一次；执行中出现错误的结果不保存，下一个任务会重试
+        """
+        if key in self._memo:
+            self.reused_searches += 1
+            return self._memo[key]
+        errors_before = self.errors
+        result = compute()
+        if self.errors == errors_before:
+            self._memo[key] = result
+        return result
+
+    def resolve_pmids(self, id_list: Sequence[str]) -> List[Dict]:
+        """
+        按PMID取回记录，只 efetch 缓存中没有的部分
+        """
+        missing = [pmid for pmid in dict.fromkeys(id_list) if pmid not in self.pmid_cache]
+        self.reused_pmids += len(id_list) - len(missing)
+        if missing:
+            for article in self.journal.iter_pubmed_ids(missing):
+                self.pmid_cache[article['pmid']] = article
+        return [self.pmid_cache[pmid] for pmid in id_list if pmid in self.pmid_cache]
+
+    def _pubmed(self, job: Dict, year: int) -> List[Dict]:
+        scraper = self.journal
+        probe = scraper.pubmed_probe(year, job['topic'])
+        plan_key = f"pubmed-plan:{year}:{job['topic']}:{'|'.join(job['journals'])}"
+        shards = self._reuse(plan_key, lambda: scraper.plan_pubmed(job['journals'], year, probe=probe))
+
+        articles = []
+        for shard in shards:
+            try:
+                ids = self._reuse(f"pubmed-ids:{year}:{job['topic']}:{shard.key}",
+                                  lambda: scraper.pubmed_ids(shard, probe))
+                found = self.resolve_pmids(ids)
+                print(f"  {shard.label}: {len(found)} 篇")
+                articles.extend(found)
+            except Exception as e:
+                print(f"  ✗ {shard.label} PubMed错误: {e}")
+                scraper.errors += 1
+        return articles
+
+    def _crossref(self, job: Dict, year: int) -> List[Dict]:
+        articles = []
+        for journal in job['journals']:
+            key = f"crossref:{year}:{journal}:{'|'.join(job['keywords'])}"
+            articles.extend(self._reuse(key, lambda: self.journal.search_crossref(journal, job['keywords'], year)))
+        return articles
+
+    def _scholar(self, job: Dict, year: int) -> List[Dict]:
+        if not self.serpapi_key:
+            print("  ⚠️  未设置 SERPAPI_KEY，跳过 Google Scholar")
+            return []
+        scraper = self.combined
+        articles = []
+        for journal in job['journals']:
+            def search():
+                try:
+                    return scraper.search_google_scholar_journal(journal, year, self.serpapi_key,
+                                                                 job['scholar_topic'])
+                except Exception as e:
+                    print(f"  ✗ {journal} Google Scholar错误: {e}")
+                    scraper.errors += 1
+                    return []
+            articles.extend(self._reuse(f"scholar:{year}:{journal}:{job['scholar_topic']}", search))
+        return articles
+
+    def _rss(self, job: Dict) -> List[Dict]:
+        """
+        RSS只有最新文章，与年份无关；每个源只下载一次，按各任务的关键词分别筛选
+        """
+        scraper = self.subscription
+        articles = []
+        for feeds, doi_field in ((scraper.NATURE_FEEDS, 'prism_doi'), (scraper.SCIENCE_FEEDS, 'dc_identifier')):
+            for journal, url in feeds.items():
+                if journal not in job['journals']:
+                    continue
+                body = self._reuse(f'rss:{url}', lambda: scraper.fetch_feed(journal, url))
+                if body is not None:
+                    articles.extend(parse_feed(journal, body, doi_field, job['keywords']))
+        return articles
+
+    def run_job(self, job: Dict) -> List[Dict]:
+        """
+        执行一个任务，返回去重后的结果（PubMed在前）
+        """
+        records = []
+        for year in job['years']:
+            if 'pubmed' in job['sources']:
+                print(f"\n--- PubMed {year} ---")
+                records.extend(self._emit(self._pubmed(job, year), 'PubMed'))
+            if 'crossref' in job['sources']:
+                print(f"\n--- Crossref {year} ---")
+                records.extend(self._emit(self._crossref(job, year), 'Crossref'))
+            if 'scholar' in job['sources']:
+                print(f"\n--- Google Scholar {year} ---")
+                records.extend(self._emit(self._scholar(job, year), 'Google Scholar'))
+        if 'rss' in job['sources']:
+            print("\n--- RSS ---")
+            records.extend(self._emit(self._rss(job), 'RSS'))
+        return deduplicate(records)
+
+    def _emit(self, articles: List[Dict], source: str) -> List[Dict]:
+        self.metrics.record_articles(source, articles)
+        return articles
+
+    def _sinks(self, name: str):
+        return open_sinks(os.path.join(self.output_dir, f'{name}.csv'), FIELDS, self.formats,
+                          encoding='utf-8-sig', batch_size=1000)
+
+    def run(self) -> Dict[str, int]:
+        """
+        执行全部任务，返回各任务的结果数
+        """
+        counts = {}
+        with self._sinks(self.combined_name) as combined:
+            for job in self.jobs:
+                print("=" * 60)
+                print(f"任务 {job['name']}: {job['years']} 年，{len(job['journals'])} 个期刊，"
+                      f"数据源 {', '.join(job['sources'])}")
+                print("=" * 60)
+                with self.metrics.stage(f"job:{job['name']}"):
+                    records = self.run_job(job)
+                with self._sinks(job['name']) as sink:
+                    sink.write_many(records)
+                combined.write_many(self.combined_index.filter(records))
+                counts[job['name']] = len(records)
+                print(f"✓ 任务 {job['name']}: {len(records)} 篇 → {', '.join(sink.paths)}")
+
+        print("\n" + "=" * 60)
+        print("📊 批量任务统计")
+        print("=" * 60)
+        for name, count in counts.items():
+            print(f"  {name}: {count} 篇")
+        print(f"  合并去重后: {combined.count} 篇 → {', '.join(combined.paths)}")
+        print(f"  复用检索: {self.reused_searches} 次，复用PubMed记录: {self.reused_pmids} 篇")
+        if self.errors:
+            print(f"⚠️  {self.errors} 个请求失败，结果可能不完整")
+        return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='批量执行任务清单中的检索')
+    parser.add_argument('spec', help='任务清单（.json / .yaml）')
+    parser.add_argument('--output-dir', default=None, help='输出目录（默认取任务清单中的 output_dir）')
+    parser.add_argument('--formats', nargs='+', default=None, help='输出格式（默认取任务清单中的 formats，或 csv json）',
+                        choices=['csv', 'json', 'jsonl', 'parquet'])
+    parser.add_argument('--metrics', default=None, help='把请求与记录统计另存为JSON')
+    args = parser.parse_args()
+
+    runner = JobRunner(load_spec(args.spec), args.output_dir, args.formats)
+    runner.run()
+    runner.metrics.print_summary()
+    if args.metrics:
+        runner.metrics.export(runner.output_dir, args.metrics)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,223 +5,546 @@
 """
 
 import requests
-import json
-import time
 from datetime import datetime
-import csv
 import os
-from typing import List, Dict
+import threading
+from typing import List, Dict, Iterator, Sequence, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+from article import Article
+from checkpoint import DONE, NEW, close_checkpoint, open_checkpoint
+from crawl_state import CrawlState, load_results, merge_records
+from dedup_index import deduplicate
+from http_transport import get_transport
+from keyword_matcher import compile_keywords
+from metrics import get_metrics
+from output_sinks import StreamWriter, open_sinks
+from pubmed_ids import PubMedIdResolver
+from query_planner import (ESEARCH_MAX, EsearchProbe, QueryPlanner, QueryShard, journal_clause, print_plan,
+                           search_window)
+from rate_limiter import get_rate_limiter
+from search_defaults import CROSSREF_KEYWORDS, JOURNAL_FAMILIES
+from search_index import update_index
 
 class JournalScraper:
-    def __init__(self):
+    # 并发模式下每个主机的最大并发请求数，请求速率由共享限速器控制
+    PUBMED_MAX_WORKERS = 3
+    CROSSREF_MAX_WORKERS = 5
+
+    # Crossref单页最大行数，以及search_crossref默认获取的记录上限
+    CROSSREF_MAX_ROWS = 1000
+    CROSSREF_MAX_RECORDS = 1000
+
+    # efetch 每批的初始记录数（之后按响应时间和大小自动调整）
+    EFETCH_PAGE_SIZE = 500
+
+    PUBMED_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
+    CROSSREF_WORKS_URL = "https://api.crossref.org/works"
+
+    OUTPUT_DIR = '/mnt/user-data/outputs'
+    CSV_FIELDS = ['title', 'authors', 'journal', 'pub_date', 'doi', 'pmid', 'url', 'abstract', 'mesh_terms']
+
+    # 默认输出文件名前缀（{前缀}_{年份}.csv / .json），增量模式读取同名JSON作为上次的结果
+    RESULTS_NAME = 'medical_ml_articles'
+
+    # PubMed检索式中的主题部分
+    TOPIC_QUERY = ('(machine learning OR deep learning OR artificial intelligence) '
+                   'AND (medical OR clinical OR diagnosis OR prediction)')
+
+    def __init__(self, ncbi_api_key: str = None):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
         self.results = []
+        self.year = 2025
+        self.errors = 0
+        self._errors_lock = threading.Lock()
+        self.stream = None
+        self.checkpoint = None
+        self.pubmed_tuners = {}
+        self.rate_limiter = get_rate_limiter()
+        self.transport = get_transport()
+        self.metrics = get_metrics()
+        self.ncbi_api_key = ncbi_api_key or os.environ.get('NCBI_API_KEY')
+        if self.ncbi_api_key:
+            self.rate_limiter.set_ncbi_api_key(self.ncbi_api_key)
+
+    def _record_error(self):
+        """
+        错误计数加一；各数据源在线程池中并发执行，计数需加锁
+        """
+        with self._errors_lock:
+            self.errors += 1
+
+    def _ncbi_params(self, params: Dict) -> Dict:
+        """
+        有API key时附加到E-utilities请求参数中
+        """
+        if self.ncbi_api_key:
+            params['api_key'] = self.ncbi_api_key
+        return params
         
-    def search_pubmed(self, query: str, year: int = 2025) -> List[Dict]:
+    def iter_pubmed(self, query: str, year: int = 2025, reldate: int = None) -> Iterator[Dict]:
         """
-        使用PubMed API搜索文章
-        PubMed是合法的公开数据库
+        esearch 获取全部ID后用 epost 提交，再分批 efetch，
+        边下载边用 iterparse 解析XML，逐篇生成包含摘要和MeSH主题词的文章
+        reldate 不为空时只检索最近 reldate 天内收录（edat）的记录
         """
-        base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
+        base_url = self.PUBMED_BASE_URL
         
         # 第一步：搜索获取ID列表
         search_url = f"{base_url}esearch.fcgi"
         search_params = {
             'db': 'pubmed',
             'term': query,
-            'retmax': 100,
+            'retmax': ESEARCH_MAX,
             'retmode': 'json',
             'sort': 'pub_date',
             'mindate': f'{year}/01/01',
             'maxdate': f'{year}/12/31'
         }
+        if reldate:
+            # 增量模式：按收录日期过滤，年份限制由检索式中的[PDAT]保证
+            del search_params['mindate'], search_params['maxdate']
+            search_params.update({'datetype': 'edat', 'reldate': reldate})
+        
+        response = self.transport.get(search_url, params=self._ncbi_params(search_params), timeout=30)
+        search_data = response.json()
         
+        id_list = search_data.get('esearchresult', {}).get('idlist', [])
+        print(f"找到 {len(id_list)} 篇文章")
+        
+        # 第二步：获取完整记录（全部ID，批次自动调整）
+        yield from self.iter_pubmed_ids(id_list)
+
+    def id_resolver(self) -> PubMedIdResolver:
+        """
+        按PMID批量取回记录，批次调节器在同一爬虫实例的多次调用间共享
+        """
+        return PubMedIdResolver(self.transport, self.PUBMED_BASE_URL, self._ncbi_params, self.pubmed_tuners,
+                                self.EFETCH_PAGE_SIZE)
+
+    def _restore(self, unit: str) -> Tuple[str, Dict, List[Dict]]:
+        """
+        从检查点恢复工作单元，返回 (状态, 进度, 已保存的记录)
+        """
+        if self.checkpoint is None:
+            return NEW, {}, []
+        status, progress = self.checkpoint.state(unit)
+        records = self.checkpoint.records(unit) if status != NEW else []
+        return status, progress, records
+
+    def search_pubmed(self, query: str, year: int = 2025, reldate: int = None) -> List[Dict]:
+        """
+        使用PubMed API搜索文章
+        PubMed是合法的公开数据库
+        开启检查点时，已完成的检索式直接读取保存的结果
+        """
         print(f"正在搜索: {query}")
-        time.sleep(0.5)  # 遵守API使用规范
+        
+        unit = f'pubmed:{year}:{reldate or 0}:{query}'
+        status, _, restored = self._restore(unit)
+        if status == DONE:
+            print(f"↻ 检查点中已有 {len(restored)} 篇文章")
+            return restored
         
         try:
-            response = requests.get(search_url, params=search_params, timeout=30)
-            response.raise_for_status()
-            search_data = response.json()
-            
-            id_list = search_data.get('esearchresult', {}).get('idlist', [])
-            print(f"找到 {len(id_list)} 篇文章")
-            
-            if not id_list:
-                return []
-            
-            # 第二步：获取详细信息
-            fetch_url = f"{base_url}efetch.fcgi"
-            fetch_params = {
-                'db': 'pubmed',
-                'id': ','.join(id_list[:50]),  # 限制每次50篇
-                'retmode': 'xml',
-                'rettype': 'abstract'
-            }
-            
-            time.sleep(0.5)
-            response = requests.get(fetch_url, params=fetch_params, timeout=30)
-            
-            # 第三步：获取JSON格式的摘要数据
-            summary_url = f"{base_url}esummary.fcgi"
-            summary_params = {
-                'db': 'pubmed',
-                'id': ','.join(id_list[:50]),
-                'retmode': 'json'
-            }
-            
-            time.sleep(0.5)
-            response = requests.get(summary_url, params=summary_params, timeout=30)
-            response.raise_for_status()
-            summary_data = response.json()
-            
-            articles = []
-            for pmid, article_data in summary_data.get('result', {}).items():
-                if pmid == 'uids':
-                    continue
-                    
-                article = {
-                    'pmid': pmid,
-                    'title': article_data.get('title', ''),
-                    'authors': ', '.join([author.get('name', '') for author in article_data.get('authors', [])[:5]]),
-                    'journal': article_data.get('fulljournalname', ''),
-                    'pub_date': article_data.get('pubdate', ''),
-                    'doi': article_data.get('elocationid', ''),
-                    'source': article_data.get('source', ''),
-                }
-                articles.append(article)
-            
+            articles = list(self.iter_pubmed(query, year, reldate))
+            if self.checkpoint is not None:
+                self.checkpoint.complete(unit, articles)
             return articles
             
         except Exception as e:
             print(f"错误: {e}")
+            self._record_error()
             return []
     
-    def search_crossref(self, journal: str, keywords: List[str], year: int = 2025) -> List[Dict]:
+    def _parse_crossref_item(self, item: Dict) -> Dict:
         """
-        使用Crossref API搜索文章
-        Crossref是合法的开放引文数据库
+        将Crossref的work条目转换为文章字典
         """
-        base_url = "https://api.crossref.org/works"
+        authors = item.get('author', [])
+        author_names = ', '.join([f"{a.get('given', '')} {a.get('family', '')}" for a in authors[:5]])
+        
+        pub_date = item.get('published-print', item.get('published-online', {}))
+        date_parts = pub_date.get('date-parts', [[]])[0]
+        pub_date_str = '-'.join(map(str, date_parts)) if date_parts else ''
+        
+        return Article(
+            doi=item.get('DOI', ''),
+            title=(item.get('title') or [''])[0],
+            authors=author_names,
+            journal=(item.get('container-title') or [''])[0],
+            pub_date=pub_date_str,
+            abstract=item.get('abstract', ''),
+            url=f"https://doi.org/{item.get('DOI', '')}"
+        )
+
+    def iter_crossref(self, journal: str, keywords: List[str], year: int = 2025,
+                      max_records: int = None, rows: int = CROSSREF_MAX_ROWS,
+                      from_update_date: str = None) -> Iterator[Dict]:
+        """
+        使用Crossref游标（cursor=* / next-cursor）深度分页
+        每收到一页就逐条 yield，max_records 为最多获取的记录数（None 表示不限）
+        from_update_date 不为空时只获取该日期之后新增或更新的记录
+        Crossref按相关度排序而不做布尔过滤，只保留标题或摘要中出现任一关键词的记录
+        """
+        for page, _ in self.iter_crossref_pages(journal, keywords, year, max_records, rows, from_update_date):
+            yield from page
+
+    def iter_crossref_pages(self, journal: str, keywords: List[str], year: int = 2025,
+                            max_records: int = None, rows: int = CROSSREF_MAX_ROWS,
+                            from_update_date: str = None, progress: Dict = None) -> Iterator[Tuple[List[Dict], Dict]]:
+        """
+        逐页 yield (本页匹配的文章, 进度)，进度为 {'cursor': 下一页游标, 'fetched': 已获取条数, 'finished': 是否最后一页}
+        progress 为检查点中保存的进度时从该游标继续
+        """
+        base_url = self.CROSSREF_WORKS_URL
+        progress = progress or {}
         
         query = ' AND '.join(keywords)
+        matcher = compile_keywords(tuple(keywords))
         params = {
             'query.container-title': journal,
             'query': query,
             'filter': f'from-pub-date:{year},until-pub-date:{year}',
-            'rows': 50,
+            'cursor': progress.get('cursor', '*'),
             'select': 'DOI,title,author,published-print,container-title,abstract'
         }
+        if from_update_date:
+            params['filter'] += f',from-update-date:{from_update_date}'
         
+        fetched = progress.get('fetched', 0)
+        while max_records is None or fetched < max_records:
+            params['rows'] = rows if max_records is None else min(rows, max_records - fetched)
+            response = self.transport.get(base_url, params=params, headers=self.headers, timeout=60)
+            message = response.json().get('message', {})
+            items = message.get('items', [])
+            
+            page = []
+            for item in items:
+                article = self._parse_crossref_item(item)
+                if matcher.search_any((article['title'], article['abstract'])):
+                    page.append(article)
+            fetched += len(items)
+            
+            next_cursor = message.get('next-cursor')
+            finished = len(items) < params['rows'] or not next_cursor or \
+                (max_records is not None and fetched >= max_records)
+            yield page, {'cursor': next_cursor, 'fetched': fetched, 'finished': finished}
+            if finished:
+                break
+            params['cursor'] = next_cursor
+
+    def search_crossref(self, journal: str, keywords: List[str], year: int = 2025,
+                        max_records: int = None, from_update_date: str = None) -> List[Dict]:
+        """
+        使用Crossref API搜索文章
+        Crossref是合法的开放引文数据库
+        max_records 默认为 CROSSREF_MAX_RECORDS
+        """
         print(f"正在搜索 {journal} 中的相关文章...")
-        time.sleep(1)  # 遵守API使用规范
+        
+        if max_records is None:
+            max_records = self.CROSSREF_MAX_RECORDS
+        
+        # 开启检查点时每页保存一次游标和记录，重新运行从最后的游标继续
+        unit = f"crossref:{year}:{from_update_date or ''}:{journal}:{' AND '.join(keywords)}"
+        status, progress, articles = self._restore(unit)
+        if status == DONE:
+            print(f"↻ 检查点中已有 {len(articles)} 篇文章")
+            return articles
+        if articles:
+            print(f"↻ 从检查点继续（已有 {len(articles)} 篇）")
         
         try:
-            response = requests.get(base_url, params=params, headers=self.headers, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            
-            articles = []
-            for item in data.get('message', {}).get('items', []):
-                authors = item.get('author', [])
-                author_names = ', '.join([f"{a.get('given', '')} {a.get('family', '')}" for a in authors[:5]])
-                
-                pub_date = item.get('published-print', item.get('published-online', {}))
-                date_parts = pub_date.get('date-parts', [[]])[0]
-                pub_date_str = '-'.join(map(str, date_parts)) if date_parts else ''
-                
-                article = {
-                    'doi': item.get('DOI', ''),
-                    'title': item.get('title', [''])[0],
-                    'authors': author_names,
-                    'journal': item.get('container-title', [''])[0],
-                    'pub_date': pub_date_str,
-                    'abstract': item.get('abstract', ''),
-                    'url': f"https://doi.org/{item.get('DOI', '')}"
-                }
-                articles.append(article)
+            try:
+                self._crossref_pages(unit, journal, keywords, year, max_records, from_update_date, progress, articles)
+            except requests.HTTPError as e:
+                if not progress or e.response is None or e.response.status_code >= 500:
+                    raise
+                # Crossref游标数分钟不用即失效，从头重新获取该期刊
+                print("  游标已失效，重新获取...")
+                self.checkpoint.reset(unit)
+                articles.clear()
+                self._crossref_pages(unit, journal, keywords, year, max_records, from_update_date, {}, articles)
+            print(f"找到 {len(articles)} 篇文章")
+            return articles
             
+        except Exception as e:
+            print(f"错误: {e}")
+            if articles:
+                print(f"  保留已获取的 {len(articles)} 篇")
+            self._record_error()
+            return articles
+
+    def _crossref_pages(self, unit: str, journal: str, keywords: List[str], year: int, max_records: int,
+                        from_update_date: str, progress: Dict, articles: List[Dict]):
+        for page, progress in self.iter_crossref_pages(journal, keywords, year, max_records,
+                                                       from_update_date=from_update_date, progress=progress):
+            articles.extend(page)
+            if self.checkpoint is not None:
+                if progress['finished']:
+                    self.checkpoint.complete(unit, page)
+                else:
+                    self.checkpoint.advance(unit, progress, page)
+    
+    def build_pubmed_query(self, journal: str, year: int = 2025, topic: str = None) -> str:
+        """
+        构建单个期刊的PubMed检索式，topic 为主题部分（默认 TOPIC_QUERY）
+        """
+        return f'("{journal}"[Journal]) AND {topic or self.TOPIC_QUERY} AND {year}[PDAT]'
+
+    def build_group_query(self, journals: Sequence[str], year: int = 2025, topic: str = None) -> str:
+        """
+        构建一组期刊的PubMed检索式（日期窗口由检索计划通过 mindate/maxdate 传递）
+        """
+        return f'({journal_clause(journals)}) AND {topic or self.TOPIC_QUERY} AND {year}[PDAT]'
+
+    def pubmed_probe(self, year: int = 2025, topic: str = None) -> EsearchProbe:
+        return EsearchProbe(self.transport, self.PUBMED_BASE_URL,
+                            lambda journals: self.build_group_query(journals, year, topic), self._ncbi_params)
+
+    def plan_pubmed(self, journal_list: List[str], year: int = 2025, reldate: int = None,
+                    probe: EsearchProbe = None, workers: int = 1) -> List[QueryShard]:
+        """
+        先用 retmax=0 探测结果数，再合并小期刊、按日期拆分大期刊，生成检索计划
+        开启检查点时计划也保存下来，重新运行不再探测
+        """
+        unit = f"pubmed-plan:{year}:{reldate or 0}:{'|'.join(journal_list)}"
+        status, progress, _ = self._restore(unit)
+        if status == DONE:
+            shards = [QueryShard.from_dict(data) for data in progress['shards']]
+            print(f"↻ 检查点中已有检索计划（{len(shards)} 个检索式）")
+            return shards
+        
+        probe = probe or self.pubmed_probe(year)
+        try:
+            shards = QueryPlanner(probe, workers=workers).plan(journal_list, *search_window(year, reldate))
+        except Exception as e:
+            print(f"检索计划错误: {e}")
+            self._record_error()
+            return []
+        print_plan(shards, probe.requests)
+        if self.checkpoint is not None:
+            self.checkpoint.complete(unit, progress={'shards': [shard.to_dict() for shard in shards]})
+        return shards
+
+    def iter_pubmed_shard(self, shard: QueryShard, probe: EsearchProbe) -> Iterator[Dict]:
+        """
+        通过历史服务器分批 efetch，取回分片的全部记录，边下载边解析
+        """
+        shard = probe.ensure_history(shard)
+        for _, batch in self.id_resolver().article_pages(shard.webenv, shard.query_key, min(shard.count, ESEARCH_MAX)):
+            yield from batch
+
+    def pubmed_ids(self, shard: QueryShard, probe: EsearchProbe) -> List[str]:
+        """
+        取回分片的PMID列表（只有ID，不含记录），用于跳过已获取过的文章
+        """
+        if not shard.count:
+            return []
+        search_params = {
+            'db': 'pubmed',
+            'term': probe.build_term(shard.journals),
+            'retmax': min(shard.count, ESEARCH_MAX),
+            'retmode': 'json',
+            **shard.date_params(),
+        }
+        response = self.transport.get(f"{self.PUBMED_BASE_URL}esearch.fcgi",
+                                      params=self._ncbi_params(search_params), timeout=30)
+        return response.json().get('esearchresult', {}).get('idlist', [])
+
+    def iter_pubmed_ids(self, id_list: Sequence[str]) -> Iterator[Dict]:
+        """
+        按PMID取回完整记录：epost 提交ID，再分批 efetch（不拼进URL，也不截断）
+        """
+        if not id_list:
+            return
+        for _, batch in self.id_resolver().articles(id_list):
+            yield from batch
+
+    def search_pubmed_shard(self, shard: QueryShard, probe: EsearchProbe) -> List[Dict]:
+        """
+        执行检索计划中的一个分片
+        """
+        print(f"正在检索: {shard.label}（约 {shard.count} 篇）")
+        
+        unit = f'pubmed-shard:{shard.key}'
+        status, _, restored = self._restore(unit)
+        if status == DONE:
+            print(f"↻ 检查点中已有 {len(restored)} 篇文章")
+            return restored
+        
+        try:
+            articles = list(self.iter_pubmed_shard(shard, probe))
             print(f"找到 {len(articles)} 篇文章")
+            if self.checkpoint is not None:
+                self.checkpoint.complete(unit, articles)
             return articles
             
         except Exception as e:
             print(f"错误: {e}")
+            self._record_error()
             return []
-    
-    def scrape_all(self):
+
+    def _run_serial(self, journal_list: List[str], keywords: List[str], year: int,
+                    reldate: int = None, from_update_date: str = None) -> List[Dict]:
+        """
+        串行执行：先按检索计划查PubMed，再逐个期刊查Crossref
+        """
+        results = []
+
+        print("\n--- 方法1: 通过PubMed搜索 ---")
+        probe = self.pubmed_probe(year)
+        for shard in self.plan_pubmed(journal_list, year, reldate, probe):
+            results.extend(self._emit(self.search_pubmed_shard(shard, probe), 'PubMed'))
+
+        print("\n--- 方法2: 通过Crossref搜索 ---")
+        for journal in journal_list:
+            results.extend(self._emit(self.search_crossref(journal, keywords, year, from_update_date=from_update_date),
+                                      'Crossref'))
+
+        return results
+
+    def _run_concurrent(self, journal_list: List[str], keywords: List[str], year: int,
+                        reldate: int = None, from_update_date: str = None) -> List[Dict]:
+        """
+        并发执行：PubMed检索计划的各分片和各期刊的Crossref请求同时进行
+        每个数据源使用独立的线程池，线程数即该主机允许的最大并发数
+        结果按串行路径的顺序拼接，保证输出一致
+        """
+        print("\n--- 并发模式: PubMed与Crossref同时搜索 ---")
+        with ThreadPoolExecutor(max_workers=self.PUBMED_MAX_WORKERS) as pubmed_pool, \
+                ThreadPoolExecutor(max_workers=self.CROSSREF_MAX_WORKERS) as crossref_pool:
+            crossref_futures = [
+                crossref_pool.submit(self.search_crossref, journal, keywords, year,
+                                     from_update_date=from_update_date)
+                for journal in journal_list
+            ]
+            # Crossref请求进行的同时探测PubMed结果数、生成检索计划
+            probe = self.pubmed_probe(year)
+            pubmed_futures = [
+                pubmed_pool.submit(self.search_pubmed_shard, shard, probe)
+                for shard in self.plan_pubmed(journal_list, year, reldate, probe, workers=self.PUBMED_MAX_WORKERS)
+            ]
+
+            results = []
+            for future in pubmed_futures:
+                results.extend(self._emit(future.result(), 'PubMed'))
+            for future in crossref_futures:
+                results.extend(self._emit(future.result(), 'Crossref'))
+
+        return results
+
+    def _emit(self, articles: List[Dict], source: str) -> List[Dict]:
+        """
+        记录该数据源的产出条数；开启流式输出时，每完成一个期刊就把结果写入磁盘
+        """
+        self.metrics.record_articles(source, articles)
+        if self.stream is not None:
+            self.stream.emit(articles)
+        return articles
+
+    def scrape_all(self, year: int = 2025, concurrent: bool = False, incremental: bool = False,
+                   previous_results: str = None, stream_to: str = None, metrics_to: str = None,
+                   checkpoint: bool = True):
         """
         爬取所有期刊的文章
+        concurrent=True 时所有期刊的请求并发执行，结果与串行模式一致
+        incremental=True 时只获取上次爬取之后新增或更新的记录，
+        并合并到上次保存的结果（previous_results，默认为同年份的JSON输出）中
+        stream_to 为文件名时，爬取过程中边爬边写 CSV 和 JSON Lines
+        metrics_to 为文件名时，结束后把请求与记录统计保存为JSON
+        checkpoint=True 时每个期刊（Crossref为每一页）完成后保存进度，中途失败后重新运行从断点继续
         """
         print("=" * 60)
-        print("开始爬取2025年顶刊医学机器学习相关文章")
+        print(f"开始爬取{year}年顶刊医学机器学习相关文章")
         print("=" * 60)
+        self.year = year
         
-        # 定义搜索策略
-        journals = {
-            'Nature': ['Nature', 'Nature Medicine', 'Nature Biotechnology', 'Nature Methods'],
-            'Science': ['Science', 'Science Translational Medicine'],
-            'Cell': ['Cell', 'Cell Systems', 'Cell Reports Medicine']
-        }
+        # 搜索策略（期刊系列和Crossref关键词与分布式模式、批量任务共用）
+        journal_list = [journal for journal_list in JOURNAL_FAMILIES.values() for journal in journal_list]
         
-        keywords = ['machine learning', 'deep learning', 'artificial intelligence', 
-                   'neural network', 'medical', 'clinical', 'diagnosis', 'prediction']
+        reldate = from_update_date = None
+        if incremental:
+            state = CrawlState()
+            reldate = state.reldate(f'journal:pubmed:{year}')
+            from_update_date = state.from_date(f'journal:crossref:{year}')
+            print(f"增量模式: 上次爬取日期 {state.from_date(f'journal:pubmed:{year}') or '无（首次运行，全量爬取）'}")
         
-        # 方法1: 使用PubMed搜索
-        print("\n--- 方法1: 通过PubMed搜索 ---")
-        for journal_family, journal_list in journals.items():
-            for journal in journal_list:
-                query = f'("{journal}"[Journal]) AND (machine learning OR deep learning OR artificial intelligence) AND (medical OR clinical OR diagnosis OR prediction) AND 2025[PDAT]'
-                articles = self.search_pubmed(query, 2025)
-                self.results.extend(articles)
+        errors_before = self.errors
+        if checkpoint:
+            self.checkpoint = open_checkpoint(f"journal:{year}:{'incremental' if incremental else 'all'}")
+        if stream_to:
+            self.stream = StreamWriter(f'{self.OUTPUT_DIR}/{stream_to}', self.CSV_FIELDS)
+        try:
+            run = self._run_concurrent if concurrent else self._run_serial
+            with self.metrics.stage('journal.search'):
+                articles = run(journal_list, CROSSREF_KEYWORDS, year, reldate, from_update_date)
+        finally:
+            if self.stream is not None:
+                self.stream.close()
+                self.stream = None
+            close_checkpoint(self.checkpoint, self.errors == errors_before)
+            self.checkpoint = None
+        self.results.extend(articles)
         
-        # 方法2: 使用Crossref搜索
-        print("\n--- 方法2: 通过Crossref搜索 ---")
-        for journal_family, journal_list in journals.items():
-            for journal in journal_list:
-                articles = self.search_crossref(journal, keywords[:4], 2025)
-                self.results.extend(articles)
-        
-        # 去重
-        unique_results = []
-        seen_titles = set()
-        for article in self.results:
-            title = article.get('title', '').lower()
-            if title and title not in seen_titles:
-                seen_titles.add(title)
-                unique_results.append(article)
-        
-        self.results = unique_results
+        # 去重（DOI/PMID/标题任一相同即为重复）
+        with self.metrics.stage('journal.dedup'):
+            self.results = deduplicate(self.results)
         print(f"\n总共找到 {len(self.results)} 篇独特文章")
         
-    def save_results(self, filename: str = 'medical_ml_articles_2025.csv'):
+        if incremental:
+            self._merge_incremental(state, year, previous_results, self.errors == errors_before)
+        
+        self.metrics.print_summary()
+        self.metrics.export(self.OUTPUT_DIR, metrics_to)
+
+    def _merge_incremental(self, state: CrawlState, year: int, previous_results: str, succeeded: bool):
+        """
+        将本次结果合并到上次保存的结果中
+        只有本次所有请求都成功时才推进增量状态，避免漏掉失败时间窗口内的记录
+        """
+        previous_path = previous_results or self.results_path(year, 'json')
+        new_count = 0
+        if succeeded:
+            pubmed_articles = [a for a in self.results if a.get('pmid')]
+            crossref_articles = [a for a in self.results if not a.get('pmid')]
+            new_count = state.mark(f'journal:pubmed:{year}', pubmed_articles)
+            new_count += state.mark(f'journal:crossref:{year}', crossref_articles)
+            state.save()
+        else:
+            print("⚠️  部分请求失败，本次不更新增量状态")
+        
+        self.results = merge_records(load_results(previous_path), self.results)
+        print(f"增量合并: 新增 {new_count} 篇，合并后共 {len(self.results)} 篇")
+        
+    def results_path(self, year: int, ext: str = 'csv') -> str:
+        """
+        默认输出文件路径，save_results 写入与增量模式读取的是同一组文件
+        """
+        return f'{self.OUTPUT_DIR}/{self.RESULTS_NAME}_{year}.{ext}'
+
+    def save_results(self, filename: str = None, formats=('csv', 'json')):
         """
-        保存结果到CSV文件
+        保存结果到CSV文件，同时保存JSON格式，并增量更新本地检索索引
+        filename 默认为 {RESULTS_NAME}_{爬取年份}.csv
+        formats 可选 csv / json / jsonl / parquet
         """
         if not self.results:
             print("没有结果可保存")
             return
         
-        output_path = f'/mnt/user-data/outputs/{filename}'
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
-            fieldnames = ['title', 'authors', 'journal', 'pub_date', 'doi', 'pmid', 'url']
-            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
-            
-            writer.writeheader()
-            for article in self.results:
-                writer.writerow(article)
-        
-        print(f"\n结果已保存到: {output_path}")
+        output_path = f'{self.OUTPUT_DIR}/{filename}' if filename else self.results_path(self.year)
         
-        # 同时保存JSON格式
-        json_path = output_path.replace('.csv', '.json')
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(self.results, f, ensure_ascii=False, indent=2)
+        with self.metrics.stage('journal.save'), open_sinks(output_path, self.CSV_FIELDS, formats) as sink:
+            sink.write_many(self.results)
         
-        print(f"JSON格式已保存到: {json_path}")
+        print()
+        for path in sink.paths:
+            print(f"结果已保存到: {path}")
+        update_index(self.results)
         
         return output_path
 
@@ -231,8 +554,8 @@ def main():
     """
     scraper = JournalScraper()
     
-    # 执行爬取
-    scraper.scrape_all()
+    # 执行爬取（并发模式：所有期刊同时检索）
+    scraper.scrape_all(concurrent=True)
     
     # 保存结果
     output_file = scraper.save_results()
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+本地关键词匹配与布尔检索式求值
+- KeywordMatcher：把关键词集合编译成一个带词边界的正则，每段文本只扫描一遍；
+  全大写的缩写（AI、ML）区分大小写精确匹配，其余关键词不区分大小写，末词允许常见词尾变化
+  （network → networks、clinical → clinically、diagnosis → diagnoses、study → studies）
+- BooleanQuery：在本地对记录求值发送给PubMed的检索式，
+  如 (machine learning OR deep learning) AND (medical OR clinical)，
+  支持 AND / OR / NOT、括号、引号短语和 [Journal]、[PDAT]、[Title/Abstract] 等字段标签；
+  PubMed还会做自动词语映射（MeSH、同义词），本地求值只是近似
+用于RSS、Crossref和Google Scholar结果的客户端过滤，保证各数据源的筛选规则一致
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+# 默认参与匹配的文本字段
+TEXT_FIELDS = ('title', 'abstract', 'summary', 'snippet')
+
+# 短语内的词间分隔：空白或连字符（'deep learning' 也匹配 'Deep-learning'）
+_WORD_SEP = r'[\s\-]+'
+_WORD_SEP_RE = re.compile(_WORD_SEP)
+
+
+def _is_acronym(keyword: str) -> bool:
+    letters = [c for c in keyword if c.isalpha()]
+    return bool(letters) and all(c.isupper() for c in letters)
+
+
+def _words(text: str) -> List[str]:
+    return [word for word in _WORD_SEP_RE.split(text) if word]
+
+
+def _inflected(word: str) -> str:
+    """
+    末词的正则：允许复数和副词词尾（-s / -es / -ly，-is → -es，辅音 + y → -ies）
+    """
+    lower = word.lower()
+    if lower.endswith('is') and len(word) > 3:
+        return f'{re.escape(word[:-2])}(?:is|es)'
+    if lower.endswith('y') and len(word) > 2 and lower[-2] not in 'aeiou':
+        return f'{re.escape(word[:-1])}(?:y|ies)'
+    return f'{re.escape(word)}(?:s|es|ly)?'
+
+
+def _base_forms(word: str) -> Iterator[str]:
+    """
+    由匹配到的末词推出可能的原形（与 _inflected 对应），用于找回原始关键词
+    """
+    yield word
+    if word.endswith('ies'):
+        yield word[:-3] + 'y'
+    if word.endswith('es'):
+        yield word[:-2] + 'is'
+        yield word[:-2]
+    if word.endswith('s'):
+        yield word[:-1]
+    if word.endswith('ly'):
+        yield word[:-2]
+
+
+def _canonical(text: str, case_sensitive: bool) -> str:
+    text = ' '.join(_words(text))
+    return text if case_sensitive else text.lower()
+
+
+class KeywordMatcher:
+    """
+    单次扫描的多关键词匹配器
+    关键词内部的空白或连字符匹配任意空白或连字符，首尾要求词边界（'ml' 不会匹配 'html'）；
+    非缩写关键词的末词可带词尾变化（'neural network' 匹配 'graph neural networks'）
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = list(dict.fromkeys(k for k in keywords if k and k.strip()))
+        self._lookup: Dict[str, str] = {}
+        # 每个关键词以词为单位的前缀关键词（'machine learning' 命中时 'machine' 也命中）
+        self._prefixes: Dict[str, List[str]] = {}
+
+        insensitive, sensitive = [], []
+        for keyword in sorted(self.keywords, key=len, reverse=True):
+            acronym = _is_acronym(keyword)
+            self._lookup.setdefault(_canonical(keyword, acronym), keyword)
+            words = _words(keyword)
+            if acronym:
+                pattern = _WORD_SEP.join(map(re.escape, words))
+            else:
+                pattern = _WORD_SEP.join([*map(re.escape, words[:-1]), _inflected(words[-1])])
+            (sensitive if acronym else insensitive).append(pattern)
+
+        for keyword in self.keywords:
+            self._prefixes[keyword] = [other for other in self.keywords
+                                       if other != keyword and self._is_prefix(other, keyword)]
+
+        alternatives = []
+        if insensitive:
+            alternatives.append(f"(?i:{'|'.join(insensitive)})")
+        if sensitive:
+            alternatives.append('|'.join(sensitive))
+        if alternatives:
+            body = '|'.join(alternatives)
+            self._search = re.compile(rf'(?<!\w)(?:{body})(?!\w)')
+            # 零宽前瞻：在每个位置取最长匹配，可找到相互重叠的关键词
+            self._scan = re.compile(rf'(?<!\w)(?=({body})(?!\w))')
+        else:
+            self._search = self._scan = None
+
+    @staticmethod
+    def _is_prefix(short: str, long: str) -> bool:
+        acronym = _is_acronym(short)
+        short_words = _canonical(short, acronym).split()
+        long_words = _canonical(long, acronym).split()
+        return long_words[:len(short_words)] == short_words
+
+    def search(self, text: str) -> bool:
+        """
+        文本中是否出现任一关键词
+        """
+        return bool(text) and self._search is not None and self._search.search(text) is not None
+
+    def search_any(self, texts: Iterable[str]) -> bool:
+        return any(self.search(text) for text in texts if text)
+
+    def matches(self, text: str) -> Set[str]:
+        """
+        返回文本中出现的全部关键词（原始写法）
+        """
+        found: Set[str] = set()
+        if not text or self._scan is None:
+            return found
+        for match in self._scan.finditer(text):
+            keyword = self._keyword_for(match.group(1))
+            if keyword is not None:
+                found.add(keyword)
+                found.update(self._prefixes[keyword])
+        return found
+
+    def _keyword_for(self, matched: str) -> Optional[str]:
+        """
+        匹配到的文本对应的原始关键词（去掉末词的词尾变化后查找）
+        """
+        keyword = self._lookup.get(_canonical(matched, True))
+        if keyword is not None:
+            return keyword
+        words = _canonical(matched, False).split()
+        for base in _base_forms(words[-1]):
+            keyword = self._lookup.get(' '.join(words[:-1] + [base]))
+            if keyword is not None:
+                return keyword
+        return None
+
+    def matches_any(self, texts: Iterable[str]) -> Set[str]:
+        found: Set[str] = set()
+        for text in texts:
+            found |= self.matches(text)
+        return found
+
+
+@lru_cache(maxsize=64)
+def compile_keywords(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    """
+    按关键词元组缓存编译好的匹配器
+    """
+    return KeywordMatcher(keywords)
+
+
+def record_text(record: Dict, fields: Sequence[str] = TEXT_FIELDS) -> List[str]:
+    values = []
+    for field in fields:
+        value = record.get(field)
+        if value:
+            values.append(value if isinstance(value, str) else str(value))
+    return values
+
+
+# 字段标签 → 求值范围
+_SCOPES = {
+    'title/abstract': 'text', 'tiab': 'text', 'all fields': 'text', 'all': 'text', 'tw': 'text',
+    'title': 'title', 'ti': 'title',
+    'abstract': 'abstract', 'ab': 'abstract',
+    'journal': 'journal', 'ta': 'journal', 'jour': 'journal', 'so': 'journal',
+    'pdat': 'date', 'dp': 'date', 'publication date': 'date',
+    'mesh terms': 'mesh', 'mh': 'mesh', 'mesh': 'mesh', 'majr': 'mesh',
+}
+
+_SCOPE_FIELDS = {
+    'text': TEXT_FIELDS,
+    'title': ('title',),
+    'abstract': ('abstract', 'summary', 'snippet'),
+    'mesh': ('mesh_terms',),
+}
+
+_TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|\[([^\]]*)\]|([^\s()"\[\]]+))')
+_OPERATORS = ('AND', 'OR', 'NOT')
+
+
+class QuerySyntaxError(ValueError):
+    pass
+
+
+def _tokenize(expression: str) -> List[Tuple[str, str]]:
+    """
+    切分为 ('(' | ')' | 'op' | 'term' | 'tag', 值)
+    相邻的未加引号单词合并为一个短语（与PubMed一致）
+    """
+    tokens: List[Tuple[str, str]] = []
+    position = 0
+    last_bare = False
+    expression = expression.strip()
+    while position < len(expression):
+        match = _TOKEN_RE.match(expression, position)
+        if not match or match.end() == position:
+            raise QuerySyntaxError(f'无法解析检索式: {expression[position:position + 20]!r}')
+        position = match.end()
+        lparen, rparen, quoted, tag, word = match.groups()
+        bare = word is not None and word not in _OPERATORS
+        if lparen:
+            tokens.append(('(', lparen))
+        elif rparen:
+            tokens.append((')', rparen))
+        elif quoted is not None:
+            tokens.append(('term', quoted))
+        elif tag is not None:
+            tokens.append(('tag', tag))
+        elif word in _OPERATORS:
+            tokens.append(('op', word))
+        elif last_bare:
+            tokens[-1] = ('term', f'{tokens[-1][1]} {word}')
+        else:
+            tokens.append(('term', word))
+        last_bare = bare
+    return tokens
+
+
+class BooleanQuery:
+    """
+    PubMed风格布尔检索式的本地求值器
+    与PubMed相同，运算符从左到右依次结合（不区分优先级），需要时用括号分组；
+    没有运算符的相邻分组按 AND 处理
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self._tokens = _tokenize(expression)
+        self._position = 0
+        self._terms: Dict[str, List[str]] = {}
+        self.tree = self._parse_expression() if self._tokens else None
+        if self._position != len(self._tokens):
+            raise QuerySyntaxError(f'多余的右括号或运算符: {expression!r}')
+        self._matchers = {scope: KeywordMatcher(terms) for scope, terms in self._terms.items()
+                          if scope in _SCOPE_FIELDS}
+
+    # ---- 解析 ----
+
+    def _peek(self) -> Optional[Tuple[str, str]]:
+        return self._tokens[self._position] if self._position < len(self._tokens) else None
+
+    def _next(self) -> Tuple[str, str]:
+        token = self._peek()
+        if token is None:
+            raise QuerySyntaxError(f'检索式不完整: {self.expression!r}')
+        self._position += 1
+        return token
+
+    def _parse_expression(self):
+        node = self._parse_primary()
+        while True:
+            token = self._peek()
+            if token is None or token[0] == ')':
+                return node
+            if token[0] == 'op':
+                self._position += 1
+                operator = token[1].lower()
+            else:
+                operator = 'and'
+            node = (operator, node, self._parse_primary())
+
+    def _parse_primary(self):
+        kind, value = self._next()
+        if kind == '(':
+            node = self._parse_expression()
+            if self._next()[0] != ')':
+                raise QuerySyntaxError(f'括号不匹配: {self.expression!r}')
+            return node
+        if kind != 'term':
+            raise QuerySyntaxError(f'此处应为检索词: {value!r}')
+        scope = 'text'
+        token = self._peek()
+        if token is not None and token[0] == 'tag':
+            self._position += 1
+            scope = _SCOPES.get(token[1].strip().lower(), 'text')
+        term = ' '.join(value.split())
+        self._terms.setdefault(scope, []).append(term)
+        return ('term', scope, term)
+
+    # ---- 求值 ----
+
+    @property
+    def terms(self) -> Dict[str, List[str]]:
+        return {scope: list(terms) for scope, terms in self._terms.items()}
+
+    def _evaluate(self, node, record: Dict, found: Dict[str, Set[str]]) -> bool:
+        kind = node[0]
+        if kind == 'term':
+            _, scope, term = node
+            if scope in self._matchers:
+                if scope not in found:
+                    found[scope] = self._matchers[scope].matches_any(record_text(record, _SCOPE_FIELDS[scope]))
+                return term in found[scope]
+            if scope == 'journal':
+                term = term.lower()
+                return any(term == value.lower().strip() for value in record_text(record, ('journal', 'source')))
+            if scope == 'date':
+                year = term.split('/')[0].split('-')[0]
+                return year in str(record.get('pub_date') or '')
+            return False
+        left = self._evaluate(node[1], record, found)
+        if kind == 'and':
+            return left and self._evaluate(node[2], record, found)
+        if kind == 'or':
+            return left or self._evaluate(node[2], record, found)
+        return left and not self._evaluate(node[2], record, found)
+
+    def matches(self, record: Dict) -> bool:
+        """
+        记录是否满足检索式；每个字段范围的文本只扫描一次
+        """
+        if self.tree is None:
+            return True
+        return self._evaluate(self.tree, record, {})
+
+    def filter(self, records: Iterable[Dict]) -> Iterator[Dict]:
+        for record in records:
+            if self.matches(record):
+                yield record
+
+
+@lru_cache(maxsize=64)
+def compile_query(expression: str) -> BooleanQuery:
+    """
+    按检索式缓存编译结果
+    """
+    return BooleanQuery(expression)
@@ -5,13 +5,16 @@ PubMed + Google Scholar 结果合并工具
 """
 
 import csv
-import json
 import sys
-from typing import List, Dict, Set
+from typing import List, Dict, Set, Iterator
+
+from dedup_index import DedupIndex, DiskDedupIndex, normalize_title as _normalize_title
+from near_dup import drop_near_duplicates, print_clusters
+from output_sinks import open_sinks
 
 def normalize_title(title: str) -> str:
     """标准化标题用于比对"""
-    return title.lower().strip().replace('.', '').replace(',', '')
+    return _normalize_title(title)
 
 def read_csv_file(filepath: str) -> List[Dict]:
     """读取CSV文件"""
@@ -27,44 +30,98 @@ def read_csv_file(filepath: str) -> List[Dict]:
         print(f"✗ 读取文件失败 {filepath}: {e}")
         return []
 
-def merge_and_deduplicate(pubmed_data: List[Dict], scholar_data: List[Dict]) -> List[Dict]:
-    """合并并去重"""
+def iter_csv_file(filepath: str) -> Iterator[Dict]:
+    """逐行读取CSV文件（不把整个文件载入内存）"""
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
+        yield from csv.DictReader(f)
+
+def read_csv_header(filepath: str) -> List[str]:
+    """只读取CSV表头"""
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
+        return next(csv.reader(f), [])
+
+def merge_streaming(pubmed_file: str, scholar_file: str, output_file: str, dedup_path: str = None,
+                    formats=('csv', 'json')):
+    """
+    流式合并：逐行读取、去重并立即写出，内存占用与文件大小无关
+    - 字段只从两个文件的表头获取
+    - 去重集合保存在磁盘（SQLite，每个标识符8字节哈希）
+    - CSV 和 JSON 边合并边写入
+    """
+    fields = set(read_csv_header(pubmed_file)) | set(read_csv_header(scholar_file))
+    fields.add('data_source')
+    fields.discard('')
+    
+    index = DiskDedupIndex(dedup_path)
+    counts = {'PubMed': 0, 'Google Scholar': 0}
+    duplicates = 0
+    try:
+        with open_sinks(output_file, sorted(fields), formats, encoding='utf-8-sig', batch_size=1000) as sink:
+            # 首先添加PubMed结果（通常更可靠），再添加Google Scholar结果
+            for source, filepath in (('PubMed', pubmed_file), ('Google Scholar', scholar_file)):
+                for item in iter_csv_file(filepath):
+                    counts[source] += 1
+                    if not index.add(item):
+                        duplicates += 1
+                        continue
+                    item['data_source'] = source
+                    sink.write(item)
+    finally:
+        index.close()
+    
+    print(f"\n合并统计:")
+    print(f"  PubMed记录: {counts['PubMed']}")
+    print(f"  Google Scholar记录: {counts['Google Scholar']}")
+    print(f"  重复记录: {duplicates}")
+    print(f"  合并后: {sink.count}")
+    print()
+    for path in sink.paths:
+        print(f"✓ 结果已保存: {path}")
+
+def merge_and_deduplicate(pubmed_data: List[Dict], scholar_data: List[Dict],
+                          fuzzy_threshold: float = None) -> List[Dict]:
+    """
+    合并并去重
+    fuzzy_threshold 不为空时再用 MinHash/LSH 去除标题近似重复的记录（保留先出现的）
+    """
     merged = []
-    seen_titles = set()
+    # DOI/PMID/标题任一相同即为重复
+    index = DedupIndex()
     
     # 首先添加PubMed结果（通常更可靠）
     for item in pubmed_data:
-        title = item.get('Title', item.get('title', ''))
-        normalized = normalize_title(title)
-        
-        if normalized and normalized not in seen_titles:
-            seen_titles.add(normalized)
+        if index.add(item):
             item['data_source'] = 'PubMed'
             merged.append(item)
     
     # 添加Google Scholar结果（跳过重复）
     duplicates = 0
     for item in scholar_data:
-        title = item.get('Title', item.get('title', ''))
-        normalized = normalize_title(title)
-        
-        if normalized and normalized not in seen_titles:
-            seen_titles.add(normalized)
+        if index.add(item):
             item['data_source'] = 'Google Scholar'
             merged.append(item)
         else:
             duplicates += 1
     
+    fuzzy_duplicates = 0
+    if fuzzy_threshold:
+        exact_merged = merged
+        merged, clusters = drop_near_duplicates(exact_merged, fuzzy_threshold)
+        fuzzy_duplicates = len(exact_merged) - len(merged)
+        print_clusters(exact_merged, clusters)
+    
     print(f"\n合并统计:")
     print(f"  PubMed记录: {len(pubmed_data)}")
     print(f"  Google Scholar记录: {len(scholar_data)}")
     print(f"  重复记录: {duplicates}")
+    if fuzzy_threshold:
+        print(f"  近似重复记录: {fuzzy_duplicates} (阈值 {fuzzy_threshold})")
     print(f"  合并后: {len(merged)}")
     
     return merged
 
-def save_results(data: List[Dict], output_file: str):
-    """保存结果"""
+def save_results(data: List[Dict], output_file: str, formats=('csv', 'json')):
+    """保存结果，formats 可选 csv / json / jsonl / parquet"""
     if not data:
         print("✗ 没有数据可保存")
         return
@@ -74,21 +131,13 @@ def save_results(data: List[Dict], output_file: str):
     for item in data:
         all_fields.update(item.keys())
     
-    # 保存CSV
-    csv_file = output_file if output_file.endswith('.csv') else f'{output_file}.csv'
-    with open(csv_file, 'w', newline='', encoding='utf-8-sig') as f:
-        writer = csv.DictWriter(f, fieldnames=sorted(all_fields))
-        writer.writeheader()
-        writer.writerows(data)
-    
-    print(f"\n✓ CSV结果已保存: {csv_file}")
-    
-    # 保存JSON
-    json_file = csv_file.replace('.csv', '.json')
-    with open(json_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    # 保存CSV / JSON
+    with open_sinks(output_file, sorted(all_fields), formats, encoding='utf-8-sig') as sink:
+        sink.write_many(data)
     
-    print(f"✓ JSON结果已保存: {json_file}")
+    print()
+    for path in sink.paths:
+        print(f"✓ 结果已保存: {path}")
     
     # 生成简单统计
     print("\n" + "="*60)
@@ -107,26 +156,54 @@ def main():
     print("PubMed + Google Scholar 结果合并工具")
     print("="*60)
     
-    if len(sys.argv) < 3:
+    # --fuzzy[=阈值] 启用近似重复检测，--stream 启用流式合并，--jsonl / --parquet 额外输出 JSON Lines / Parquet
+    fuzzy_threshold = None
+    stream = False
+    formats = ['csv', 'json']
+    args = []
+    for arg in sys.argv[1:]:
+        if arg == '--stream':
+            stream = True
+        elif arg == '--jsonl':
+            formats.append('jsonl')
+        elif arg == '--parquet':
+            formats.append('parquet')
+        elif arg.startswith('--fuzzy'):
+            fuzzy_threshold = float(arg.split('=', 1)[1]) if '=' in arg else 0.8
+        else:
+            args.append(arg)
+    
+    if len(args) < 2:
         print("\n使用方法:")
-        print("  python merge_results.py <pubmed.csv> <scholar.csv> [output.csv]")
+        print("  python merge_results.py <pubmed.csv> <scholar.csv> [output.csv] [--fuzzy[=0.8]] [--stream] [--jsonl] [--parquet]")
         print("\n示例:")
         print("  python merge_results.py pubmed_export.csv scholar_export.csv merged_results.csv")
         print("\n说明:")
         print("  - pubmed.csv: 从PubMed导出的CSV文件")
         print("  - scholar.csv: 从Google Scholar导出的CSV文件")
         print("  - output.csv: 输出文件名（可选，默认为merged_results.csv）")
+        print("  - --fuzzy: 按标题相似度（MinHash/LSH）去除近似重复，可指定阈值")
+        print("  - --stream: 流式合并超大文件，内存占用恒定（不支持 --fuzzy）")
+        print("  - --jsonl: 同时输出 JSON Lines 文件（每行一条记录）")
+        print("  - --parquet: 同时输出 Parquet 列式文件（需 pip install pyarrow）")
         return
     
-    pubmed_file = sys.argv[1]
-    scholar_file = sys.argv[2]
-    output_file = sys.argv[3] if len(sys.argv) > 3 else '/mnt/user-data/outputs/merged_results.csv'
+    pubmed_file = args[0]
+    scholar_file = args[1]
+    output_file = args[2] if len(args) > 2 else '/mnt/user-data/outputs/merged_results.csv'
     
     print(f"\n输入文件:")
     print(f"  PubMed: {pubmed_file}")
     print(f"  Google Scholar: {scholar_file}")
     print(f"输出文件: {output_file}\n")
     
+    if stream:
+        if fuzzy_threshold:
+            print("⚠️  流式模式不支持 --fuzzy，已忽略")
+        merge_streaming(pubmed_file, scholar_file, output_file, formats=formats)
+        print("\n✅ 合并完成！")
+        return
+    
     # 读取文件
     pubmed_data = read_csv_file(pubmed_file)
     scholar_data = read_csv_file(scholar_file)
@@ -136,10 +213,10 @@ def main():
         return
     
     # 合并去重
-    merged_data = merge_and_deduplicate(pubmed_data, scholar_data)
+    merged_data = merge_and_deduplicate(pubmed_data, scholar_data, fuzzy_threshold)
     
     # 保存结果
-    save_results(merged_data, output_file)
+    save_results(merged_data, output_file, formats)
     
     print("\n✅ 合并完成！")
 
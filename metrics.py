@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+请求级埋点与指标导出
+- 每个出站请求：延迟直方图、状态码、接收字节数、重试次数、限速等待时间
+- 响应缓存：命中 / 重新验证 / 未命中
+- 各数据源、各期刊产出的记录数，以及各流水线阶段的耗时
+所有爬虫类共享同一个进程级指标表，可导出为JSON汇总或 Prometheus 文本格式；
+长时间运行的任务可设置 AICRAWLER_METRICS_PORT，通过 http://host:port/metrics 供 Prometheus 抓取
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 延迟直方图的桶上界（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 指标名 → (类型, 说明)
+METRIC_HELP = {
+    'aicrawler_http_requests_total': ('counter', 'HTTP请求数（按主机和状态码）'),
+    'aicrawler_http_request_seconds': ('histogram', 'HTTP请求延迟（秒）'),
+    'aicrawler_http_response_bytes_total': ('counter', '接收的响应字节数'),
+    'aicrawler_http_retries_total': ('counter', '重试次数（按原因）'),
+    'aicrawler_http_errors_total': ('counter', '重试耗尽或熔断后失败的请求数'),
+    'aicrawler_rate_limit_wait_seconds_total': ('counter', '在限速器上等待的总时间（秒）'),
+    'aicrawler_cache_requests_total': ('counter', '响应缓存查询结果（hit / revalidated / miss）'),
+    'aicrawler_records_total': ('counter', '产出的记录数（按数据源和期刊）'),
+    'aicrawler_stage_seconds': ('histogram', '流水线阶段耗时（秒）'),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """
+    固定桶直方图，记录计数、总和与最大值
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """
+        由桶计数估算分位数（返回所在桶的上界，超出最大桶时返回最大值）
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self) -> Dict:
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 4),
+            'mean': round(self.sum / self.count, 4) if self.count else 0.0,
+            'p50': round(self.quantile(0.5), 4),
+            'p95': round(self.quantile(0.95), 4),
+            'max': round(self.max, 4),
+        }
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+def _number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Metrics:
+    """
+    线程安全的指标表
+    计数器与直方图均按 (指标名, 标签) 存放
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._lock = threading.Lock()
+
+    # ---- 通用接口 ----
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def counter(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get((name, _labels(labels)), 0)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.started_at = time.time()
+
+    # ---- 埋点 ----
+
+    def record_request(self, host: str, method: str, status, seconds: float, nbytes: int):
+        """
+        记录一次HTTP请求（status 为状态码，网络错误时为异常类名）
+        """
+        self.inc('aicrawler_http_requests_total', host=host, method=method, status=status)
+        self.observe('aicrawler_http_request_seconds', seconds, host=host)
+        if nbytes:
+            self.inc('aicrawler_http_response_bytes_total', nbytes, host=host)
+
+    def record_retry(self, host: str, reason):
+        self.inc('aicrawler_http_retries_total', host=host, reason=reason)
+
+    def record_error(self, host: str, reason: str):
+        self.inc('aicrawler_http_errors_total', host=host, reason=reason)
+
+    def record_wait(self, host: str, seconds: float):
+        if seconds > 0:
+            self.inc('aicrawler_rate_limit_wait_seconds_total', seconds, host=host)
+
+    def record_cache(self, result: str):
+        self.inc('aicrawler_cache_requests_total', result=result)
+
+    def record_articles(self, source: str, articles: Iterable[Dict]):
+        """
+        按期刊统计某个数据源产出的记录
+        """
+        counts: Dict[str, int] = {}
+        for article in articles:
+            journal = article.get('journal') or 'Unknown'
+            counts[journal] = counts.get(journal, 0) + 1
+        for journal, n in counts.items():
+            self.inc('aicrawler_records_total', n, source=source, journal=journal)
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        统计一个流水线阶段的耗时：with metrics.stage('journal.search'): ...
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('aicrawler_stage_seconds', time.perf_counter() - start, stage=name)
+
+    # ---- 导出 ----
+
+    def _snapshot(self):
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (h.buckets, list(h.counts), h.count, h.sum, h.summary())
+                          for key, h in self._histograms.items()}
+        return counters, histograms
+
+    def summary(self) -> Dict:
+        """
+        按主机、数据源和阶段整理的JSON汇总
+        """
+        counters, histograms = self._snapshot()
+        hosts: Dict[str, Dict] = {}
+        cache: Dict[str, int] = {}
+        records: Dict[str, Dict[str, int]] = {}
+
+        def host_entry(host: str) -> Dict:
+            return hosts.setdefault(host, {
+                'requests': 0, 'statuses': {}, 'retries': {}, 'errors': {},
+                'bytes': 0, 'rate_limit_wait_seconds': 0.0, 'latency': {},
+            })
+
+        for (name, labels), value in sorted(counters.items()):
+            label = dict(labels)
+            if name == 'aicrawler_http_requests_total':
+                entry = host_entry(label['host'])
+                entry['requests'] += int(value)
+                entry['statuses'][label['status']] = entry['statuses'].get(label['status'], 0) + int(value)
+            elif name == 'aicrawler_http_response_bytes_total':
+                host_entry(label['host'])['bytes'] += int(value)
+            elif name == 'aicrawler_http_retries_total':
+                host_entry(label['host'])['retries'][label['reason']] = int(value)
+            elif name == 'aicrawler_http_errors_total':
+                host_entry(label['host'])['errors'][label['reason']] = int(value)
+            elif name == 'aicrawler_rate_limit_wait_seconds_total':
+                host_entry(label['host'])['rate_limit_wait_seconds'] = round(value, 4)
+            elif name == 'aicrawler_cache_requests_total':
+                cache[label['result']] = int(value)
+            elif name == 'aicrawler_records_total':
+                records.setdefault(label['source'], {})[label['journal']] = int(value)
+
+        stages = {}
+        for (name, labels), (_, _, _, _, summary) in sorted(histograms.items()):
+            label = dict(labels)
+            if name == 'aicrawler_http_request_seconds':
+                host_entry(label['host'])['latency'] = summary
+            elif name == 'aicrawler_stage_seconds':
+                stages[label['stage']] = summary
+
+        lookups = sum(cache.values())
+        return {
+            'started_at': self.started_at,
+            'elapsed_seconds': round(time.time() - self.started_at, 3),
+            'hosts': hosts,
+            'cache': {**cache, 'hit_ratio': round(cache.get('hit', 0) / lookups, 4) if lookups else 0.0},
+            'records': {source: {'total': sum(journals.values()), 'journals': journals}
+                        for source, journals in records.items()},
+            'stages': stages,
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        Prometheus 文本格式（0.0.4）
+        """
+        counters, histograms = self._snapshot()
+        series: Dict[str, List[str]] = {}
+        for (name, labels), value in sorted(counters.items()):
+            series.setdefault(name, []).append(f'{name}{_format_labels(labels)} {_number(value)}')
+        for (name, labels), (buckets, counts, count, total, _) in sorted(histograms.items()):
+            lines = series.setdefault(name, [])
+            cumulative = 0
+            for bound, n in zip(buckets, counts):
+                cumulative += n
+                lines.append(f'{name}_bucket{_format_labels(labels, [("le", _number(bound))])} {cumulative}')
+            lines.append(f'{name}_bucket{_format_labels(labels, [("le", "+Inf")])} {count}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {_number(total)}')
+            lines.append(f'{name}_count{_format_labels(labels)} {count}')
+
+        output = []
+        for name, lines in series.items():
+            kind, help_text = METRIC_HELP.get(name, ('untyped', name))
+            output.append(f'# HELP {name} {help_text}')
+            output.append(f'# TYPE {name} {kind}')
+            output.extend(lines)
+        return '\n'.join(output) + '\n'
+
+    def write_json(self, path: str) -> str:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+        return path
+
+    def write_prometheus(self, path: str) -> str:
+        """
+        写入 .prom 文件（先写临时文件再改名，供 node_exporter 文本采集器读取）
+        """
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+        return path
+
+    def print_summary(self):
+        summary = self.summary()
+        print("\n📈 请求统计:")
+        for host, entry in summary['hosts'].items():
+            latency = entry['latency']
+            retries = sum(entry['retries'].values())
+            print(f"  • {host}: {entry['requests']} 次请求, {entry['bytes'] / 1024:.0f} KB, "
+                  f"p50 {latency.get('p50', 0) * 1000:.0f} ms / p95 {latency.get('p95', 0) * 1000:.0f} ms, "
+                  f"重试 {retries} 次, 限速等待 {entry['rate_limit_wait_seconds']:.1f} 秒")
+        if summary['cache'].get('hit_ratio'):
+            print(f"  • 缓存命中率: {summary['cache']['hit_ratio']:.0%}")
+        for source, entry in summary['records'].items():
+            print(f"  • {source}: {entry['total']} 条记录")
+
+    def export(self, output_dir: str, filename: Optional[str]) -> Optional[str]:
+        """
+        run() / scrape_all() 结束时调用：filename 不为空时写入JSON汇总，
+        并在设置了 AICRAWLER_METRICS_PROM 时同时更新 Prometheus 文本文件
+        """
+        prom_path = os.environ.get('AICRAWLER_METRICS_PROM')
+        if prom_path:
+            self.write_prometheus(prom_path)
+        if not filename:
+            return None
+        path = self.write_json(f'{output_dir}/{filename}')
+        print(f"✓ 指标已保存: {path}")
+        return path
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    metrics: Metrics = None
+
+    def do_GET(self):
+        if self.path.split('?')[0] in ('/metrics', '/'):
+            body = self.metrics.to_prometheus().encode('utf-8')
+            content_type = 'text/plain; version=0.0.4; charset=utf-8'
+        elif self.path.split('?')[0] == '/metrics.json':
+            body = json.dumps(self.metrics.summary(), ensure_ascii=False).encode('utf-8')
+            content_type = 'application/json; charset=utf-8'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(metrics: Metrics, port: int, host: str = '0.0.0.0') -> ThreadingHTTPServer:
+    """
+    在后台线程中提供 /metrics（Prometheus）和 /metrics.json
+    """
+    handler = type('MetricsHandler', (_MetricsHandler,), {'metrics': metrics})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    print(f"✓ 指标服务: http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+_shared_metrics: Optional[Metrics] = None
+_shared_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """
+    获取进程内共享的指标表
+    首次创建时读取环境变量 AICRAWLER_METRICS_PORT，设置时启动指标服务
+    """
+    global _shared_metrics
+    with _shared_lock:
+        if _shared_metrics is None:
+            _shared_metrics = Metrics()
+            port = os.environ.get('AICRAWLER_METRICS_PORT')
+            if port:
+                serve_metrics(_shared_metrics, int(port))
+        return _shared_metrics
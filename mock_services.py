@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+本地模拟服务（用于离线基准测试）
+在一个本地端口上模拟以下接口，返回与真实服务相同结构的数据：
+- E-utilities: esearch / esummary / efetch / epost（/entrez/eutils/...）
+- Crossref: /works（游标分页、doi 过滤）
+- SerpAPI: /search
+- RSS: /rss/<名称>.xml（支持 ETag 条件请求）
+可配置延迟、随机错误率、429 突发和结果集大小
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+JOURNALS = ['Nature', 'Nature Medicine', 'Science', 'Science Translational Medicine', 'Cell', 'Cell Reports Medicine']
+
+TOPICS = ['Deep learning', 'Machine learning', 'Artificial intelligence', 'Neural network']
+SETTINGS = ['clinical diagnosis', 'medical imaging', 'patient outcome prediction', 'disease screening']
+
+
+class MockConfig:
+    """
+    模拟服务参数
+    records: 每个检索返回的结果数；latency / jitter: 每个请求的固定延迟和随机附加延迟（秒）
+    error_rate: 返回 503 的概率；burst_every / burst_length: 每 burst_every 个请求中前 burst_length 个返回 429
+    retry_after: 429 响应的 Retry-After 秒数（None 表示不带该头）
+    """
+
+    def __init__(self, records: int = 500, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 burst_every: int = 0, burst_length: int = 0, retry_after: Optional[int] = None,
+                 rss_items: int = 50, scholar_results: int = 20, seed: int = 1):
+        self.records = records
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.burst_every = burst_every
+        self.burst_length = burst_length
+        self.retry_after = retry_after
+        self.rss_items = rss_items
+        self.scholar_results = scholar_results
+        self.seed = seed
+
+
+def _title(i: int) -> str:
+    return f'{TOPICS[i % len(TOPICS)]} for {SETTINGS[(i // len(TOPICS)) % len(SETTINGS)]}: study {i}'
+
+
+def _journal(i: int) -> str:
+    return JOURNALS[i % len(JOURNALS)]
+
+
+def _summary_record(i: int) -> Dict:
+    return {
+        'uid': str(i),
+        'title': _title(i),
+        'fulljournalname': _journal(i),
+        'source': _journal(i),
+        'pubdate': '2025 Jan',
+        'authors': [{'name': f'Author{i} A'}, {'name': 'Smith J'}],
+        'elocationid': f'doi: 10.1000/mock.{i}',
+        'articleids': [{'idtype': 'pubmed', 'value': str(i)}, {'idtype': 'doi', 'value': f'10.1000/mock.{i}'}],
+    }
+
+
+def _efetch_record(i: int) -> str:
+    return (
+        f'<PubmedArticle><MedlineCitation><PMID>{i}</PMID><Article>'
+        f'<Journal><Title>{escape(_journal(i))}</Title><JournalIssue><PubDate><Year>2025</Year><Month>Jan</Month>'
+        f'</PubDate></JournalIssue></Journal><ArticleTitle>{escape(_title(i))}</ArticleTitle>'
+        f'<Abstract><AbstractText Label="BACKGROUND">We evaluate a machine learning model in {i} patients.'
+        f'</AbstractText><AbstractText Label="RESULTS">The model improved clinical diagnosis.</AbstractText></Abstract>'
+        f'<AuthorList><Author><LastName>Author{i}</LastName><Initials>A</Initials></Author>'
+        f'<Author><LastName>Smith</LastName><Initials>J</Initials></Author></AuthorList>'
+        f'<ELocationID EIdType="doi">10.1000/mock.{i}</ELocationID></Article>'
+        f'<MedlineJournalInfo><MedlineTA>{escape(_journal(i))}</MedlineTA></MedlineJournalInfo>'
+        f'<MeshHeadingList><MeshHeading><DescriptorName>Humans</DescriptorName></MeshHeading>'
+        f'<MeshHeading><DescriptorName>Machine Learning</DescriptorName></MeshHeading></MeshHeadingList>'
+        f'</MedlineCitation><PubmedData><ArticleIdList><ArticleId IdType="doi">10.1000/mock.{i}</ArticleId>'
+        f'</ArticleIdList></PubmedData></PubmedArticle>'
+    )
+
+
+def _crossref_item(i: int, journal: str) -> Dict:
+    return {
+        'DOI': f'10.2000/mock.{i}',
+        'title': [_title(i)],
+        'author': [{'given': 'A', 'family': f'Author{i}'}],
+        'published-print': {'date-parts': [[2025, 2, 1]]},
+        'container-title': [journal],
+        'abstract': '<jats:p>A deep learning approach to clinical prediction.</jats:p>',
+        'ISSN': ['1234-5678'],
+        'is-referenced-by-count': i % 50,
+    }
+
+
+class MockServices:
+    """
+    本地模拟服务
+    with MockServices(MockConfig(records=1000)) as services:
+        scraper.PUBMED_BASE_URL = services.eutils_url
+    """
+
+    def __init__(self, config: Optional[MockConfig] = None, host: str = '127.0.0.1', port: int = 0):
+        self.config = config or MockConfig()
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._count = 0
+        self.stats: Dict[str, int] = {}
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    @property
+    def eutils_url(self) -> str:
+        return f'{self.base_url}/entrez/eutils/'
+
+    @property
+    def crossref_url(self) -> str:
+        return f'{self.base_url}/works'
+
+    @property
+    def serpapi_url(self) -> str:
+        return f'{self.base_url}/search'
+
+    def rss_feeds(self, count: int) -> Dict[str, str]:
+        return {f'Mock Journal {n}': f'{self.base_url}/rss/feed{n}.xml' for n in range(count)}
+
+    def start(self) -> 'MockServices':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {}
+
+    @property
+    def request_count(self) -> int:
+        return self.stats.get('requests', 0)
+
+    def _record(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self.stats[key] = self.stats.get(key, 0) + 1
+
+    def _fault(self) -> Optional[int]:
+        """
+        按配置决定是否注入 429 / 503，返回状态码或 None
+        """
+        config = self.config
+        with self._lock:
+            self._count += 1
+            position = self._count
+            roll = self._random.random()
+        if config.burst_every and (position - 1) % config.burst_every < config.burst_length:
+            return 429
+        if roll < config.error_rate:
+            return 503
+        return None
+
+    def _delay(self):
+        config = self.config
+        if config.latency or config.jitter:
+            with self._lock:
+                extra = self._random.uniform(0, config.jitter) if config.jitter else 0.0
+            time.sleep(config.latency + extra)
+
+    def _handler_class(self):
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self._route(parse_qs(urlparse(self.path).query))
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                params = parse_qs(urlparse(self.path).query)
+                params.update(parse_qs(self.rfile.read(length).decode('utf-8')))
+                self._route(params)
+
+            def _send(self, body, content_type: str = 'application/json', status: int = 200,
+                      headers: Optional[Dict[str, str]] = None):
+                if isinstance(body, (dict, list)):
+                    body = json.dumps(body)
+                data = body.encode('utf-8') if isinstance(body, str) else body
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _route(self, query: Dict[str, List[str]]):
+                path = urlparse(self.path).path
+                endpoint = path.rsplit('/', 1)[-1].replace('.fcgi', '') if '/rss/' not in path else 'rss'
+                services._delay()
+
+                fault = services._fault()
+                if fault is not None:
+                    services._record('requests', f'status_{fault}')
+                    headers = {}
+                    if fault == 429 and services.config.retry_after is not None:
+                        headers['Retry-After'] = str(services.config.retry_after)
+                    return self._send({'error': 'mock fault'}, status=fault, headers=headers)
+                services._record('requests', endpoint)
+
+                get = lambda key, default=None: query.get(key, [default])[0]
+                handler = {
+                    'esearch': self._esearch, 'esummary': self._esummary, 'efetch': self._efetch,
+                    'epost': self._epost, 'works': self._works, 'search': self._search, 'rss': self._rss,
+                }.get(endpoint)
+                if handler is None:
+                    return self._send({'error': f'unknown path {path}'}, status=404)
+                handler(get)
+
+            def _ids(self, get) -> List[int]:
+                if get('id'):
+                    return [int(x) for x in get('id').split(',') if x.strip().isdigit()]
+                total = services.config.records
+                webenv = get('WebEnv', '')
+                if webenv.startswith('POST'):
+                    return [int(x) for x in webenv[4:].split('-') if x][int(get('retstart', 0)):][:int(get('retmax', 20))]
+                start = int(get('retstart', 0))
+                return list(range(1, total + 1))[start:start + int(get('retmax', 20))]
+
+            def _esearch(self, get):
+                total = services.config.records
+                start, retmax = int(get('retstart', 0)), int(get('retmax', 20))
+                result = {'count': str(total), 'retstart': str(start), 'retmax': str(retmax),
+                          'idlist': [str(i) for i in range(start + 1, min(total, start + retmax) + 1)]}
+                if get('usehistory') == 'y':
+                    result.update(webenv='MOCKWEBENV', querykey='1')
+                self._send({'esearchresult': result})
+
+            def _esummary(self, get):
+                ids = self._ids(get)
+                result = {'uids': [str(i) for i in ids]}
+                result.update({str(i): _summary_record(i) for i in ids})
+                self._send({'result': result})
+
+            def _efetch(self, get):
+                body = ('<?xml version="1.0"?><PubmedArticleSet>'
+                        + ''.join(_efetch_record(i) for i in self._ids(get)) + '</PubmedArticleSet>')
+                self._send(body, 'text/xml')
+
+            def _epost(self, get):
+                ids = [x for x in (get('id') or '').split(',') if x.strip().isdigit()]
+                self._send(f'<ePostResult><QueryKey>1</QueryKey><WebEnv>POST{"-".join(ids)}</WebEnv></ePostResult>',
+                           'text/xml')
+
+            def _works(self, get):
+                filters = get('filter', '')
+                dois = [f[4:] for f in filters.split(',') if f.startswith('doi:')]
+                if dois:
+                    items = []
+                    for doi in dois:
+                        suffix = doi.rsplit('.', 1)[-1]
+                        i = int(suffix) if suffix.isdigit() else 0
+                        item = _crossref_item(i, _journal(i))
+                        item['DOI'] = doi
+                        items.append(item)
+                    return self._send({'message': {'items': items, 'total-results': len(items)}})
+
+                total = services.config.records
+                rows = int(get('rows', 20))
+                cursor = get('cursor', '*')
+                offset = 0 if cursor in (None, '*') else int(cursor)
+                journal = get('query.container-title', 'Nature')
+                items = [_crossref_item(i, journal) for i in range(offset, min(offset + rows, total))]
+                self._send({'message': {'items': items, 'total-results': total, 'next-cursor': str(offset + rows)}})
+
+            def _search(self, get):
+                count = min(int(get('num', 10)), services.config.scholar_results)
+                results = [{
+                    'title': _title(i),
+                    'link': f'https://www.nature.com/articles/s41591-025-{i:05d}-x',
+                    'snippet': 'A deep learning model for clinical diagnosis in medical imaging.',
+                    'publication_info': {'summary': f'{_journal(i)}, 2025', 'authors': [{'name': f'Author{i} A'}]},
+                } for i in range(1, count + 1)]
+                self._send({'organic_results': results})
+
+            def _rss(self, get):
+                etag = '"mock-v1"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                items = []
+                for i in range(services.config.rss_items):
+                    # 一半条目与关键词无关，用于检验本地过滤
+                    relevant = i % 2 == 0
+                    title = _title(i) if relevant else f'Plant cell wall biology {i}'
+                    description = 'Outcomes in a clinical cohort.' if relevant else 'Growth of plant tissues.'
+                    items.append(
+                        f'<item><title>{escape(title)}</title><link>https://example.org/rss/{i}</link>'
+                        f'<description>{description}</description>'
+                        f'<dc:creator>Author{i} A</dc:creator><prism:doi>10.3000/mock.{i}</prism:doi></item>'
+                    )
+                body = ('<?xml version="1.0"?><rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/" '
+                        'xmlns:prism="http://prismstandard.org/namespaces/basic/2.0/"><channel><title>Mock</title>'
+                        + ''.join(items) + '</channel></rss>')
+                self._send(body, 'application/rss+xml', headers={'ETag': etag})
+
+        return Handler
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+基于 MinHash + 局部敏感哈希（LSH）的近似重复检测
+用于识别被截断、含HTML标签或标点不同的同一篇文章标题
+每条记录只与同一LSH桶中的候选比较，整体复杂度接近线性
+
+安装 numpy（可选）后签名用一次数组运算生成，10万条标题的签名从约1分钟降到数秒：pip install numpy
+"""
+
+import html
+import random
+import re
+import zlib
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_MAX_HASH = (1 << 32) - 1
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_NON_WORD_RE = re.compile(r'[\W_]+', re.UNICODE)
+_TRUNCATION_RE = re.compile(r'(\.\.\.|…)\s*$')
+
+
+def normalize_text(text: str) -> str:
+    """
+    去除HTML标签和实体、截断省略号、标点，统一小写和空白
+    """
+    text = html.unescape(_TAG_RE.sub(' ', text or ''))
+    text = _TRUNCATION_RE.sub('', text.strip())
+    return ' '.join(_NON_WORD_RE.sub(' ', text.lower()).split())
+
+
+def shingles(text: str, size: int = 5) -> set:
+    """
+    字符级 k-shingle，返回32位哈希集合
+    """
+    if len(text) <= size:
+        return {zlib.crc32(text.encode('utf-8'))} if text else set()
+    return {zlib.crc32(text[i:i + size].encode('utf-8')) for i in range(len(text) - size + 1)}
+
+
+def choose_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    选择 bands × rows = num_perm，使LSH的S曲线拐点 (1/b)^(1/r) 最接近阈值
+    """
+    best = (num_perm, 1)
+    best_error = float('inf')
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class MinHasher:
+    """
+    生成 MinHash 签名
+    每个哈希函数为 shingle 哈希与一个随机掩码异或。
+    有 numpy 时把全部掩码与全部 shingle 哈希一次异或成 (num_perm × shingle数) 矩阵再按行取最小值；
+    没有时逐个掩码 min(map(...))，两种方式得到的签名完全相同
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.masks = [rng.getrandbits(32) for _ in range(num_perm)]
+        self._mask_column = np.array(self.masks, dtype=np.uint32)[:, None] if np is not None else None
+
+    def signature(self, hashes: Iterable[int]) -> Tuple[int, ...]:
+        hashes = list(hashes)
+        if not hashes:
+            return tuple([_MAX_HASH] * self.num_perm)
+        if self._mask_column is not None:
+            values = np.array(hashes, dtype=np.uint32)
+            return tuple(np.bitwise_xor(self._mask_column, values).min(axis=1).tolist())
+        return tuple(min(map(mask.__xor__, hashes)) for mask in self.masks)
+
+
+def estimate_similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+class NearDuplicateIndex:
+    """
+    流式近似重复索引
+    add() 逐条加入记录，返回与之相似度达到阈值的已有记录键（无则返回 None）
+    clusters() 返回所有包含两条以上记录的聚类
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, shingle_size: int = 5):
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.hasher = MinHasher(num_perm)
+        self.bands, self.rows = choose_bands(num_perm, threshold)
+        self._buckets: List[Dict[Tuple[int, ...], List[Hashable]]] = [{} for _ in range(self.bands)]
+        self._signatures: Dict[Hashable, Tuple[int, ...]] = {}
+        self._parent: Dict[Hashable, Hashable] = {}
+
+    def _find(self, key: Hashable) -> Hashable:
+        root = key
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[key] != root:
+            self._parent[key], key = root, self._parent[key]
+        return root
+
+    def _union(self, a: Hashable, b: Hashable):
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a != root_b:
+            # 保留先加入的记录作为聚类代表
+            self._parent[root_b] = root_a
+
+    def add(self, key: Hashable, text: str) -> Optional[Hashable]:
+        normalized = normalize_text(text)
+        if not normalized:
+            return None
+        signature = self.hasher.signature(shingles(normalized, self.shingle_size))
+        self._signatures[key] = signature
+        self._parent[key] = key
+
+        match = None
+        checked = set()
+        for band, buckets in enumerate(self._buckets):
+            band_key = signature[band * self.rows:(band + 1) * self.rows]
+            candidates = buckets.setdefault(band_key, [])
+            for candidate in candidates:
+                if candidate in checked or self._find(candidate) == self._find(key):
+                    continue
+                checked.add(candidate)
+                if estimate_similarity(signature, self._signatures[candidate]) >= self.threshold:
+                    self._union(candidate, key)
+                    if match is None:
+                        match = self._find(candidate)
+            candidates.append(key)
+        return match
+
+    def clusters(self) -> List[List[Hashable]]:
+        groups: Dict[Hashable, List[Hashable]] = {}
+        for key in self._parent:
+            groups.setdefault(self._find(key), []).append(key)
+        return [members for members in groups.values() if len(members) > 1]
+
+
+def find_near_duplicates(records: List[Dict], threshold: float = 0.8,
+                         fields: Tuple[str, ...] = ('title', 'Title')) -> List[List[int]]:
+    """
+    对记录列表做近似重复聚类，返回记录下标的聚类（每个聚类按原顺序排列）
+    """
+    index = NearDuplicateIndex(threshold)
+    for i, record in enumerate(records):
+        text = next((record.get(field) for field in fields if record.get(field)), '')
+        index.add(i, text)
+    return [sorted(cluster) for cluster in index.clusters()]
+
+
+def drop_near_duplicates(records: List[Dict], threshold: float = 0.8) -> Tuple[List[Dict], List[List[int]]]:
+    """
+    每个聚类只保留最先出现的记录，返回 (去重后的记录, 聚类)
+    """
+    clusters = find_near_duplicates(records, threshold)
+    dropped = {i for cluster in clusters for i in cluster[1:]}
+    return [record for i, record in enumerate(records) if i not in dropped], clusters
+
+
+def print_clusters(records: List[Dict], clusters: List[List[int]], limit: int = 10):
+    """
+    打印聚类报告
+    """
+    print(f"\n近似重复聚类: {len(clusters)} 组")
+    for n, cluster in enumerate(clusters[:limit], 1):
+        print(f"  [{n}]")
+        for i in cluster:
+            record = records[i]
+            title = record.get('title') or record.get('Title') or ''
+            source = record.get('data_source', '')
+            print(f"    - {title[:80]} {f'({source})' if source else ''}")
+    if len(clusters) > limit:
+        print(f"  ... 其余 {len(clusters) - limit} 组省略")
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+增量输出写入器
+爬取过程中逐批写入CSV / JSON Lines / JSON数组，
+部分结果随时落盘，不需要把全部结果保存在内存中再一次性序列化
+"""
+
+import csv
+import json
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from article import to_json
+from dedup_index import DedupIndex
+
+
+class OutputSink:
+    """
+    写入器基类：write() 先进入缓冲区，达到 batch_size 条后批量写入并刷新到磁盘
+    """
+
+    def __init__(self, path: str, batch_size: int = 100, encoding: str = 'utf-8'):
+        self.path = path
+        self.batch_size = batch_size
+        self.count = 0
+        self._buffer: List[Dict] = []
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, 'w', newline='', encoding=encoding)
+        self._open()
+
+    def _open(self):
+        pass
+
+    def _write_batch(self, records: List[Dict]):
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+    def write(self, record: Dict):
+        with self._lock:
+            self._buffer.append(record)
+            self.count += 1
+            if len(self._buffer) >= self.batch_size:
+                self._flush()
+
+    def write_many(self, records: Iterable[Dict]):
+        for record in records:
+            self.write(record)
+
+    def _flush(self):
+        if self._buffer:
+            self._write_batch(self._buffer)
+            self._buffer = []
+        self._file.flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._flush()
+            self._close()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class CsvSink(OutputSink):
+    def __init__(self, path: str, fieldnames: Sequence[str], batch_size: int = 100,
+                 encoding: str = 'utf-8'):
+        self.fieldnames = list(fieldnames)
+        super().__init__(path, batch_size, encoding)
+
+    def _open(self):
+        self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames, extrasaction='ignore')
+        self._writer.writeheader()
+
+    def _write_batch(self, records: List[Dict]):
+        self._writer.writerows(records)
+
+
+class JsonLinesSink(OutputSink):
+    """
+    JSON Lines：每行一条记录，可随时追加和逐行读取
+    """
+
+    def _write_batch(self, records: List[Dict]):
+        self._file.write(''.join(json.dumps(record, ensure_ascii=False, default=to_json) + '\n' for record in records))
+
+
+class JsonArraySink(OutputSink):
+    """
+    JSON数组（与原有 .json 输出格式兼容），逐条编码写入
+    """
+
+    def __init__(self, path: str, batch_size: int = 100, encoding: str = 'utf-8', indent: Optional[int] = 2):
+        self.indent = indent
+        self._written = 0
+        super().__init__(path, batch_size, encoding)
+
+    def _open(self):
+        self._file.write('[')
+
+    def _write_batch(self, records: List[Dict]):
+        pad = ' ' * (self.indent or 0)
+        for record in records:
+            text = json.dumps(record, ensure_ascii=False, indent=self.indent, default=to_json)
+            if self.indent:
+                text = pad + text.replace('\n', '\n' + pad)
+            self._file.write((',\n' if self._written else '\n') + text)
+            self._written += 1
+
+    def _close(self):
+        self._file.write('\n]' if self._written else ']')
+
+
+class MultiSink:
+    """
+    同时写入多个输出
+    """
+
+    def __init__(self, sinks: Sequence[OutputSink]):
+        self.sinks = list(sinks)
+
+    @property
+    def count(self) -> int:
+        return self.sinks[0].count if self.sinks else 0
+
+    @property
+    def paths(self) -> List[str]:
+        return [sink.path for sink in self.sinks]
+
+    def write(self, record: Dict):
+        for sink in self.sinks:
+            sink.write(record)
+
+    def write_many(self, records: Iterable[Dict]):
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def open_sinks(csv_path: str, fieldnames: Sequence[str], formats: Sequence[str] = ('csv', 'json'),
+               encoding: str = 'utf-8', batch_size: int = 100) -> MultiSink:
+    """
+    按格式列表打开输出：csv / json（JSON数组）/ jsonl（JSON Lines）/ parquet（列式，需 pyarrow）
+    其他格式的文件名由CSV路径替换扩展名得到
+    """
+    base = csv_path[:-4] if csv_path.endswith('.csv') else csv_path
+    sinks = []
+    for fmt in formats:
+        if fmt == 'csv':
+            sinks.append(CsvSink(f'{base}.csv', fieldnames, batch_size, encoding))
+        elif fmt == 'json':
+            sinks.append(JsonArraySink(f'{base}.json', batch_size))
+        elif fmt == 'jsonl':
+            sinks.append(JsonLinesSink(f'{base}.jsonl', batch_size))
+        elif fmt == 'parquet':
+            # pyarrow 为可选依赖，只在需要时导入
+            from columnar_store import ParquetSink
+            sinks.append(ParquetSink(f'{base}.parquet', fieldnames))
+        else:
+            raise ValueError(f'未知的输出格式: {fmt}')
+    return MultiSink(sinks)
+
+
+class StreamWriter:
+    """
+    爬取过程中的边爬边写输出
+    每个工作单元的结果先经过去重索引，再写入CSV / JSON Lines并立即刷新，
+    中途中断时已完成部分已在磁盘上
+    """
+
+    def __init__(self, csv_path: str, fieldnames: Sequence[str], formats: Sequence[str] = ('csv', 'jsonl'),
+                 encoding: str = 'utf-8', batch_size: int = 100):
+        self.sink = open_sinks(csv_path, fieldnames, formats, encoding, batch_size)
+        self.index = DedupIndex()
+
+    def emit(self, records: Iterable[Dict]):
+        self.sink.write_many(self.index.filter(records))
+        self.sink.flush()
+
+    def close(self):
+        self.sink.close()
+        for path in self.sink.paths:
+            print(f"✓ 流式输出已保存: {path} ({self.sink.count} 条)")
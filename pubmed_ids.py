@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+PubMed ID解析
+大批PMID先用 epost（POST请求体）提交到历史服务器，再按 WebEnv / query_key 分页调用 esummary / efetch：
+- 不再把上百个ID拼进URL，也不会截断ID列表
+- 每批的记录数根据上一批的响应时间和响应大小自动调整：响应快、体积小就加大批次，
+  超时或失败时减半重试，在单次往返取回尽量多记录的同时避免超时
+"""
+
+import time
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, IO, Iterator, List, Optional, Sequence, Tuple
+
+import requests
+
+from article import Article
+from pubmed_xml import iter_pubmed_articles
+
+# 单次 epost 提交的ID数
+EPOST_MAX = 5000
+
+# 每批记录数上限（esummary / efetch 的 retmax 上限为 10,000）
+BATCH_MAX = 10000
+
+
+def _batch_too_large(error: requests.RequestException) -> bool:
+    """
+    失败是否可能由批次过大引起：超时、连接中断、414 或 5xx；其他 4xx（如检索式错误）缩小批次也无济于事
+    """
+    if not isinstance(error, requests.HTTPError):
+        return True
+    status = error.response.status_code if error.response is not None else None
+    return status is not None and (status == 414 or status >= 500)
+
+
+class BatchTuner:
+    """
+    根据每批的响应时间和响应大小调整下一批的记录数
+    下一批取 min(目标耗时 / 每条耗时, 目标大小 / 每条大小)，每次最多翻倍，失败时减半
+    """
+
+    def __init__(self, initial: int = 200, minimum: int = 20, maximum: int = BATCH_MAX,
+                 target_seconds: float = 5.0, target_bytes: int = 8 * 1024 * 1024):
+        self.size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_seconds = target_seconds
+        self.target_bytes = target_bytes
+
+    def _clamp(self, size: float) -> int:
+        return int(max(self.minimum, min(self.maximum, size)))
+
+    def observe(self, count: int, seconds: float, nbytes: int):
+        if count <= 0:
+            return
+        ideal = self.maximum
+        if seconds > 0:
+            ideal = min(ideal, self.target_seconds * count / seconds)
+        if nbytes > 0:
+            ideal = min(ideal, self.target_bytes * count / nbytes)
+        self.size = self._clamp(min(ideal, self.size * 2))
+
+    def shrink(self) -> bool:
+        """
+        批次减半，已是最小批次时返回False
+        """
+        if self.size <= self.minimum:
+            return False
+        self.size = self._clamp(self.size // 2)
+        return True
+
+
+class _CountingReader:
+    """
+    统计流式响应实际读取的字节数
+    """
+
+    def __init__(self, raw: IO[bytes]):
+        self.raw = raw
+        self.nbytes = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.raw.read(size)
+        self.nbytes += len(data)
+        return data
+
+
+class PubMedIdResolver:
+    """
+    按PMID（或已有的历史服务器结果集）批量取回esummary / efetch记录
+    tuners 按端点保存批次调节器，爬虫实例传入同一个字典，多次调用间延续调好的批次
+    """
+
+    def __init__(self, transport, base_url: str, ncbi_params: Callable[[Dict], Dict] = dict,
+                 tuners: Optional[Dict[str, BatchTuner]] = None, initial_batch: int = 200):
+        self.transport = transport
+        self.base_url = base_url
+        self.ncbi_params = ncbi_params
+        self.tuners = tuners if tuners is not None else {}
+        self.initial_batch = initial_batch
+
+    def tuner(self, endpoint: str) -> BatchTuner:
+        if endpoint not in self.tuners:
+            self.tuners[endpoint] = BatchTuner(initial=self.initial_batch)
+        return self.tuners[endpoint]
+
+    def post(self, id_list: Sequence[str]) -> List[Tuple[str, str, int]]:
+        """
+        用 epost 提交ID，返回 [(WebEnv, query_key, ID数)]
+        """
+        sets = []
+        for start in range(0, len(id_list), EPOST_MAX):
+            chunk = id_list[start:start + EPOST_MAX]
+            response = self.transport.post(f'{self.base_url}epost.fcgi',
+                                           data=self.ncbi_params({'db': 'pubmed', 'id': ','.join(chunk)}),
+                                           timeout=60)
+            root = ET.fromstring(response.content)
+            webenv, query_key = root.findtext('WebEnv'), root.findtext('QueryKey')
+            if not webenv or not query_key:
+                raise ValueError(f"epost 未返回 WebEnv: {root.findtext('ERROR') or response.text[:200]}")
+            sets.append((webenv, query_key, len(chunk)))
+        return sets
+
+    def _pages(self, endpoint: str, webenv: str, query_key: str, count: int, params: Dict,
+               read: Callable[[requests.Response], Tuple[object, int]], stream: bool = False) -> Iterator[Tuple[int, object]]:
+        """
+        按调节后的批次分页，产出 (已取回的条数, 该批结果)
+        请求超时、连接中断、414 或 5xx 时批次减半重试同一位置，已是最小批次时抛出异常；
+        其他 4xx 直接抛出
+        """
+        tuner = self.tuner(endpoint)
+        url = f'{self.base_url}{endpoint}.fcgi'
+        retstart = 0
+        while retstart < count:
+            size = min(tuner.size, count - retstart)
+            data = self.ncbi_params({'db': 'pubmed', 'WebEnv': webenv, 'query_key': query_key,
+                                     'retstart': retstart, 'retmax': size, **params})
+            start = time.perf_counter()
+            try:
+                with self.transport.post(url, data=data, timeout=60, stream=stream) as response:
+                    result, nbytes = read(response)
+            except (requests.Timeout, requests.ConnectionError, requests.HTTPError) as e:
+                if not _batch_too_large(e) or not tuner.shrink():
+                    raise
+                print(f"  ⚠️  {endpoint} 第 {retstart + 1}-{retstart + size} 条失败({e.__class__.__name__})，"
+                      f"批次缩小到 {tuner.size} 重试")
+                continue
+            tuner.observe(size, time.perf_counter() - start, nbytes)
+            retstart += size
+            yield retstart, result
+
+    @staticmethod
+    def _read_summary(response: requests.Response) -> Tuple[Dict, int]:
+        return response.json(), len(response.content)
+
+    @staticmethod
+    def _read_articles(response: requests.Response) -> Tuple[List[Article], int]:
+        response.raw.decode_content = True
+        reader = _CountingReader(response.raw)
+        return list(iter_pubmed_articles(reader)), reader.nbytes
+
+    def summary_pages(self, webenv: str, query_key: str, count: int) -> Iterator[Tuple[int, Dict]]:
+        """
+        从历史服务器结果集分页读取 esummary（JSON）
+        """
+        return self._pages('esummary', webenv, query_key, count, {'retmode': 'json'}, self._read_summary)
+
+    def article_pages(self, webenv: str, query_key: str, count: int) -> Iterator[Tuple[int, List[Article]]]:
+        """
+        从历史服务器结果集分页读取 efetch（XML，边下载边解析）
+        """
+        return self._pages('efetch', webenv, query_key, count, {'retmode': 'xml', 'rettype': 'abstract'},
+                           self._read_articles, stream=True)
+
+    def summaries(self, id_list: Sequence[str]) -> Iterator[Tuple[int, Dict]]:
+        """
+        取回全部ID的 esummary，产出 (已取回的条数, esummary JSON)
+        """
+        done = 0
+        for webenv, query_key, count in self.post(id_list):
+            for fetched, data in self.summary_pages(webenv, query_key, count):
+                yield done + fetched, data
+            done += count
+
+    def articles(self, id_list: Sequence[str]) -> Iterator[Tuple[int, List[Article]]]:
+        """
+        取回全部ID的完整记录（efetch），产出 (已取回的条数, 该批文章)
+        """
+        done = 0
+        for webenv, query_key, count in self.post(id_list):
+            for fetched, batch in self.article_pages(webenv, query_key, count):
+                yield done + fetched, batch
+            done += count
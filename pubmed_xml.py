@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+PubMed efetch XML 流式解析
+使用 iterparse 逐篇解析 PubmedArticle，解析完立即清理元素，内存占用恒定
+"""
+
+import xml.etree.ElementTree as ET
+from typing import IO, Iterator, List
+
+from article import Article
+
+MONTHS = {
+    'jan': '01', 'feb': '02', 'mar': '03', 'apr': '04', 'may': '05', 'jun': '06',
+    'jul': '07', 'aug': '08', 'sep': '09', 'oct': '10', 'nov': '11', 'dec': '12'
+}
+
+
+def _text(elem) -> str:
+    """
+    获取元素的全部文本（包括 <i>、<sup> 等内嵌标签）
+    """
+    if elem is None:
+        return ''
+    return ' '.join(''.join(elem.itertext()).split())
+
+
+def _pub_date(article) -> str:
+    """
+    解析发表日期，优先 Year/Month/Day，其次 MedlineDate
+    """
+    pub_date = article.find('Journal/JournalIssue/PubDate')
+    if pub_date is None:
+        return ''
+    year = pub_date.findtext('Year')
+    if not year:
+        return pub_date.findtext('MedlineDate', '')
+    parts = [year]
+    month = pub_date.findtext('Month')
+    if month:
+        parts.append(MONTHS.get(month[:3].lower(), month.zfill(2)))
+        day = pub_date.findtext('Day')
+        if day:
+            parts.append(day.zfill(2))
+    return '-'.join(parts)
+
+
+def _authors(article, limit: int) -> List[str]:
+    names = []
+    for author in article.findall('AuthorList/Author'):
+        collective = author.findtext('CollectiveName')
+        if collective:
+            names.append(collective)
+        else:
+            name = ' '.join(filter(None, [author.findtext('LastName'), author.findtext('Initials')]))
+            if name:
+                names.append(name)
+        if len(names) >= limit:
+            break
+    return names
+
+
+def _abstract(article) -> str:
+    sections = []
+    for abstract_text in article.findall('Abstract/AbstractText'):
+        text = _text(abstract_text)
+        label = abstract_text.get('Label')
+        sections.append(f"{label}: {text}" if label and text else text)
+    return ' '.join(filter(None, sections))
+
+
+def _doi(pubmed_article, article) -> str:
+    for eloc in article.findall('ELocationID'):
+        if eloc.get('EIdType') == 'doi' and eloc.text:
+            return eloc.text.strip()
+    for article_id in pubmed_article.findall('PubmedData/ArticleIdList/ArticleId'):
+        if article_id.get('IdType') == 'doi' and article_id.text:
+            return article_id.text.strip()
+    return ''
+
+
+def parse_pubmed_article(pubmed_article, author_limit: int = 5) -> Article:
+    """
+    将单个 PubmedArticle 元素转换为文章记录
+    """
+    citation = pubmed_article.find('MedlineCitation')
+    article = citation.find('Article')
+    pmid = citation.findtext('PMID', '')
+    mesh_terms = [_text(d) for d in citation.findall('MeshHeadingList/MeshHeading/DescriptorName')]
+
+    return Article(
+        pmid=pmid,
+        title=_text(article.find('ArticleTitle')),
+        authors=', '.join(_authors(article, author_limit)),
+        journal=_text(article.find('Journal/Title')),
+        pub_date=_pub_date(article),
+        doi=_doi(pubmed_article, article),
+        source=citation.findtext('MedlineJournalInfo/MedlineTA', ''),
+        abstract=_abstract(article),
+        mesh_terms='; '.join(mesh_terms),
+    )
+
+
+def iter_pubmed_articles(source: IO[bytes], author_limit: int = 5) -> Iterator[Article]:
+    """
+    从 efetch 返回的XML流中逐篇生成文章
+    source 可以是文件对象或 response.raw 等字节流
+    """
+    context = ET.iterparse(source, events=('start', 'end'))
+    root = None
+    for event, elem in context:
+        if root is None and event == 'start':
+            root = elem
+        if event == 'end' and elem.tag == 'PubmedArticle':
+            yield parse_pubmed_article(elem, author_limit)
+            # 释放已处理的元素，避免整棵树留在内存中
+            elem.clear()
+            root.clear()
+        elif event == 'end' and elem.tag == 'PubmedBookArticle':
+            root.clear()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+PubMed检索计划
+esearch 最多只能取回前 9,999 条结果。先用 retmax=0 探测各检索式的结果数，再：
+- 全部期刊合起来不超过上限时只发一个检索式
+- 否则逐个期刊探测，结果为0的期刊不再检索，小期刊按结果数合并为 OR 检索式
+- 单个期刊超过上限时按出版日期窗口对半拆分，直到每个分片都不超过上限
+探测使用 usehistory=y，直接由探测得到的分片执行时复用其 WebEnv，不必重新检索
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# esearch / 历史服务器可取回的最大记录数
+ESEARCH_MAX = 9999
+
+# 单个检索式中最多合并的期刊数（避免URL过长）
+MAX_JOURNALS_PER_QUERY = 40
+
+
+def _format_date(value: date) -> str:
+    return value.strftime('%Y/%m/%d')
+
+
+def journal_clause(journals: Sequence[str]) -> str:
+    return ' OR '.join(f'"{journal}"[Journal]' for journal in journals)
+
+
+def search_window(year: int, reldate: int = None) -> Tuple[date, date, str]:
+    """
+    检索的日期窗口：全量为该年的出版日期（pdat），增量为最近 reldate 天的收录日期（edat）
+    """
+    if reldate:
+        today = date.today()
+        return today - timedelta(days=reldate), today, 'edat'
+    return date(year, 1, 1), date(year, 12, 31), 'pdat'
+
+
+class QueryShard:
+    """
+    检索计划中的一个分片：一组期刊 + 一个日期窗口
+    count 为探测到（或推算）的结果数，webenv / query_key 为探测时得到的历史服务器结果集
+    """
+
+    def __init__(self, journals: Sequence[str], mindate: date, maxdate: date, datetype: str = 'pdat',
+                 count: int = 0, webenv: Optional[str] = None, query_key: Optional[str] = None):
+        self.journals = tuple(journals)
+        self.mindate = mindate
+        self.maxdate = maxdate
+        self.datetype = datetype
+        self.count = count
+        self.webenv = webenv
+        self.query_key = query_key
+
+    @property
+    def key(self) -> str:
+        return f"{'|'.join(self.journals)}:{self.mindate}:{self.maxdate}:{self.datetype}"
+
+    @property
+    def label(self) -> str:
+        names = self.journals[0] if len(self.journals) == 1 else f'{self.journals[0]} 等{len(self.journals)}个期刊'
+        return f'{names} {self.mindate}~{self.maxdate}'
+
+    def date_params(self) -> Dict:
+        return {'datetype': self.datetype, 'mindate': _format_date(self.mindate),
+                'maxdate': _format_date(self.maxdate)}
+
+    def history_params(self, retstart: int, retmax: int) -> Dict:
+        return {'WebEnv': self.webenv, 'query_key': self.query_key, 'retstart': retstart, 'retmax': retmax}
+
+    def to_dict(self) -> Dict:
+        """
+        保存到检查点（WebEnv 会过期，不保存）
+        """
+        return {'journals': list(self.journals), 'mindate': self.mindate.isoformat(),
+                'maxdate': self.maxdate.isoformat(), 'datetype': self.datetype, 'count': self.count}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'QueryShard':
+        return cls(data['journals'], datetime.strptime(data['mindate'], '%Y-%m-%d').date(),
+                   datetime.strptime(data['maxdate'], '%Y-%m-%d').date(), data['datetype'], data['count'])
+
+    def __repr__(self) -> str:
+        return f'QueryShard({self.label!r}, count={self.count})'
+
+
+class EsearchProbe:
+    """
+    用 esearch（retmax=0, usehistory=y）探测分片结果数
+    build_term 根据期刊列表生成检索式（日期窗口通过 mindate/maxdate 参数传递）
+    """
+
+    def __init__(self, transport, base_url: str, build_term: Callable[[Sequence[str]], str],
+                 ncbi_params: Callable[[Dict], Dict] = dict):
+        self.transport = transport
+        self.base_url = base_url
+        self.build_term = build_term
+        self.ncbi_params = ncbi_params
+        self.requests = 0
+
+    def __call__(self, journals: Sequence[str], mindate: date, maxdate: date, datetype: str = 'pdat') -> QueryShard:
+        shard = QueryShard(journals, mindate, maxdate, datetype)
+        params = {
+            'db': 'pubmed',
+            'term': self.build_term(shard.journals),
+            'retmax': 0,
+            'retmode': 'json',
+            'usehistory': 'y',
+            **shard.date_params(),
+        }
+        self.requests += 1
+        # WebEnv 会在服务器端过期，探测结果不能复用缓存
+        response = self.transport.get(f'{self.base_url}esearch.fcgi', params=self.ncbi_params(params),
+                                      timeout=30, use_cache=False)
+        result = response.json().get('esearchresult', {})
+        shard.count = int(result.get('count', 0))
+        shard.webenv = result.get('webenv')
+        shard.query_key = result.get('querykey')
+        return shard
+
+    def ensure_history(self, shard: QueryShard) -> QueryShard:
+        """
+        合并或推算得到的分片没有 WebEnv，执行前补一次检索
+        """
+        if shard.webenv:
+            return shard
+        return self(shard.journals, shard.mindate, shard.maxdate, shard.datetype)
+
+
+class QueryPlanner:
+    """
+    生成请求数最少、且每个分片都能完整取回的检索计划
+    """
+
+    def __init__(self, probe: Callable[..., QueryShard], cap: int = ESEARCH_MAX,
+                 max_journals: int = MAX_JOURNALS_PER_QUERY, workers: int = 1):
+        self.probe = probe
+        self.cap = cap
+        self.max_journals = max_journals
+        self.workers = workers
+
+    def plan(self, journals: Sequence[str], mindate: date, maxdate: date, datetype: str = 'pdat') -> List[QueryShard]:
+        union = self.probe(journals, mindate, maxdate, datetype)
+        if union.count <= self.cap or len(journals) == 1:
+            return self.split(union)
+
+        # 合并检索超过上限：逐个期刊探测
+        if self.workers > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                singles = list(pool.map(lambda j: self.probe([j], mindate, maxdate, datetype), journals))
+        else:
+            singles = [self.probe([journal], mindate, maxdate, datetype) for journal in journals]
+
+        shards = []
+        for shard in singles:
+            if shard.count > self.cap:
+                shards.extend(self.split(shard))
+        shards.extend(self._pack([shard for shard in singles if 0 < shard.count <= self.cap]))
+        return shards
+
+    def split(self, shard: QueryShard) -> List[QueryShard]:
+        """
+        按日期窗口对半拆分，直到不超过上限；只探测左半部分，右半部分的结果数由差值推算
+        """
+        if not shard.count:
+            return []
+        if shard.count <= self.cap:
+            return [shard]
+        if shard.mindate >= shard.maxdate:
+            print(f"⚠️  {shard.label} 单日结果 {shard.count} 篇超过上限，只能取回前 {self.cap} 篇")
+            return [shard]
+        middle = shard.mindate + (shard.maxdate - shard.mindate) // 2
+        left = self.probe(shard.journals, shard.mindate, middle, shard.datetype)
+        right = QueryShard(shard.journals, middle + timedelta(days=1), shard.maxdate, shard.datetype,
+                           count=max(0, shard.count - left.count))
+        return self.split(left) + self.split(right)
+
+    def _pack(self, shards: List[QueryShard]) -> List[QueryShard]:
+        """
+        按结果数从大到小首次适应装箱，把小期刊合并为 OR 检索式
+        只有一个期刊的箱子沿用探测得到的分片（含 WebEnv）
+        """
+        bins: List[List[QueryShard]] = []
+        totals: List[int] = []
+        for shard in sorted(shards, key=lambda s: s.count, reverse=True):
+            for i, members in enumerate(bins):
+                if totals[i] + shard.count <= self.cap and len(members) < self.max_journals:
+                    members.append(shard)
+                    totals[i] += shard.count
+                    break
+            else:
+                bins.append([shard])
+                totals.append(shard.count)
+
+        packed = []
+        for members, total in zip(bins, totals):
+            if len(members) == 1:
+                packed.append(members[0])
+            else:
+                first = members[0]
+                packed.append(QueryShard([j for m in members for j in m.journals], first.mindate, first.maxdate,
+                                         first.datetype, count=total))
+        return packed
+
+
+def print_plan(shards: List[QueryShard], probes: int):
+    total = sum(shard.count for shard in shards)
+    print(f"检索计划: {len(shards)} 个检索式，共约 {total} 篇（探测 {probes} 次）")
+    for shard in shards:
+        print(f"  • {shard.label}: {shard.count} 篇")
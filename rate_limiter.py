@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+按主机限速的令牌桶
+所有爬虫类共享同一个进程级限速器，替代分散的 time.sleep 调用
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# NCBI E-utilities: 无API key时3次/秒，有API key时10次/秒
+NCBI_HOST = 'eutils.ncbi.nlm.nih.gov'
+NCBI_RATE = 3.0
+NCBI_RATE_WITH_KEY = 10.0
+
+# 各主机公开的请求速率（次/秒）
+DEFAULT_HOST_RATES = {
+    NCBI_HOST: NCBI_RATE,
+    'api.crossref.org': 5.0,
+    'serpapi.com': 1.0,
+    'feeds.nature.com': 5.0,
+    'www.science.org': 5.0,
+}
+
+# 未登记主机的默认速率
+DEFAULT_RATE = 1.0
+
+
+class TokenBucket:
+    """
+    线程安全的令牌桶
+    capacity 为允许的突发请求数，默认1（请求均匀间隔 1/rate 秒）
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def set_rate(self, rate: float):
+        with self._lock:
+            self.rate = rate
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        取出令牌，必要时阻塞等待
+        返回实际等待的秒数
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # 先预留令牌再睡眠，并发调用者会依次排队
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class HostRateLimiter:
+    """
+    按主机名分配令牌桶的限速器
+    """
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None,
+                 default_rate: float = DEFAULT_RATE, ncbi_api_key: Optional[str] = None):
+        self.rates = dict(DEFAULT_HOST_RATES)
+        if rates:
+            self.rates.update(rates)
+        self.default_rate = default_rate
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self.set_ncbi_api_key(ncbi_api_key)
+
+    def set_ncbi_api_key(self, api_key: Optional[str]):
+        """
+        根据是否提供NCBI API key切换速率档位
+        """
+        self.ncbi_api_key = api_key or None
+        self.set_rate(NCBI_HOST, NCBI_RATE_WITH_KEY if self.ncbi_api_key else NCBI_RATE)
+
+    def set_rate(self, host: str, rate: float):
+        with self._lock:
+            self.rates[host] = rate
+            if host in self._buckets:
+                self._buckets[host].set_rate(rate)
+
+    def bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rates.get(host, self.default_rate))
+            return self._buckets[host]
+
+    def acquire(self, url_or_host: str) -> float:
+        """
+        为目标URL（或主机名）取一个令牌，返回等待秒数
+        """
+        host = urlparse(url_or_host).hostname if '://' in url_or_host else url_or_host
+        return self.bucket(host or url_or_host).acquire()
+
+
+_shared_limiter: Optional[HostRateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter() -> HostRateLimiter:
+    """
+    获取进程内共享的限速器
+    首次创建时读取环境变量 NCBI_API_KEY
+    """
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = HostRateLimiter(ncbi_api_key=os.environ.get('NCBI_API_KEY'))
+        return _shared_limiter
+
+
+class SharedRateLimiter(HostRateLimiter):
+    """
+    跨进程、跨节点共享的限速器
+    每个主机下一个可用的请求时刻保存在共享的SQLite文件中，
+    所有工作节点在同一个事务里预留时刻，合起来不超过该主机的速率
+    （依赖各节点时钟同步，如NTP；共享卷上不要开启WAL）
+    """
+
+    def __init__(self, path: str, rates: Optional[Dict[str, float]] = None,
+                 default_rate: float = DEFAULT_RATE, ncbi_api_key: Optional[str] = None):
+        self.path = path
+        self._local = threading.local()
+        super().__init__(rates, default_rate, ncbi_api_key)
+        self._connect().execute('CREATE TABLE IF NOT EXISTS host_slots (host TEXT PRIMARY KEY, next_at REAL)')
+
+    def _connect(self) -> sqlite3.Connection:
+        # SQLite连接不跨线程共享，每个线程一个
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def acquire(self, url_or_host: str) -> float:
+        host = urlparse(url_or_host).hostname if '://' in url_or_host else url_or_host
+        host = host or url_or_host
+        interval = 1.0 / self.rates.get(host, self.default_rate)
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT next_at FROM host_slots WHERE host = ?', (host,)).fetchone()
+            now = time.time()
+            slot = max(now, row[0] if row else 0.0)
+            conn.execute('INSERT OR REPLACE INTO host_slots (host, next_at) VALUES (?, ?)', (host, slot + interval))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+基于SQLite的HTTP响应磁盘缓存
+- 以 方法 + URL + 规范化参数 为键
+- 按主机设置不同的有效期（TTL）
+- 超过容量上限时按最近最少使用（LRU）淘汰
+- 过期条目带 ETag / Last-Modified 时发起条件请求重新验证
+- 分页游标（Crossref cursor）只在服务器上保留几分钟，带游标参数的请求（包括 cursor=* 首页）不缓存
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_CACHE_PATH = os.path.expanduser('~/.cache/aicrawler/http_cache.sqlite')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# 各主机响应的有效期（秒）
+DEFAULT_TTLS = {
+    'eutils.ncbi.nlm.nih.gov': 6 * 3600,
+    'api.crossref.org': 24 * 3600,
+    'serpapi.com': 7 * 24 * 3600,
+    'feeds.nature.com': 30 * 60,
+    'www.science.org': 30 * 60,
+}
+DEFAULT_TTL = 3600
+
+# 不参与缓存键的参数
+IGNORED_PARAMS = frozenset({'api_key'})
+
+# 短时有效的分页游标参数：带这些参数的请求不缓存
+EPHEMERAL_PARAMS = frozenset({'cursor'})
+
+# 缓存中保存的是解码后的正文，这些头不再适用
+DROPPED_HEADERS = frozenset({'content-encoding', 'transfer-encoding', 'content-length', 'connection'})
+
+
+def cache_key(method: str, url: str, params: Optional[Dict] = None) -> str:
+    """
+    生成缓存键：参数排序后与URL合并，忽略 api_key 等凭据
+    """
+    prepared_url = requests.Request(method, url, params=params).prepare().url
+    parsed = urlparse(prepared_url)
+    query = sorted((k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True) if k not in IGNORED_PARAMS)
+    normalized = urlunparse(parsed._replace(query=urlencode(query), fragment=''))
+    return hashlib.sha256(f"{method.upper()} {normalized}".encode('utf-8')).hexdigest()
+
+
+def cacheable(url: str, params: Optional[Dict] = None) -> bool:
+    """
+    请求是否可以缓存：带分页游标的请求不缓存（cursor=* 首页也不缓存），
+    否则命中时返回的 next-cursor 可能已在服务器上过期
+    """
+    names = {name for name, _ in parse_qsl(urlparse(url).query, keep_blank_values=True)}
+    names.update(name for name, value in (params or {}).items() if value is not None)
+    return EPHEMERAL_PARAMS.isdisjoint(names)
+
+
+class CacheEntry:
+    __slots__ = ('key', 'url', 'status', 'headers', 'body', 'etag', 'last_modified', 'expires_at')
+
+    def __init__(self, key, url, status, headers, body, etag, last_modified, expires_at):
+        self.key = key
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self) -> bool:
+        return self.expires_at > time.time()
+
+    def validators(self) -> Dict[str, str]:
+        """
+        条件请求头
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def to_response(self) -> requests.Response:
+        response = requests.Response()
+        response.status_code = self.status
+        response._content = self.body
+        response.headers = CaseInsensitiveDict(json.loads(self.headers))
+        response.url = self.url
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        return response
+
+
+class ResponseCache:
+    """
+    线程安全的SQLite响应缓存
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttls: Optional[Dict[str, float]] = None, default_ttl: float = DEFAULT_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                status INTEGER,
+                headers TEXT,
+                body BLOB,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL,
+                last_access REAL,
+                size INTEGER
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access)')
+        self._conn.commit()
+
+    def ttl_for(self, url: str) -> float:
+        return self.ttls.get(urlparse(url).hostname or '', self.default_ttl)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """
+        读取缓存条目（包括已过期的，由调用方决定是否重新验证）
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT key, url, status, headers, body, etag, last_modified, expires_at '
+                'FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE responses SET last_access = ? WHERE key = ?', (time.time(), key))
+            self._conn.commit()
+        return CacheEntry(*row)
+
+    def store(self, key: str, response: requests.Response, url: Optional[str] = None):
+        """
+        保存成功的响应，url 为请求地址（用于确定TTL，默认取响应地址）
+        """
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in DROPPED_HEADERS}
+        body = response.content
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, response.url, response.status_code, json.dumps(headers), body,
+                 response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                 now + self.ttl_for(url or response.url), now, len(body))
+            )
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, key: str, entry: CacheEntry, url: Optional[str] = None):
+        """
+        304 Not Modified 后延长有效期
+        """
+        now = time.time()
+        entry.expires_at = now + self.ttl_for(url or entry.url)
+        with self._lock:
+            self._conn.execute('UPDATE responses SET expires_at = ?, last_access = ? WHERE key = ?',
+                               (entry.expires_at, now, key))
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute('SELECT key, size FROM responses ORDER BY last_access').fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            total -= size
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+
+
+_shared_cache: Optional[ResponseCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    获取进程内共享的响应缓存
+    环境变量 AICRAWLER_CACHE_PATH 指定缓存文件，AICRAWLER_NO_CACHE=1 时禁用缓存
+    """
+    global _shared_cache
+    if os.environ.get('AICRAWLER_NO_CACHE'):
+        return None
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache(os.environ.get('AICRAWLER_CACHE_PATH', DEFAULT_CACHE_PATH))
+        return _shared_cache
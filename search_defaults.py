@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+默认检索范围
+JournalScraper.scrape_all、分布式工作队列（work_queue.py）和批量任务运行器（job_runner.py）共用，
+默认设置下三种运行方式发出的检索完全相同
+"""
+
+# 数据源
+SOURCES = ('pubmed', 'crossref', 'scholar', 'rss')
+
+# 期刊系列
+JOURNAL_FAMILIES = {
+    'Nature': ['Nature', 'Nature Medicine', 'Nature Biotechnology', 'Nature Methods'],
+    'Science': ['Science', 'Science Translational Medicine'],
+    'Cell': ['Cell', 'Cell Systems', 'Cell Reports Medicine'],
+}
+
+# Crossref检索关键词（medical / clinical 等主题词只出现在PubMed检索式中，不参与Crossref检索）
+CROSSREF_KEYWORDS = ['machine learning', 'deep learning', 'artificial intelligence', 'neural network']
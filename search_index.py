@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+本地全文检索索引
+基于 SQLite FTS5，覆盖标题、摘要、作者和期刊，按 BM25 排序
+各爬虫保存结果时增量更新（与去重索引相同，PMID / DOI / 标题任一相同即为同一篇文章，合并为一行），
+之后的探索性检索直接离线查询，无需再调用 PubMed / Crossref
+
+使用方法:
+  python search_index.py "transformer" --journal Cell --year 2025
+  python search_index.py '"deep learning" AND (radiology OR pathology)' --limit 50
+  python search_index.py --add medical_ml_articles_2025.json
+  python search_index.py --stats
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from typing import Dict, Iterable, List, Optional
+
+from dedup_index import record_field, record_identifiers
+
+DEFAULT_INDEX_PATH = '/mnt/user-data/outputs/articles_index.sqlite'
+
+# bm25 各列权重：title, abstract, authors, journal
+BM25_WEIGHTS = (10.0, 4.0, 1.0, 2.0)
+
+_YEAR_RE = re.compile(r'(?:19|20)\d{2}')
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    key TEXT UNIQUE,
+    title TEXT,
+    abstract TEXT,
+    authors TEXT,
+    journal TEXT,
+    pub_date TEXT,
+    year INTEGER,
+    doi TEXT,
+    pmid TEXT,
+    link TEXT,
+    data_source TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_journal_year ON articles(journal COLLATE NOCASE, year);
+CREATE TABLE IF NOT EXISTS article_ids (
+    identifier TEXT PRIMARY KEY,
+    article_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_article_ids_article ON article_ids(article_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, abstract, authors, journal,
+    content='articles', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts(rowid, title, abstract, authors, journal)
+    VALUES (new.id, new.title, new.abstract, new.authors, new.journal);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, abstract, authors, journal)
+    VALUES ('delete', old.id, old.title, old.abstract, old.authors, old.journal);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, abstract, authors, journal)
+    VALUES ('delete', old.id, old.title, old.abstract, old.authors, old.journal);
+    INSERT INTO articles_fts(rowid, title, abstract, authors, journal)
+    VALUES (new.id, new.title, new.abstract, new.authors, new.journal);
+END;
+'''
+
+
+def fts5_available() -> bool:
+    try:
+        sqlite3.connect(':memory:').execute('CREATE VIRTUAL TABLE t USING fts5(x)')
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def _authors(record: Dict) -> str:
+    """
+    作者字段可能是字符串或列表（Google Scholar 返回 [{'name': ...}]）
+    """
+    value = record.get('authors') or record.get('Authors') or ''
+    if isinstance(value, (list, tuple)):
+        return ', '.join(a.get('name', '') if isinstance(a, dict) else str(a) for a in value)
+    return record_field(record, 'authors')
+
+
+# articles 表中可更新的列（与 _row 的顺序一致）
+_COLUMNS = ('title', 'abstract', 'authors', 'journal', 'pub_date', 'year', 'doi', 'pmid', 'link', 'data_source')
+
+
+def _row(record: Dict) -> tuple:
+    pub_date = record_field(record, 'pub_date') or record_field(record, 'year')
+    year = _YEAR_RE.search(pub_date)
+    abstract = (record_field(record, 'abstract') or record_field(record, 'summary')
+                or record_field(record, 'snippet'))
+    return (
+        record_field(record, 'title'), abstract, _authors(record), record_field(record, 'journal'),
+        pub_date, int(year.group(0)) if year else None, record_field(record, 'doi'), record_field(record, 'pmid'),
+        record_field(record, 'link') or record_field(record, 'url'), record_field(record, 'data_source'),
+    )
+
+
+class ArticleIndex:
+    """
+    文章全文检索索引
+    add() 按去重标识符插入或合并更新，search() 使用 FTS5 查询语法：
+    词语、"短语"、AND / OR / NOT、前缀 transform*、列过滤 title:xxx
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(_SCHEMA)
+        self._backfill_identifiers()
+
+    def _backfill_identifiers(self):
+        """
+        旧版本建立的索引只有单一记录键：按已有行的 PMID / DOI / 标题补建标识符表，
+        通过不同标识符指向同一篇文章的旧行在此合并
+        """
+        if self._conn.execute('SELECT 1 FROM article_ids LIMIT 1').fetchone() is not None:
+            return
+        rows = self._conn.execute('SELECT id, title, doi, pmid FROM articles ORDER BY id').fetchall()
+        if not rows:
+            return
+        with self._conn:
+            for row in rows:
+                identifiers = record_identifiers(dict(row))
+                if identifiers:
+                    self._link(row['id'], identifiers)
+
+    def _link(self, article_id: int, identifiers: List[str]) -> int:
+        """
+        把标识符登记到文章行；标识符已属于其他行时把这些行并入最早的一行，返回合并后的行号
+        """
+        placeholders = ','.join('?' * len(identifiers))
+        owners = {row[0] for row in self._conn.execute(
+            f'SELECT article_id FROM article_ids WHERE identifier IN ({placeholders})', identifiers)}
+        owners.add(article_id)
+        keep = min(owners)
+        for other in sorted(owners - {keep}):
+            self._merge_rows(keep, other)
+        self._conn.executemany('INSERT OR REPLACE INTO article_ids VALUES (?, ?)',
+                               [(identifier, keep) for identifier in identifiers])
+        return keep
+
+    def _merge_rows(self, keep: int, other: int):
+        """
+        把 other 行中 keep 行缺少的字段补进 keep 行，再删除 other 行
+        """
+        assignments = ', '.join(f"{column} = COALESCE(NULLIF({column}, ''), "
+                                f"(SELECT {column} FROM articles WHERE id = :other))" for column in _COLUMNS)
+        self._conn.execute(f'UPDATE articles SET {assignments} WHERE id = :keep', {'keep': keep, 'other': other})
+        self._conn.execute('DELETE FROM articles WHERE id = ?', (other,))
+        self._conn.execute('UPDATE article_ids SET article_id = ? WHERE article_id = ?', (keep, other))
+
+    def add(self, records: Iterable[Dict]) -> int:
+        """
+        插入或更新记录，返回写入的条数（没有标识符的记录跳过）
+        与已有行有任一相同标识符时合并为一行：新记录的非空字段覆盖旧值，空字段保留旧值
+        """
+        now = time.time()
+        count = 0
+        assignments = ', '.join(f"{column} = COALESCE(NULLIF(?, ''), {column})" for column in _COLUMNS)
+        with self._conn:
+            for record in records:
+                identifiers = record_identifiers(record)
+                if not identifiers:
+                    continue
+                row = _row(record)
+                placeholders = ','.join('?' * len(identifiers))
+                existing = self._conn.execute(
+                    f'SELECT MIN(article_id) FROM article_ids WHERE identifier IN ({placeholders})', identifiers
+                ).fetchone()[0]
+                if existing is None:
+                    article_id = self._conn.execute(f'''
+                        INSERT INTO articles (key, {', '.join(_COLUMNS)}, updated_at)
+                        VALUES ({', '.join('?' * (len(_COLUMNS) + 2))})
+                    ''', (identifiers[0], *row, now)).lastrowid
+                else:
+                    article_id = existing
+                    self._conn.execute(f'UPDATE articles SET {assignments}, updated_at = ? WHERE id = ?',
+                                       (*row, now, article_id))
+                self._link(article_id, identifiers)
+                count += 1
+        return count
+
+    def search(self, query: str, journal: Optional[str] = None, year: Optional[int] = None,
+               limit: int = 20) -> List[Dict]:
+        """
+        全文检索，按 BM25 相关度排序
+        查询语法错误时（如未闭合的引号）退化为按词检索
+        """
+        try:
+            return self._search(query, journal, year, limit)
+        except sqlite3.OperationalError:
+            words = re.findall(r'\w+', query)
+            if not words:
+                return []
+            return self._search(' '.join(f'"{w}"' for w in words), journal, year, limit)
+
+    def _search(self, query: str, journal: Optional[str], year: Optional[int], limit: int) -> List[Dict]:
+        sql = f'''
+            SELECT a.title, a.authors, a.journal, a.pub_date, a.doi, a.pmid, a.link, a.data_source,
+                   bm25(articles_fts, {', '.join(map(str, BM25_WEIGHTS))}) AS score,
+                   snippet(articles_fts, 1, '[', ']', '…', 16) AS snippet
+            FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid
+            WHERE articles_fts MATCH ?
+        '''
+        params: list = [query]
+        if journal:
+            sql += ' AND a.journal = ? COLLATE NOCASE'
+            params.append(journal)
+        if year:
+            sql += ' AND a.year = ?'
+            params.append(int(year))
+        sql += ' ORDER BY score LIMIT ?'
+        params.append(limit)
+        return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def stats(self) -> Dict:
+        total = self._conn.execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+        journals = self._conn.execute(
+            'SELECT journal, COUNT(*) AS n FROM articles GROUP BY journal ORDER BY n DESC'
+        ).fetchall()
+        return {'total': total, 'journals': [(row['journal'] or 'Unknown', row['n']) for row in journals]}
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def update_index(records: Iterable[Dict], path: Optional[str] = None) -> int:
+    """
+    保存结果后增量更新检索索引
+    环境变量 AICRAWLER_INDEX_PATH 指定索引文件，AICRAWLER_NO_INDEX=1 时跳过
+    """
+    if os.environ.get('AICRAWLER_NO_INDEX'):
+        return 0
+    if not fts5_available():
+        print("⚠️  当前SQLite不支持FTS5，跳过检索索引更新")
+        return 0
+    path = path or os.environ.get('AICRAWLER_INDEX_PATH', DEFAULT_INDEX_PATH)
+    with ArticleIndex(path) as index:
+        count = index.add(records)
+    print(f"✓ 检索索引已更新: {count} 篇 → {path}")
+    return count
+
+
+def load_records(path: str) -> Iterable[Dict]:
+    """
+    读取爬虫输出文件：.csv / .json / .jsonl / .parquet
+    """
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
+    elif path.endswith('.jsonl'):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif path.endswith('.parquet'):
+        from columnar_store import iter_records
+        yield from iter_records(path)
+    else:
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            yield from csv.DictReader(f)
+
+
+def print_results(results: List[Dict], elapsed: float):
+    print(f"\n找到 {len(results)} 条结果（{elapsed * 1000:.1f} ms）")
+    for i, article in enumerate(results, 1):
+        print(f"\n{i}. {article['title']}")
+        print(f"   期刊: {article['journal'] or 'N/A'} | 日期: {article['pub_date'] or 'N/A'}")
+        if article['authors']:
+            print(f"   作者: {article['authors'][:80]}")
+        link = f"https://doi.org/{article['doi']}" if article['doi'] else article['link']
+        if link:
+            print(f"   链接: {link}")
+        if article['snippet'] and '[' in article['snippet']:
+            print(f"   摘要: {article['snippet']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地文章全文检索')
+    parser.add_argument('query', nargs='?', help='FTS5检索式，如 transformer、"deep learning" AND radiology')
+    parser.add_argument('--journal', help='只检索指定期刊（全名，不区分大小写）')
+    parser.add_argument('--year', type=int, help='只检索指定年份')
+    parser.add_argument('--limit', type=int, default=20, help='最多返回条数（默认20）')
+    parser.add_argument('--index', default=os.environ.get('AICRAWLER_INDEX_PATH', DEFAULT_INDEX_PATH),
+                        help='索引文件路径')
+    parser.add_argument('--add', nargs='+', metavar='FILE', help='把已有的结果文件加入索引')
+    parser.add_argument('--stats', action='store_true', help='显示索引统计')
+    args = parser.parse_args()
+
+    if not fts5_available():
+        print("✗ 当前Python的SQLite不支持FTS5")
+        sys.exit(1)
+
+    with ArticleIndex(args.index) as index:
+        if args.add:
+            for path in args.add:
+                print(f"✓ {path}: 索引 {index.add(load_records(path))} 篇")
+        if args.stats:
+            stats = index.stats()
+            print(f"索引: {args.index}，共 {stats['total']} 篇")
+            for journal, count in stats['journals'][:20]:
+                print(f"  • {journal}: {count} 篇")
+        if args.query:
+            start = time.perf_counter()
+            results = index.search(args.query, args.journal, args.year, args.limit)
+            print_results(results, time.perf_counter() - start)
+        elif not args.add and not args.stats:
+            parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
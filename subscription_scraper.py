@@ -5,250 +5,399 @@
 支持多种数据源：Web of Science, Scopus, PubMed, 期刊官网RSS
 """
 
-import requests
 import feedparser
-import json
-import csv
-import time
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional, Sequence, Set, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import xml.etree.ElementTree as ET
+import os
+import threading
+
+from article import Article
+from crawl_state import CrawlState, load_results, merge_records, seen_before
+from crossref_enrich import CrossrefEnricher, fill_dois
+from dedup_index import deduplicate
+from http_transport import get_transport
+from keyword_matcher import compile_keywords
+from metrics import get_metrics
+from output_sinks import StreamWriter, open_sinks
+from pubmed_ids import PubMedIdResolver
+from query_planner import ESEARCH_MAX, EsearchProbe, QueryPlanner, journal_clause, print_plan, search_window
+from rate_limiter import get_rate_limiter
+from search_index import update_index
+
+def parse_feed(journal_name: str, body: bytes, doi_field: str, keywords: Sequence[str]) -> List[Article]:
+    """
+    解析RSS内容并按关键词筛选（模块级函数，可在进程池中运行）
+    """
+    feed = feedparser.parse(body)
+    matcher = compile_keywords(tuple(keywords))
+    articles = []
+    for entry in feed.entries:
+        # 检查标题或摘要是否包含相关关键词（单次扫描，按词边界匹配）
+        if matcher.search_any((entry.get('title', ''), entry.get('summary', ''))):
+            articles.append(Article(
+                title=entry.get('title', ''),
+                authors=entry.get('author', ''),
+                journal=journal_name,
+                pub_date=entry.get('published', ''),
+                link=entry.get('link', ''),
+                doi=entry.get(doi_field, ''),
+                summary=entry.get('summary', '')[:500]
+            ))
+    return articles
+
 
 class SubscriptionScraper:
-    def __init__(self):
+    PUBMED_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
+    CROSSREF_WORKS_URL = "https://api.crossref.org/works"
+
+    OUTPUT_DIR = '/mnt/user-data/outputs'
+    CSV_FIELDS = ['title', 'authors', 'journal', 'pub_date', 'doi', 'pmid', 'link', 'summary',
+                  'abstract', 'issn', 'published_date', 'citation_count']
+    # 默认输出文件名前缀（{前缀}_{年份}.csv / .json），增量模式读取同名JSON作为上次的结果
+    RESULTS_NAME = 'subscription_articles'
+    RSS_FETCH_WORKERS = 16
+    # None 表示使用全部CPU核心
+    RSS_PARSE_WORKERS = None
+    # PubMed详情每批的初始记录数（历史服务器分页，之后按响应时间和大小自动调整）
+    ESUMMARY_PAGE_SIZE = 500
+
+    # Nature系列RSS源
+    NATURE_FEEDS = {
+        'Nature': 'http://feeds.nature.com/nature/rss/current',
+        'Nature Medicine': 'http://feeds.nature.com/nm/rss/current',
+        'Nature Biotechnology': 'http://feeds.nature.com/nbt/rss/current',
+        'Nature Methods': 'http://feeds.nature.com/nmeth/rss/current',
+        'Nature Machine Intelligence': 'http://feeds.nature.com/natmachintell/rss/current',
+    }
+
+    # Science系列RSS源
+    SCIENCE_FEEDS = {
+        'Science': 'https://www.science.org/rss/news_current.xml',
+        'Science Translational Medicine': 'https://www.science.org/rss/stm_current.xml',
+    }
+
+    NATURE_KEYWORDS = ['machine learning', 'deep learning', 'artificial intelligence',
+                       'neural network', 'AI', 'ML', 'medical', 'clinical', 'diagnosis']
+    SCIENCE_KEYWORDS = ['machine learning', 'deep learning', 'artificial intelligence',
+                        'neural network', 'AI', 'medical', 'clinical']
+
+    def __init__(self, ncbi_api_key: str = None):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
         self.results = []
+        self.year = 2025
+        self.errors = 0
+        self._errors_lock = threading.Lock()
+        self.stream = None
+        self.pubmed_tuners = {}
+        self.rate_limiter = get_rate_limiter()
+        self.transport = get_transport()
+        self.metrics = get_metrics()
+        self.ncbi_api_key = ncbi_api_key or os.environ.get('NCBI_API_KEY')
+        if self.ncbi_api_key:
+            self.rate_limiter.set_ncbi_api_key(self.ncbi_api_key)
+
+    def _record_error(self):
+        """
+        错误计数加一；各数据源在线程池中并发执行，计数需加锁
+        """
+        with self._errors_lock:
+            self.errors += 1
+
+    def _ncbi_params(self, params: Dict) -> Dict:
+        """
+        有API key时附加到E-utilities请求参数中
+        """
+        if self.ncbi_api_key:
+            params['api_key'] = self.ncbi_api_key
+        return params
         
+    def fetch_feed(self, journal_name: str, rss_url: str) -> Optional[bytes]:
+        """
+        下载单个RSS源，返回原始内容（失败返回 None）
+        共享传输层带响应缓存，过期后用 ETag / Last-Modified 条件请求，未更新时返回缓存内容
+        """
+        try:
+            # 每个源单独计时，便于找出响应慢的订阅源
+            with self.metrics.stage(f'rss.fetch:{journal_name}'):
+                response = self.transport.get(rss_url, headers=self.headers, timeout=30)
+            return response.content
+        except Exception as e:
+            print(f"  ✗ {journal_name} RSS下载错误: {e}")
+            self._record_error()
+            return None
+
+    def fetch_feeds(self, feeds: Dict[str, str]) -> Dict[str, bytes]:
+        """
+        并发下载全部RSS源，每个主机的请求速率仍由共享限速器控制
+        """
+        with ThreadPoolExecutor(max_workers=self.RSS_FETCH_WORKERS) as pool:
+            bodies = dict(zip(feeds, pool.map(self.fetch_feed, feeds, feeds.values())))
+        return {journal: body for journal, body in bodies.items() if body is not None}
+
+    def parse_feeds(self, jobs: List[Tuple[str, bytes, str, Sequence[str]]]) -> Dict[str, List[Dict]]:
+        """
+        在进程池中解析RSS内容（feedparser 解析是CPU密集型），
+        jobs 为 (期刊名, RSS内容, DOI字段, 关键词) 列表，返回 {期刊名: 文章列表}
+        只有一个源或无法创建进程池时在当前进程中解析
+        """
+        if len(jobs) < 2:
+            return self._parse_serial(jobs)
+        try:
+            pool = ProcessPoolExecutor(max_workers=self.RSS_PARSE_WORKERS)
+        except (OSError, NotImplementedError):
+            return self._parse_serial(jobs)
+
+        results = {}
+        with pool:
+            futures = [(job[0], pool.submit(parse_feed, *job)) for job in jobs]
+            for journal_name, future in futures:
+                try:
+                    results[journal_name] = future.result()
+                except Exception as e:
+                    print(f"  ✗ {journal_name} RSS解析错误: {e}")
+                    self._record_error()
+        return results
+
+    def _parse_serial(self, jobs: List[Tuple[str, bytes, str, Sequence[str]]]) -> Dict[str, List[Dict]]:
+        results = {}
+        for job in jobs:
+            try:
+                results[job[0]] = parse_feed(*job)
+            except Exception as e:
+                print(f"  ✗ {job[0]} RSS解析错误: {e}")
+                self._record_error()
+        return results
+
+    def scrape_feeds(self, feed_groups: List[Tuple[Dict[str, str], str, Sequence[str]]],
+                     seen: Optional[Set[str]] = None) -> List[Dict]:
+        """
+        先并发下载全部RSS源，再并行解析
+        feed_groups 为 (订阅源字典, DOI字段, 关键词) 列表
+        seen 为增量状态中已见过的标识符，这些条目在写入流式输出之前就被跳过
+        """
+        feeds = {journal: url for group, _, _ in feed_groups for journal, url in group.items()}
+        print(f"正在并发下载 {len(feeds)} 个RSS源...")
+        with self.metrics.stage('subscription.fetch'):
+            bodies = self.fetch_feeds(feeds)
+
+        jobs = [(journal, bodies[journal], doi_field, keywords)
+                for group, doi_field, keywords in feed_groups
+                for journal in group if journal in bodies]
+        with self.metrics.stage('subscription.parse'):
+            parsed = self.parse_feeds(jobs)
+
+        articles = []
+        for journal, *_ in jobs:
+            if journal in parsed:
+                found = parsed[journal]
+                if seen:
+                    found = [a for a in found if not seen_before(a, seen)]
+                print(f"  {journal}: 找到 {len(found)} 篇相关文章")
+                articles.extend(self._emit(found, 'RSS'))
+        return articles
+
     def scrape_nature_rss(self, journal_name: str, rss_url: str) -> List[Dict]:
         """
         通过Nature系列期刊的RSS源获取文章
         Nature提供免费的RSS订阅
         """
         print(f"正在从RSS获取 {journal_name} 的文章...")
-        try:
-            feed = feedparser.parse(rss_url)
-            articles = []
-            
-            keywords = ['machine learning', 'deep learning', 'artificial intelligence', 
-                       'neural network', 'AI', 'ML', 'medical', 'clinical', 'diagnosis']
-            
-            for entry in feed.entries:
-                title = entry.get('title', '').lower()
-                summary = entry.get('summary', '').lower()
-                
-                # 检查是否包含相关关键词
-                if any(kw in title or kw in summary for kw in keywords):
-                    article = {
-                        'title': entry.get('title', ''),
-                        'authors': entry.get('author', ''),
-                        'journal': journal_name,
-                        'pub_date': entry.get('published', ''),
-                        'link': entry.get('link', ''),
-                        'doi': entry.get('prism_doi', ''),
-                        'summary': entry.get('summary', '')[:500]
-                    }
-                    articles.append(article)
-            
-            print(f"找到 {len(articles)} 篇相关文章")
-            return articles
-            
-        except Exception as e:
-            print(f"RSS解析错误: {e}")
-            return []
-    
+        return self._scrape_single_feed(journal_name, rss_url, 'prism_doi', self.NATURE_KEYWORDS)
+
     def scrape_science_rss(self, journal_name: str, rss_url: str) -> List[Dict]:
         """
         通过Science系列期刊的RSS源获取文章
         """
         print(f"正在从RSS获取 {journal_name} 的文章...")
-        try:
-            feed = feedparser.parse(rss_url)
-            articles = []
-            
-            keywords = ['machine learning', 'deep learning', 'artificial intelligence', 
-                       'neural network', 'AI', 'medical', 'clinical']
-            
-            for entry in feed.entries:
-                title = entry.get('title', '').lower()
-                summary = entry.get('summary', '').lower()
-                
-                if any(kw in title or kw in summary for kw in keywords):
-                    article = {
-                        'title': entry.get('title', ''),
-                        'authors': entry.get('author', ''),
-                        'journal': journal_name,
-                        'pub_date': entry.get('published', ''),
-                        'link': entry.get('link', ''),
-                        'doi': entry.get('dc_identifier', ''),
-                        'summary': entry.get('summary', '')[:500]
-                    }
-                    articles.append(article)
-            
-            print(f"找到 {len(articles)} 篇相关文章")
-            return articles
-            
-        except Exception as e:
-            print(f"RSS解析错误: {e}")
+        return self._scrape_single_feed(journal_name, rss_url, 'dc_identifier', self.SCIENCE_KEYWORDS)
+
+    def _scrape_single_feed(self, journal_name: str, rss_url: str, doi_field: str,
+                            keywords: Sequence[str]) -> List[Dict]:
+        body = self.fetch_feed(journal_name, rss_url)
+        if body is None:
             return []
+        articles = self._parse_serial([(journal_name, body, doi_field, keywords)]).get(journal_name, [])
+        print(f"找到 {len(articles)} 篇相关文章")
+        return articles
     
-    def search_pubmed_simple(self, journals: List[str], year: int = 2025) -> List[Dict]:
+    def search_pubmed_simple(self, journals: List[str], year: int = 2025, reldate: int = None) -> List[Dict]:
         """
-        简化的PubMed搜索 - 一次性搜索多个期刊
+        简化的PubMed搜索 - 按检索计划搜索多个期刊
+        先探测结果数：不超过esearch上限时所有期刊合为一个检索式，否则拆分为多个检索式，保证结果完整
+        reldate 不为空时只检索最近 reldate 天内收录（edat）的记录
         """
-        base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
-        
-        # 构建期刊列表查询
-        journal_query = ' OR '.join([f'"{j}"[Journal]' for j in journals])
+        base_url = self.PUBMED_BASE_URL
         
-        query = f'({journal_query}) AND (machine learning OR deep learning OR artificial intelligence) AND (medical OR clinical OR diagnosis) AND {year}[PDAT]'
+        topic = '(machine learning OR deep learning OR artificial intelligence) AND (medical OR clinical OR diagnosis)'
+        probe = EsearchProbe(self.transport, base_url,
+                             lambda group: f'({journal_clause(group)}) AND {topic} AND {year}[PDAT]',
+                             self._ncbi_params)
         
         print(f"正在PubMed搜索所有期刊...")
         
         try:
-            # 搜索
-            search_url = f"{base_url}esearch.fcgi"
-            search_params = {
-                'db': 'pubmed',
-                'term': query,
-                'retmax': 200,  # 增加到200篇
-                'retmode': 'json',
-                'sort': 'pub_date',
-                'mindate': f'{year}/01/01',
-                'maxdate': f'{year}/12/31'
-            }
-            
-            response = requests.get(search_url, params=search_params, timeout=30)
-            response.raise_for_status()
-            search_data = response.json()
-            
-            id_list = search_data.get('esearchresult', {}).get('idlist', [])
-            print(f"找到 {len(id_list)} 篇文章")
-            
-            if not id_list:
-                return []
-            
-            # 获取详情
-            time.sleep(0.5)
-            summary_url = f"{base_url}esummary.fcgi"
-            summary_params = {
-                'db': 'pubmed',
-                'id': ','.join(id_list),
-                'retmode': 'json'
-            }
-            
-            response = requests.get(summary_url, params=summary_params, timeout=30)
-            response.raise_for_status()
-            summary_data = response.json()
+            shards = QueryPlanner(probe).plan(journals, *search_window(year, reldate))
+            if len(shards) > 1:
+                print_plan(shards, probe.requests)
+            print(f"找到 {sum(shard.count for shard in shards)} 篇文章")
             
+            # 通过历史服务器分批获取详情
             articles = []
-            for pmid, article_data in summary_data.get('result', {}).items():
-                if pmid == 'uids':
-                    continue
-                
-                authors = article_data.get('authors', [])
-                author_list = ', '.join([a.get('name', '') for a in authors[:5]])
-                
-                article = {
-                    'pmid': pmid,
-                    'title': article_data.get('title', ''),
-                    'authors': author_list,
-                    'journal': article_data.get('fulljournalname', ''),
-                    'pub_date': article_data.get('pubdate', ''),
-                    'doi': article_data.get('elocationid', ''),
-                    'link': f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/"
-                }
-                articles.append(article)
+            resolver = PubMedIdResolver(self.transport, base_url, self._ncbi_params, self.pubmed_tuners,
+                                        self.ESUMMARY_PAGE_SIZE)
+            for shard in shards:
+                shard = probe.ensure_history(shard)
+                for _, summary_data in resolver.summary_pages(shard.webenv, shard.query_key,
+                                                              min(shard.count, ESEARCH_MAX)):
+                    articles.extend(self._parse_summary(summary_data))
             
             return articles
             
         except Exception as e:
             print(f"PubMed搜索错误: {e}")
+            self._record_error()
             return []
     
-    def scrape_all_simple(self):
+    def _parse_summary(self, summary_data: Dict) -> List[Dict]:
+        articles = []
+        for pmid, article_data in summary_data.get('result', {}).items():
+            if pmid == 'uids':
+                continue
+            
+            authors = article_data.get('authors', [])
+            author_list = ', '.join([a.get('name', '') for a in authors[:5]])
+            
+            article = Article(
+                pmid=pmid,
+                title=article_data.get('title', ''),
+                authors=author_list,
+                journal=article_data.get('fulljournalname', ''),
+                pub_date=article_data.get('pubdate', ''),
+                doi=article_data.get('elocationid', ''),
+                link=f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/"
+            )
+            articles.append(article)
+        return articles
+    
+    def _emit(self, articles: List[Dict], source: str) -> List[Dict]:
+        """
+        记录该数据源的产出条数；开启流式输出时，每完成一个订阅源就把结果写入磁盘
+        """
+        self.metrics.record_articles(source, articles)
+        if self.stream is not None:
+            self.stream.emit(a for a in articles if len(a.get('title', '')) > 10)
+        return articles
+
+    def scrape_all_simple(self, year: int = 2025, incremental: bool = False, previous_results: str = None,
+                          stream_to: str = None, metrics_to: str = None, enrich: bool = False):
         """
         简化版爬取 - 使用最直接的方法
+        incremental=True 时跳过已见过的RSS条目，PubMed只检索上次运行后新收录的记录，
+        结果合并到上次保存的结果（previous_results）中
+        stream_to 为文件名时，爬取过程中边爬边写 CSV 和 JSON Lines
+        metrics_to 为文件名时，结束后把请求与记录统计保存为JSON
+        enrich=True 时在去重前按DOI批量查询Crossref，补全摘要、ISSN、出版日期和被引次数（需额外的网络请求）
         """
         print("=" * 70)
-        print("开始爬取2025年顶刊医学机器学习相关文章 (简化版)")
+        print(f"开始爬取{year}年顶刊医学机器学习相关文章 (简化版)")
         print("=" * 70)
+        self.year = year
         
-        # Nature系列RSS源
-        nature_feeds = {
-            'Nature': 'http://feeds.nature.com/nature/rss/current',
-            'Nature Medicine': 'http://feeds.nature.com/nm/rss/current',
-            'Nature Biotechnology': 'http://feeds.nature.com/nbt/rss/current',
-            'Nature Methods': 'http://feeds.nature.com/nmeth/rss/current',
-            'Nature Machine Intelligence': 'http://feeds.nature.com/natmachintell/rss/current',
-        }
+        reldate = None
+        if incremental:
+            state = CrawlState()
+            reldate = state.reldate(f'subscription:pubmed:{year}')
+            print(f"增量模式: 上次爬取日期 {state.from_date(f'subscription:pubmed:{year}') or '无（首次运行，全量爬取）'}")
+        errors_before = self.errors
+        if stream_to:
+            self.stream = StreamWriter(f'{self.OUTPUT_DIR}/{stream_to}', self.CSV_FIELDS, encoding='utf-8-sig')
         
-        # Science系列RSS源
-        science_feeds = {
-            'Science': 'https://www.science.org/rss/news_current.xml',
-            'Science Translational Medicine': 'https://www.science.org/rss/stm_current.xml',
-        }
-        
-        print("\n--- 方法1: RSS订阅源 (最快) ---")
-        # 爬取Nature系列
-        for journal, rss_url in nature_feeds.items():
-            articles = self.scrape_nature_rss(journal, rss_url)
-            self.results.extend(articles)
-            time.sleep(1)
-        
-        # 爬取Science系列
-        for journal, rss_url in science_feeds.items():
-            articles = self.scrape_science_rss(journal, rss_url)
-            self.results.extend(articles)
-            time.sleep(1)
+        try:
+            print("\n--- 方法1: RSS订阅源 (最快) ---")
+            # 并发下载Nature和Science系列RSS，再在进程池中解析
+            # 增量模式下已见过的条目在写入流式输出之前就被跳过，流式输出与最终结果一致
+            self.results.extend(self.scrape_feeds([
+                (self.NATURE_FEEDS, 'prism_doi', self.NATURE_KEYWORDS),
+                (self.SCIENCE_FEEDS, 'dc_identifier', self.SCIENCE_KEYWORDS),
+            ], seen=state.seen(f'subscription:rss:{year}') if incremental else None))
+            
+            print("\n--- 方法2: PubMed统一搜索 ---")
+            all_journals = [
+                'Nature', 'Nature Medicine', 'Nature Biotechnology', 'Nature Methods',
+                'Science', 'Science Translational Medicine',
+                'Cell', 'Cell Systems', 'Cell Reports Medicine'
+            ]
+            
+            with self.metrics.stage('subscription.pubmed'):
+                pubmed_articles = self._emit(self.search_pubmed_simple(all_journals, year, reldate), 'PubMed')
+        finally:
+            if self.stream is not None:
+                self.stream.close()
+                self.stream = None
+        rss_articles = self.results
+        self.results = [a for a in rss_articles + pubmed_articles if len(a.get('title', '')) > 10]
         
-        print("\n--- 方法2: PubMed统一搜索 ---")
-        all_journals = [
-            'Nature', 'Nature Medicine', 'Nature Biotechnology', 'Nature Methods',
-            'Science', 'Science Translational Medicine',
-            'Cell', 'Cell Systems', 'Cell Reports Medicine'
-        ]
+        # 没有DOI的记录从文章链接中提取，去重时即可按DOI识别同一篇文章
+        fill_dois(self.results)
+        if enrich:
+            with self.metrics.stage('subscription.enrich'):
+                self.enrich_results(self.results)
         
-        pubmed_articles = self.search_pubmed_simple(all_journals, 2025)
-        self.results.extend(pubmed_articles)
+        # 去重（DOI/PMID/标题任一相同即为重复），过短的标题视为无效条目
+        with self.metrics.stage('subscription.dedup'):
+            self.results = deduplicate(self.results)
+        print(f"\n✓ 总共找到 {len(self.results)} 篇独特文章")
         
-        # 去重
-        unique_results = []
-        seen_titles = set()
-        for article in self.results:
-            title = article.get('title', '').lower()
-            if title and title not in seen_titles and len(title) > 10:
-                seen_titles.add(title)
-                unique_results.append(article)
+        if incremental:
+            if self.errors == errors_before:
+                new_count = state.mark(f'subscription:rss:{year}', rss_articles)
+                new_count += state.mark(f'subscription:pubmed:{year}', pubmed_articles)
+                state.save()
+                print(f"增量合并: 新增 {new_count} 篇")
+            else:
+                print("⚠️  部分请求失败，本次不更新增量状态")
+            previous_path = previous_results or self.results_path(year, 'json')
+            self.results = merge_records(load_results(previous_path), self.results)
+            print(f"✓ 合并后共 {len(self.results)} 篇")
         
-        self.results = unique_results
-        print(f"\n✓ 总共找到 {len(self.results)} 篇独特文章")
+        self.metrics.print_summary()
+        self.metrics.export(self.OUTPUT_DIR, metrics_to)
+    
+    def enrich_results(self, results: List[Dict]) -> int:
+        """
+        按DOI批量查询Crossref补全记录，返回补全的记录数
+        补全失败不影响爬取结果，只给出提示
+        """
+        enricher = CrossrefEnricher(self.transport, self.CROSSREF_WORKS_URL)
+        enriched = enricher.enrich(results)
+        if enricher.errors:
+            print(f"⚠️  {enricher.errors} 批DOI补全失败，相应记录保持原样")
+        return enriched
+    
+    def results_path(self, year: int, ext: str = 'csv') -> str:
+        """默认输出文件路径，save_results 写入与增量模式读取的是同一组文件"""
+        return f'{self.OUTPUT_DIR}/{self.RESULTS_NAME}_{year}.{ext}'
     
-    def save_results(self, filename: str = 'medical_ml_articles_2025.csv'):
-        """保存结果"""
+    def save_results(self, filename: str = None, formats=('csv', 'json')):
+        """保存结果并增量更新本地检索索引，filename 默认为 {RESULTS_NAME}_{爬取年份}.csv，formats 可选 csv / json / jsonl / parquet"""
         if not self.results:
             print("没有结果可保存")
             return
         
-        output_path = f'/mnt/user-data/outputs/{filename}'
-        
-        with open(output_path, 'w', newline='', encoding='utf-8-sig') as f:
-            fieldnames = ['title', 'authors', 'journal', 'pub_date', 'doi', 'pmid', 'link', 'summary']
-            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
-            
-            writer.writeheader()
-            for article in self.results:
-                writer.writerow(article)
-        
-        print(f"\n✓ CSV结果已保存到: {output_path}")
+        output_path = f'{self.OUTPUT_DIR}/{filename}' if filename else self.results_path(self.year)
         
-        # JSON格式
-        json_path = output_path.replace('.csv', '.json')
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(self.results, f, ensure_ascii=False, indent=2)
+        with self.metrics.stage('subscription.save'), \
+                open_sinks(output_path, self.CSV_FIELDS, formats, encoding='utf-8-sig') as sink:
+            sink.write_many(self.results)
         
-        print(f"✓ JSON结果已保存到: {json_path}")
+        print()
+        for path in sink.paths:
+            print(f"✓ 结果已保存到: {path}")
+        update_index(self.results)
         
         return output_path
     
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# 各模块位于仓库根目录（没有包结构）
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 与 benchmark.py 相同：测试不读写用户的共享缓存、检索索引和检查点
+os.environ['AICRAWLER_NO_CACHE'] = '1'
+os.environ['AICRAWLER_NO_INDEX'] = '1'
+os.environ['AICRAWLER_NO_CHECKPOINT'] = '1'
@@ -0,0 +1,44 @@
+"""
+Article 记录的字典接口
+"""
+
+import csv
+import io
+import json
+import pickle
+
+from article import Article, to_json
+
+
+def test_dict_roundtrip_keeps_field_order():
+    data = {'title': 'T', 'pmid': '1', 'custom': 'x'}
+    article = Article.from_dict(data)
+    assert article.to_dict() == data
+    assert list(article.keys()) == ['title', 'pmid', 'custom']
+    assert json.loads(json.dumps(article, default=to_json)) == data
+    assert pickle.loads(pickle.dumps(article)).to_dict() == data
+
+
+def test_keys_view_supports_set_operations():
+    article = Article(title='T', pmid='1')
+    assert article.keys() - {'pmid'} == {'title'}
+    assert article.keys() & {'title', 'doi'} == {'title'}
+    assert 'title' in article.keys()
+
+
+def test_dict_writer_accepts_articles():
+    fields = ['pmid', 'title', 'doi']
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=fields, extrasaction='ignore')
+    writer.writeheader()
+    writer.writerow(Article(title='T', pmid='1', journal='Cell'))
+    assert out.getvalue().splitlines() == ['pmid,title,doi', '1,T,']
+
+
+def test_records_share_shape_and_intern_strings():
+    a = Article(title='A', journal=''.join(['Ce', 'll']))
+    b = Article(title='B', journal=''.join(['Ce', 'll']))
+    assert a._keys is b._keys
+    assert a['journal'] is b['journal']
+    del a['journal']
+    assert 'journal' not in a and a.get('journal') is None
@@ -0,0 +1,118 @@
+"""
+断点续爬检查点
+"""
+
+import json
+
+import requests
+
+from checkpoint import DONE, NEW, PARTIAL, Checkpoint, close_checkpoint, open_checkpoint
+from journalScraper import JournalScraper
+
+
+def test_units_progress_and_records(tmp_path):
+    checkpoint = Checkpoint('journal:2025', str(tmp_path / 'checkpoint.sqlite'))
+    assert checkpoint.state('a') == (NEW, {})
+    checkpoint.advance('a', {'cursor': 'c1'}, [{'pmid': '1'}, {'pmid': '2'}])
+    checkpoint.advance('a', {'cursor': 'c2'}, [{'pmid': '3'}])
+    checkpoint.complete('b', [{'pmid': '9'}])
+    assert checkpoint.state('a') == (PARTIAL, {'cursor': 'c2'})
+    assert [r['pmid'] for r in checkpoint.records('a')] == ['1', '2', '3']
+    assert checkpoint.summary() == {PARTIAL: 1, DONE: 1}
+
+    checkpoint.reset('a')
+    assert checkpoint.state('a') == (NEW, {}) and checkpoint.records('a') == []
+
+    other = Checkpoint('journal:2024', checkpoint.path)
+    assert other.state('b') == (NEW, {})
+    checkpoint.clear()
+    assert checkpoint.summary() == {}
+
+
+def test_close_keeps_progress_after_failure(tmp_path):
+    path = str(tmp_path / 'checkpoint.sqlite')
+    checkpoint = Checkpoint('run', path)
+    checkpoint.complete('a', [{'pmid': '1'}])
+    close_checkpoint(checkpoint, succeeded=False)
+    checkpoint = Checkpoint('run', path)
+    assert checkpoint.state('a')[0] == DONE
+    close_checkpoint(checkpoint, succeeded=True)
+    assert Checkpoint('run', path).summary() == {}
+
+
+def test_open_checkpoint_respects_env(tmp_path, monkeypatch):
+    assert open_checkpoint('run') is None
+    monkeypatch.delenv('AICRAWLER_NO_CHECKPOINT')
+    monkeypatch.setenv('AICRAWLER_CHECKPOINT_PATH', str(tmp_path / 'cp.sqlite'))
+    checkpoint = open_checkpoint('run')
+    assert checkpoint.path == str(tmp_path / 'cp.sqlite')
+    checkpoint.close()
+
+
+def _response(status, payload):
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(payload).encode()
+    return response
+
+
+class CrossrefPages:
+    """
+    Crossref游标分页；fail_at 指定的请求序号返回503，expire() 后旧游标返回400
+    """
+
+    def __init__(self, total=2500, fail_at=None):
+        self.total = total
+        self.fail_at = fail_at
+        self.generation = 0
+        self.cursors = []
+
+    def expire(self):
+        self.generation += 1
+
+    def get(self, url, params=None, **kwargs):
+        self.cursors.append(params['cursor'])
+        if len(self.cursors) == self.fail_at:
+            raise requests.HTTPError(response=_response(503, {}))
+        if params['cursor'] == '*':
+            offset = 0
+        else:
+            generation, offset = map(int, params['cursor'].split(':'))
+            if generation != self.generation:
+                raise requests.HTTPError(response=_response(400, {}))
+        items = [{'DOI': f'10.1038/n{i}', 'title': [f'Deep learning study {i}']}
+                 for i in range(offset, min(offset + params['rows'], self.total))]
+        return _response(200, {'message': {'items': items, 'next-cursor': f'{self.generation}:{offset + len(items)}'}})
+
+
+def _scraper(transport, path):
+    scraper = JournalScraper()
+    scraper.transport = transport
+    scraper.checkpoint = Checkpoint('journal:2025', path)
+    scraper.CROSSREF_MAX_RECORDS = None
+    return scraper
+
+
+def test_crossref_resumes_from_saved_cursor(tmp_path):
+    path = str(tmp_path / 'checkpoint.sqlite')
+    server = CrossrefPages(fail_at=3)
+    first = _scraper(server, path)
+    assert len(first.search_crossref('Nature', ['deep learning'])) == 2000
+    assert first.errors == 1
+
+    second = _scraper(server, path)
+    articles = second.search_crossref('Nature', ['deep learning'])
+    assert [a['doi'] for a in articles] == [f'10.1038/n{i}' for i in range(2500)]
+    assert server.cursors[3:] == ['0:2000']
+    assert second.errors == 0
+
+
+def test_crossref_restarts_when_saved_cursor_expired(tmp_path):
+    path = str(tmp_path / 'checkpoint.sqlite')
+    server = CrossrefPages(fail_at=2)
+    _scraper(server, path).search_crossref('Nature', ['deep learning'])
+    server.expire()
+    articles = _scraper(server, path).search_crossref('Nature', ['deep learning'])
+    assert [a['doi'] for a in articles] == [f'10.1038/n{i}' for i in range(2500)]
+    assert server.cursors[2:] == ['0:1000', '*', '1:1000', '1:2000']
+
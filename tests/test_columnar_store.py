@@ -0,0 +1,54 @@
+"""
+Parquet 列式导出（需要 pyarrow）
+"""
+
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+pq = pytest.importorskip('pyarrow.parquet')
+
+from article import Article
+from columnar_store import ParquetSink, count_by, iter_records, load_table
+from output_sinks import open_sinks
+
+FIELDS = ['pmid', 'title', 'journal', 'data_source', 'mesh_terms']
+
+
+def _records(n):
+    for i in range(n):
+        yield Article(pmid=str(i), title=f'Title {i}', journal='Nature' if i % 3 else 'Cell',
+                      data_source='PubMed', mesh_terms=['Deep Learning', 'ECG'] if i == 0 else None)
+
+
+def test_row_groups_and_roundtrip(tmp_path):
+    path = str(tmp_path / 'results.parquet')
+    with ParquetSink(path, FIELDS, row_group_size=4) as sink:
+        sink.write_many(_records(10))
+    assert sink.count == 10
+
+    metadata = pq.ParquetFile(path).metadata
+    assert metadata.num_rows == 10 and metadata.num_row_groups == 3
+
+    records = list(iter_records(path))
+    assert [r['pmid'] for r in records] == [str(i) for i in range(10)]
+    assert records[0]['mesh_terms'] == 'Deep Learning; ECG'
+    assert records[1]['mesh_terms'] is None
+
+
+def test_dictionary_columns_and_projection(tmp_path):
+    path = str(tmp_path / 'results.parquet')
+    with ParquetSink(path, FIELDS) as sink:
+        sink.write_many(_records(9))
+    table = load_table(path, ['journal'])
+    assert table.column_names == ['journal']
+    assert pa.types.is_dictionary(table.schema.field('journal').type)
+    assert pa.types.is_string(load_table(path, ['title']).schema.field('title').type)
+    assert count_by(path, 'journal') == {'Nature': 6, 'Cell': 3}
+    assert load_table(path, ['pmid'], filters=[('journal', '=', 'Cell')]).num_rows == 3
+
+
+def test_open_sinks_parquet(tmp_path):
+    with open_sinks(str(tmp_path / 'out.csv'), FIELDS, ('csv', 'parquet')) as sink:
+        sink.write_many(_records(2))
+    assert sink.paths[1].endswith('out.parquet')
+    assert [r['title'] for r in iter_records(sink.paths[1], ['title'])] == ['Title 0', 'Title 1']
@@ -0,0 +1,57 @@
+"""
+增量爬取状态与结果合并
+"""
+
+import json
+from datetime import date, timedelta
+
+from article import Article
+from crawl_state import CrawlState, load_results, merge_records, seen_before
+
+
+def test_merge_records_joins_crossref_and_pubmed_copies():
+    existing = [{'doi': '10.1038/abc', 'title': 'A model', 'abstract': 'old abstract', 'data_source': 'Crossref'}]
+    updates = [{'pmid': '99', 'doi': '10.1038/ABC', 'title': 'A model', 'abstract': '', 'data_source': 'PubMed'}]
+    merged = merge_records(existing, updates)
+    assert len(merged) == 1
+    assert merged[0]['pmid'] == '99'
+    assert merged[0]['abstract'] == 'old abstract'
+    assert merged[0]['data_source'] == 'PubMed'
+
+
+def test_merge_records_keeps_order_and_unidentified_rows():
+    existing = [{'pmid': '1', 'title': 'One'}, {'link': 'a'}]
+    updates = [{'pmid': '2', 'title': 'Two'}, {'link': 'b'}, {'pmid': '1', 'title': 'One', 'journal': 'Cell'}]
+    merged = merge_records(existing, updates)
+    assert [r.get('pmid') or r.get('link') for r in merged] == ['1', 'a', '2', 'b']
+    assert merged[0]['journal'] == 'Cell'
+
+
+def test_seen_state_uses_every_identifier(tmp_path):
+    state = CrawlState(str(tmp_path / 'state.json'))
+    assert state.mark('pubmed', [{'pmid': '1', 'doi': '10.1038/a', 'title': 'First'}]) == 1
+    seen = state.seen('pubmed')
+    assert seen_before({'doi': '10.1038/A'}, seen)
+    assert not seen_before({'pmid': '2', 'title': 'Second'}, seen)
+    assert state.mark('pubmed', [{'doi': '10.1038/a'}, {'pmid': '2'}]) == 1
+
+
+def test_state_persists_high_water_mark(tmp_path):
+    path = str(tmp_path / 'state' / 'crawl_state.json')
+    state = CrawlState(path)
+    assert state.reldate('crossref') is None and state.from_date('crossref') is None
+    state.mark('crossref', [{'doi': '10.1038/a'}], crawl_date=date.today() - timedelta(days=3))
+    state.save()
+
+    reloaded = CrawlState(path)
+    assert reloaded.reldate('crossref') == 4
+    assert reloaded.from_date('crossref') == (date.today() - timedelta(days=3)).isoformat()
+    assert reloaded.seen('crossref') == {'doi:10.1038/a'}
+
+
+def test_load_results(tmp_path):
+    path = tmp_path / 'results.json'
+    assert load_results(str(path)) == []
+    path.write_text(json.dumps([{'pmid': '1', 'title': 'T'}]), encoding='utf-8')
+    [record] = load_results(str(path))
+    assert isinstance(record, Article) and record.to_dict() == {'pmid': '1', 'title': 'T'}
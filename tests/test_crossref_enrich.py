@@ -0,0 +1,112 @@
+"""
+Crossref DOI批量补全
+"""
+
+import json
+
+import requests
+
+from combined_scraper import ScholarPubMedScraper
+from crossref_enrich import CrossrefEnricher, fill_dois, record_doi
+
+
+def _response(status=200, body=b'{}'):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.url = 'https://example.org/'
+    return response
+
+
+class FakeCrossref:
+    """
+    DOI 数超过 limit 的请求返回 414
+    """
+
+    def __init__(self, limit=1000, items=None):
+        self.limit = limit
+        self.items = items or {}
+        self.sizes = []
+
+    def get(self, url, params=None, **kwargs):
+        dois = [value[len('doi:'):] for value in params['filter'].split(',')]
+        self.sizes.append(len(dois))
+        if len(dois) > self.limit:
+            raise requests.HTTPError(response=_response(414))
+        items = [self.items.get(doi) or {'DOI': doi.upper(), 'abstract': f'<jats:p>about {doi}</jats:p>',
+                                         'is-referenced-by-count': 3}
+                 for doi in dois]
+        return _response(body=json.dumps({'message': {'items': items}}).encode())
+
+
+def test_record_doi_sources():
+    assert record_doi({'doi': 'https://doi.org/10.1038/ABC'}) == '10.1038/abc'
+    assert record_doi({'elocationid': 'doi: 10.1016/j.cell.2025.01.001'}) == '10.1016/j.cell.2025.01.001'
+    assert record_doi({'link': 'https://doi.org/10.1126/science.abc1234'}) == '10.1126/science.abc1234'
+    assert record_doi({'link': 'https://www.nature.com/articles/s41591-024-01234-5'}) == '10.1038/s41591-024-01234-5'
+    assert record_doi({'link': 'https://example.org/articles/s41591-024-01234-5'}) == ''
+
+
+def test_scholar_link_doi_feeds_dedup():
+    scholar = [{'title': 'Deep learning for cardiology in practice',
+                'link': 'https://www.nature.com/articles/s41591-024-01234-5'}]
+    assert fill_dois(scholar) == 1
+    assert scholar[0]['doi'] == '10.1038/s41591-024-01234-5'
+    pubmed = [{'pmid': '1', 'doi': '10.1038/s41591-024-01234-5', 'title': 'Deep learning for cardiology'}]
+    scraper = ScholarPubMedScraper.__new__(ScholarPubMedScraper)
+    assert ScholarPubMedScraper.merge_results(scraper, pubmed, scholar) == pubmed
+
+
+def test_enricher_fills_only_missing_fields():
+    transport = FakeCrossref(items={'10.1038/a': {
+        'DOI': '10.1038/A', 'abstract': '<jats:p>Crossref  abstract</jats:p>', 'ISSN': ['1078-8956', '1546-170X'],
+        'published': {'date-parts': [[2025, 3, 7]]}, 'is-referenced-by-count': 12,
+    }})
+    record = {'doi': 'https://doi.org/10.1038/A', 'abstract': 'PubMed abstract', 'citation_count': None}
+    enricher = CrossrefEnricher(transport, 'https://crossref/works')
+    assert enricher.enrich([record]) == 1
+    assert record == {
+        'doi': 'https://doi.org/10.1038/A',
+        'abstract': 'PubMed abstract',
+        'issn': '1078-8956; 1546-170X',
+        'published_date': '2025-03-07',
+        'citation_count': 12,
+    }
+    assert enricher.requests == 1
+
+
+def test_enricher_halves_batch_on_414():
+    transport = FakeCrossref(limit=3)
+    records = [{'doi': f'10.1038/n{i}', 'title': f'T{i}'} for i in range(10)]
+    records.append({'link': 'https://www.nature.com/articles/s41591-024-00001-2', 'abstract': 'kept'})
+    enricher = CrossrefEnricher(transport, 'https://crossref/works', batch_size=8)
+    assert enricher.enrich(records) == 11
+    assert transport.sizes[:2] == [8, 4]
+    assert enricher.batch_size == 2
+    assert enricher.errors == 0
+    assert records[0]['abstract'] == 'about 10.1038/n0' and records[0]['citation_count'] == 3
+    assert records[-1]['doi'] == '10.1038/s41591-024-00001-2' and records[-1]['abstract'] == 'kept'
+
+
+def test_enricher_halves_batch_on_400():
+    class TooLong(FakeCrossref):
+        def get(self, url, params=None, **kwargs):
+            if params['rows'] > self.limit:
+                self.sizes.append(params['rows'])
+                raise requests.HTTPError(response=_response(400))
+            return super().get(url, params, **kwargs)
+
+    transport = TooLong(limit=2)
+    enricher = CrossrefEnricher(transport, 'https://crossref/works', batch_size=5)
+    assert enricher.enrich([{'doi': f'10.1038/n{i}'} for i in range(5)]) == 5
+    assert transport.sizes[:3] == [5, 2, 2] and enricher.errors == 0
+
+
+def test_enricher_skips_batch_on_other_errors():
+    class Failing:
+        def get(self, url, params=None, **kwargs):
+            raise requests.HTTPError(response=_response(500))
+
+    enricher = CrossrefEnricher(Failing(), 'https://crossref/works', batch_size=2)
+    assert enricher.enrich([{'doi': '10.1038/a'}, {'doi': '10.1038/b'}, {'doi': '10.1038/c'}]) == 0
+    assert enricher.errors == 2 and enricher.batch_size == 2
@@ -0,0 +1,34 @@
+"""
+标识符去重索引
+"""
+
+from dedup_index import DedupIndex, deduplicate, record_identifiers
+
+
+def test_identifiers_are_normalized():
+    record = {'pmid': ' 12345 ', 'doi': 'https://doi.org/10.1038/ABC', 'title': 'Deep Learning <i>in</i> Cardiology...'}
+    assert record_identifiers(record) == ['doi:10.1038/abc', 'pmid:12345', 'title:deep learning in cardiology']
+
+
+def test_any_shared_identifier_is_a_duplicate():
+    index = DedupIndex()
+    assert index.add({'pmid': '1', 'title': 'First article title'})
+    assert not index.add({'pmid': '1', 'title': 'Other title'})
+    assert not index.add({'doi': '10.1038/x', 'title': 'First article title'})
+    assert index.add({'doi': '10.1038/y', 'title': 'Second article title'})
+
+
+def test_clusters_are_transitive():
+    index = DedupIndex()
+    a = {'pmid': '1', 'title': 'Title A'}
+    b = {'doi': '10.1038/b', 'title': 'Title B'}
+    index.add(a)
+    index.add(b)
+    bridge = {'pmid': '1', 'doi': '10.1038/b'}
+    index.add(bridge)
+    assert index.cluster_of(a) == index.cluster_of(b) == index.cluster_of(bridge)
+
+
+def test_deduplicate_keeps_first_and_drops_records_without_identifiers():
+    records = [{'title': 'Same title'}, {'link': 'x'}, {'title': 'same  TITLE'}, {'title': 'Other title'}]
+    assert deduplicate(records) == [records[0], records[3]]
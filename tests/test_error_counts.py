@@ -0,0 +1,45 @@
+"""
+线程池中并发失败时的错误计数
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from journalScraper import JournalScraper
+from subscription_scraper import SubscriptionScraper
+
+CALLS = 400
+
+
+class FailingTransport:
+    def get(self, url, **kwargs):
+        raise ConnectionError('boom')
+
+
+def test_crossref_errors_counted_from_pool():
+    scraper = JournalScraper()
+    scraper.transport = FailingTransport()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda i: scraper.search_crossref(f'J{i}', ['AI'], 2025), range(CALLS)))
+    assert results == [[]] * CALLS
+    assert scraper.errors == CALLS
+
+
+def test_rss_fetch_errors_counted_from_pool():
+    scraper = SubscriptionScraper()
+    scraper.transport = FailingTransport()
+    feeds = {f'J{i}': f'https://example.org/{i}.rss' for i in range(CALLS)}
+    assert scraper.fetch_feeds(feeds) == {}
+    assert scraper.errors == CALLS
+
+
+def test_error_count_waits_for_lock():
+    # 持有锁时其他线程的计数必须等待，而不是直接读改写
+    scraper = JournalScraper()
+    with scraper._errors_lock:
+        worker = threading.Thread(target=scraper._record_error)
+        worker.start()
+        worker.join(0.05)
+        assert worker.is_alive() and scraper.errors == 0
+    worker.join()
+    assert scraper.errors == 1
@@ -0,0 +1,79 @@
+"""
+HTTP传输层的重试、Retry-After 与熔断
+"""
+
+import pytest
+import requests
+
+from http_transport import CircuitOpenError, HttpTransport, parse_retry_after
+from metrics import Metrics
+from rate_limiter import HostRateLimiter
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+def _response(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = b''
+    response.headers.update(headers or {})
+    response.url = 'https://example.org/'
+    return response
+
+
+def _transport(responses, **kwargs):
+    kwargs.setdefault('backoff_base', 0.0)
+    transport = HttpTransport(rate_limiter=HostRateLimiter(default_rate=1000.0), metrics=Metrics(), **kwargs)
+    transport.session = FakeSession(responses)
+    return transport
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('120') == 120.0
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(None) is None
+
+
+def test_retryable_statuses_are_retried():
+    transport = _transport([_response(503), _response(429, {'Retry-After': '0'}), _response(200)])
+    assert transport.get('https://example.org/').status_code == 200
+    assert transport.session.calls == 3
+
+
+def test_client_errors_are_not_retried():
+    transport = _transport([_response(404), _response(200)])
+    with pytest.raises(requests.HTTPError):
+        transport.get('https://example.org/')
+    assert transport.session.calls == 1
+
+
+def test_retry_after_over_cap_gives_up():
+    transport = _transport([_response(429, {'Retry-After': '3600'}), _response(200)], retry_after_max=60)
+    with pytest.raises(requests.HTTPError):
+        transport.get('https://example.org/')
+    assert transport.session.calls == 1
+
+
+def test_rate_limited_request_does_not_open_circuit():
+    transport = _transport([_response(429, {'Retry-After': '0'})] * 5 + [_response(200)],
+                           max_retries=4, failure_threshold=5)
+    with pytest.raises(requests.HTTPError):
+        transport.get('https://example.org/')
+    assert transport.get('https://example.org/').status_code == 200
+
+
+def test_server_errors_open_circuit():
+    transport = _transport([_response(503)] * 5, max_retries=4, failure_threshold=5)
+    with pytest.raises(requests.HTTPError):
+        transport.get('https://example.org/')
+    with pytest.raises(CircuitOpenError):
+        transport.get('https://example.org/')
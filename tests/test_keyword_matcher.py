@@ -0,0 +1,60 @@
+"""
+关键词匹配与布尔检索式
+"""
+
+import pytest
+
+from keyword_matcher import KeywordMatcher, QuerySyntaxError, compile_query
+
+
+def test_hyphen_and_space_are_interchangeable():
+    matcher = KeywordMatcher(['machine learning', 'self-supervised'])
+    assert matcher.matches('A machine-learning model') == {'machine learning'}
+    assert matcher.matches('Self supervised pretraining') == {'self-supervised'}
+    assert matcher.matches('machine\n learning') == {'machine learning'}
+
+
+def test_word_boundaries_and_acronyms():
+    matcher = KeywordMatcher(['ML', 'AI'])
+    assert not matcher.search('html and email')
+    assert matcher.matches('ML for AI') == {'ML', 'AI'}
+    assert not matcher.search('ml in lowercase')
+
+
+def test_overlapping_keywords_and_prefixes():
+    matcher = KeywordMatcher(['deep learning', 'learning', 'deep'])
+    assert matcher.matches('deep learning') == {'deep learning', 'learning', 'deep'}
+
+
+def test_boolean_query():
+    query = compile_query('("deep learning" OR "neural network") NOT review')
+    assert query.matches({'title': 'A deep-learning model'})
+    assert not query.matches({'title': 'A deep learning review'})
+    assert not query.matches({'title': 'Unrelated'})
+    with pytest.raises(QuerySyntaxError):
+        compile_query('(deep learning')
+
+
+@pytest.mark.parametrize('keyword, text', [
+    ('neural network', 'Graph neural networks predict toxicity'),
+    ('clinical', 'A clinically validated model'),
+    ('diagnosis', 'Automated diagnoses of melanoma'),
+    ('study', 'Two cohort studies'),
+    ('machine learning', 'Machine-Learning approaches'),
+])
+def test_inflected_forms_match(keyword, text):
+    matcher = KeywordMatcher([keyword])
+    assert matcher.search(text)
+    assert matcher.matches(text) == {keyword}
+
+
+def test_inflection_keeps_word_boundaries():
+    matcher = KeywordMatcher(['network', 'clinic', 'ML'])
+    assert not matcher.search('networking events')
+    assert not matcher.search('clinician survey')
+    assert not matcher.search('MLs and HTML')
+
+
+def test_inflected_terms_in_boolean_query():
+    query = compile_query('("neural network" OR "deep learning") AND (clinical OR diagnosis)')
+    assert query.matches({'title': 'Convolutional neural networks', 'abstract': 'Diagnoses were clinically confirmed'})
@@ -0,0 +1,76 @@
+"""
+CSV结果合并：内存模式与流式模式
+"""
+
+import csv
+import json
+import os
+
+from dedup_index import DiskDedupIndex
+from merge_results import merge_and_deduplicate, merge_streaming
+
+
+def _write_csv(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return str(path)
+
+
+PUBMED = [
+    {'pmid': '1', 'doi': '10.1038/a', 'title': 'Deep learning for ECG'},
+    {'pmid': '2', 'doi': '', 'title': 'Transformers in radiology'},
+]
+SCHOLAR = [
+    {'title': 'Deep Learning for ECG', 'link': 'https://x/1', 'snippet': 'same article'},
+    {'title': 'Other Scholar hit', 'link': 'https://x/2', 'snippet': 'new'},
+    {'title': 'Transformers in radiology', 'link': 'https://x/3', 'snippet': 'same title'},
+]
+
+
+def test_disk_index_checks_every_identifier(tmp_path):
+    index = DiskDedupIndex(str(tmp_path / 'dedup.sqlite'), commit_every=1)
+    assert index.add({'pmid': '1', 'doi': '10.1038/a'})
+    assert not index.add({'doi': 'https://doi.org/10.1038/A'})
+    assert not index.add({'pmid': '1'})
+    assert index.add({'title': 'New title'})
+    assert not index.add({'link': 'no identifiers'})
+    assert [r['pmid'] for r in index.filter([{'pmid': '1'}, {'pmid': '3'}, {'pmid': '3'}])] == ['3']
+    index.close()
+
+
+def test_temporary_disk_index_is_removed():
+    index = DiskDedupIndex()
+    path = index._temp_path
+    index.add({'pmid': '1'})
+    index.close()
+    assert not os.path.exists(path)
+
+
+def test_streaming_merge_matches_in_memory_merge(tmp_path):
+    pubmed = _write_csv(tmp_path / 'pubmed.csv', PUBMED)
+    scholar = _write_csv(tmp_path / 'scholar.csv', SCHOLAR)
+    output = str(tmp_path / 'out' / 'merged.csv')
+    merge_streaming(pubmed, scholar, output, formats=('csv', 'jsonl'))
+
+    with open(output, encoding='utf-8-sig', newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert [(r['title'], r['data_source']) for r in rows] == [
+        ('Deep learning for ECG', 'PubMed'),
+        ('Transformers in radiology', 'PubMed'),
+        ('Other Scholar hit', 'Google Scholar'),
+    ]
+    assert set(rows[0]) == {'pmid', 'doi', 'title', 'link', 'snippet', 'data_source'}
+    with open(str(tmp_path / 'out' / 'merged.jsonl'), encoding='utf-8') as f:
+        assert [json.loads(line)['title'] for line in f] == [r['title'] for r in rows]
+
+    in_memory = merge_and_deduplicate([dict(r) for r in PUBMED], [dict(r) for r in SCHOLAR])
+    assert [(r['title'], r['data_source']) for r in in_memory] == [(r['title'], r['data_source']) for r in rows]
+
+
+def test_fuzzy_threshold_drops_truncated_titles():
+    pubmed = [{'pmid': '1', 'title': 'A foundation model for retinal imaging and systemic disease prediction'}]
+    scholar = [{'title': 'A foundation model for retinal imaging and systemic disease predic…'}]
+    assert len(merge_and_deduplicate(pubmed, scholar)) == 2
+    assert len(merge_and_deduplicate(pubmed, scholar, fuzzy_threshold=0.8)) == 1
@@ -0,0 +1,103 @@
+"""
+请求级指标与导出
+"""
+
+import json
+import urllib.request
+
+from metrics import Histogram, Metrics, serve_metrics
+
+
+def _metrics():
+    metrics = Metrics()
+    metrics.record_request('eutils.ncbi.nlm.nih.gov', 'GET', 200, 0.02, 1500)
+    metrics.record_request('eutils.ncbi.nlm.nih.gov', 'GET', 200, 0.3, 500)
+    metrics.record_request('eutils.ncbi.nlm.nih.gov', 'POST', 429, 0.01, 0)
+    metrics.record_retry('eutils.ncbi.nlm.nih.gov', 429)
+    metrics.record_error('api.crossref.org', 'ConnectionError')
+    metrics.record_wait('eutils.ncbi.nlm.nih.gov', 0.5)
+    metrics.record_wait('eutils.ncbi.nlm.nih.gov', 0)
+    metrics.record_cache('hit')
+    metrics.record_cache('miss')
+    metrics.record_cache('hit')
+    metrics.record_articles('pubmed', [{'journal': 'Nature'}, {'journal': 'Nature'}, {'journal': ''}])
+    with metrics.stage('journal.search'):
+        pass
+    return metrics
+
+
+def test_histogram_quantiles():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.05, 0.5, 2.0):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1]
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.75) == 1.0
+    assert histogram.quantile(1.0) == 2.0
+    assert histogram.summary()['mean'] == 0.65
+    assert Histogram().quantile(0.5) == 0.0
+
+
+def test_summary_groups_by_host_source_and_stage():
+    summary = _metrics().summary()
+    eutils = summary['hosts']['eutils.ncbi.nlm.nih.gov']
+    assert eutils['requests'] == 3
+    assert eutils['statuses'] == {'200': 2, '429': 1}
+    assert eutils['retries'] == {'429': 1}
+    assert eutils['bytes'] == 2000
+    assert eutils['rate_limit_wait_seconds'] == 0.5
+    assert eutils['latency']['count'] == 3
+    assert summary['hosts']['api.crossref.org']['errors'] == {'ConnectionError': 1}
+    assert summary['cache'] == {'hit': 2, 'miss': 1, 'hit_ratio': 0.6667}
+    assert summary['records'] == {'pubmed': {'total': 3, 'journals': {'Nature': 2, 'Unknown': 1}}}
+    assert summary['stages']['journal.search']['count'] == 1
+
+
+def test_prometheus_text_format():
+    text = _metrics().to_prometheus()
+    lines = text.splitlines()
+    assert '# TYPE aicrawler_http_requests_total counter' in lines
+    assert 'aicrawler_http_requests_total{host="eutils.ncbi.nlm.nih.gov",method="GET",status="200"} 2' in lines
+    assert 'aicrawler_http_request_seconds_bucket{host="eutils.ncbi.nlm.nih.gov",le="0.025"} 2' in lines
+    assert 'aicrawler_http_request_seconds_bucket{host="eutils.ncbi.nlm.nih.gov",le="+Inf"} 3' in lines
+    assert 'aicrawler_http_request_seconds_count{host="eutils.ncbi.nlm.nih.gov"} 3' in lines
+    assert 'aicrawler_rate_limit_wait_seconds_total{host="eutils.ncbi.nlm.nih.gov"} 0.5' in lines
+    assert text.endswith('\n')
+
+
+def test_label_values_are_escaped():
+    metrics = Metrics()
+    metrics.record_articles('rss', [{'journal': 'A "quoted"\\name'}])
+    assert 'journal="A \\"quoted\\"\\\\name"' in metrics.to_prometheus()
+
+
+def test_export_writes_json_and_prometheus(tmp_path, monkeypatch):
+    prom = tmp_path / 'textfile' / 'aicrawler.prom'
+    monkeypatch.setenv('AICRAWLER_METRICS_PROM', str(prom))
+    metrics = _metrics()
+    path = metrics.export(str(tmp_path / 'out'), 'metrics.json')
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f)['records']['pubmed']['total'] == 3
+    assert prom.read_text(encoding='utf-8') == metrics.to_prometheus()
+    assert metrics.export(str(tmp_path / 'out'), None) is None
+
+
+def test_reset_clears_everything():
+    metrics = _metrics()
+    metrics.reset()
+    assert metrics.counter('aicrawler_cache_requests_total', result='hit') == 0
+    assert metrics.summary()['hosts'] == {}
+
+
+def test_metrics_server():
+    metrics = _metrics()
+    server = serve_metrics(metrics, 0, host='127.0.0.1')
+    try:
+        base = f'http://127.0.0.1:{server.server_address[1]}'
+        with urllib.request.urlopen(f'{base}/metrics') as response:
+            assert response.read().decode('utf-8') == metrics.to_prometheus()
+        with urllib.request.urlopen(f'{base}/metrics.json') as response:
+            assert json.load(response)['cache']['hit'] == 2
+    finally:
+        server.shutdown()
+        server.server_close()
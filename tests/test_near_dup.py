@@ -0,0 +1,63 @@
+"""
+MinHash / LSH 近似重复检测
+"""
+
+import random
+
+import pytest
+
+import near_dup
+from near_dup import MinHasher, NearDuplicateIndex, choose_bands, drop_near_duplicates, normalize_text, shingles
+
+
+def test_normalize_text():
+    assert normalize_text('<i>Deep</i> Learning &amp; ECG: a Study…') == 'deep learning ecg a study'
+    assert normalize_text(None) == ''
+
+
+def test_choose_bands_divides_num_perm():
+    bands, rows = choose_bands(64, 0.8)
+    assert bands * rows == 64
+    assert abs((1 / bands) ** (1 / rows) - 0.8) < 0.1
+
+
+def test_signature_estimates_jaccard():
+    hasher = MinHasher(num_perm=256)
+    a = shingles(normalize_text('Deep learning predicts arrhythmia from single-lead ECG recordings'))
+    b = shingles(normalize_text('Deep learning predicts arrhythmia from single lead ECG recording'))
+    c = shingles(normalize_text('Protein structure prediction with graph neural networks'))
+    jaccard = len(a & b) / len(a | b)
+    similar = near_dup.estimate_similarity(hasher.signature(a), hasher.signature(b))
+    assert abs(similar - jaccard) < 0.15
+    assert near_dup.estimate_similarity(hasher.signature(a), hasher.signature(c)) < 0.2
+
+
+@pytest.mark.skipif(near_dup.np is None, reason='未安装 numpy')
+def test_numpy_and_pure_python_signatures_match(monkeypatch):
+    rng = random.Random(0)
+    samples = [[rng.getrandbits(32) for _ in range(rng.randint(1, 50))] for _ in range(20)] + [[]]
+    vectorized = MinHasher()
+    expected = [vectorized.signature(hashes) for hashes in samples]
+    monkeypatch.setattr(near_dup, 'np', None)
+    assert [MinHasher().signature(hashes) for hashes in samples] == expected
+
+
+def test_index_clusters_truncated_titles():
+    index = NearDuplicateIndex(threshold=0.8)
+    assert index.add('a', 'A foundation model for retinal imaging and systemic disease prediction') is None
+    assert index.add('b', 'Graph neural networks for drug toxicity') is None
+    assert index.add('c', 'A Foundation Model for Retinal Imaging and Systemic Disease Prediction...') == 'a'
+    assert index.add('d', '') is None
+    assert index.clusters() == [['a', 'c']]
+
+
+def test_drop_near_duplicates_keeps_first_of_each_cluster():
+    records = [
+        {'title': 'Self-supervised learning for chest radiograph interpretation'},
+        {'title': 'Transformers for histopathology slide classification'},
+        {'Title': 'Self supervised learning for chest radiograph interpretation.'},
+        {'title': ''},
+    ]
+    kept, clusters = drop_near_duplicates(records)
+    assert clusters == [[0, 2]]
+    assert kept == [records[0], records[1], records[3]]
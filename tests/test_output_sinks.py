@@ -0,0 +1,70 @@
+"""
+增量输出写入器
+"""
+
+import csv
+import json
+
+import pytest
+
+from article import Article
+from output_sinks import CsvSink, JsonArraySink, JsonLinesSink, StreamWriter, open_sinks
+
+FIELDS = ['pmid', 'title']
+
+
+def _read_csv(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def test_batches_reach_disk_before_close(tmp_path):
+    sink = CsvSink(str(tmp_path / 'out.csv'), FIELDS, batch_size=2)
+    sink.write({'pmid': '1', 'title': 'A', 'extra': 'ignored'})
+    assert _read_csv(sink.path) == []
+    sink.write(Article(pmid='2', title='B'))
+    assert [r['pmid'] for r in _read_csv(sink.path)] == ['1', '2']
+    sink.write({'pmid': '3', 'title': 'C'})
+    sink.close()
+    sink.close()
+    assert [r['pmid'] for r in _read_csv(sink.path)] == ['1', '2', '3']
+    assert sink.count == 3
+
+
+@pytest.mark.parametrize('indent', [2, None])
+def test_json_array_is_valid_at_any_size(tmp_path, indent):
+    for n in (0, 1, 5):
+        path = str(tmp_path / f'out_{n}.json')
+        with JsonArraySink(path, batch_size=2, indent=indent) as sink:
+            sink.write_many({'pmid': str(i), 'title': f'标题 {i}'} for i in range(n))
+        with open(path, encoding='utf-8') as f:
+            assert json.load(f) == [{'pmid': str(i), 'title': f'标题 {i}'} for i in range(n)]
+
+
+def test_json_lines_are_readable_while_open(tmp_path):
+    sink = JsonLinesSink(str(tmp_path / 'out.jsonl'), batch_size=10)
+    sink.write(Article(pmid='1', title='A'))
+    sink.flush()
+    with open(sink.path, encoding='utf-8') as f:
+        assert [json.loads(line) for line in f] == [{'pmid': '1', 'title': 'A'}]
+    sink.close()
+
+
+def test_open_sinks_derives_paths_from_csv_path(tmp_path):
+    with open_sinks(str(tmp_path / 'sub' / 'results.csv'), FIELDS, ('csv', 'json', 'jsonl')) as sink:
+        sink.write({'pmid': '1', 'title': 'A'})
+    assert [path.rsplit('/', 1)[1] for path in sink.paths] == ['results.csv', 'results.json', 'results.jsonl']
+    assert sink.count == 1
+    with pytest.raises(ValueError):
+        open_sinks(str(tmp_path / 'x.csv'), FIELDS, ('xml',))
+
+
+def test_stream_writer_deduplicates_across_units(tmp_path):
+    writer = StreamWriter(str(tmp_path / 'stream.csv'), FIELDS)
+    writer.emit([{'pmid': '1', 'title': 'A'}, {'pmid': '2', 'title': 'B'}])
+    assert len(_read_csv(str(tmp_path / 'stream.csv'))) == 2
+    writer.emit([{'pmid': '2', 'title': 'B again'}, {'pmid': '3', 'title': 'C'}])
+    writer.close()
+    assert [r['pmid'] for r in _read_csv(str(tmp_path / 'stream.csv'))] == ['1', '2', '3']
+    with open(str(tmp_path / 'stream.jsonl'), encoding='utf-8') as f:
+        assert sum(1 for _ in f) == 3
@@ -0,0 +1,151 @@
+"""
+按ID批量获取PubMed记录：批次调节与失败时缩小批次
+"""
+
+import io
+import json
+
+import pytest
+import requests
+
+import pubmed_ids
+from pubmed_ids import BatchTuner, PubMedIdResolver
+
+
+def _response(status=200, body=b'{}'):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.url = 'https://example.org/'
+    return response
+
+
+def test_tuner_grows_towards_target_and_shrinks_to_minimum():
+    tuner = BatchTuner(initial=100, minimum=20, maximum=1000, target_seconds=5.0, target_bytes=10 ** 9)
+    tuner.observe(100, 0.1, 1000)
+    assert tuner.size == 200
+    tuner.observe(200, 10.0, 1000)
+    assert tuner.size == 100
+    assert tuner.shrink() and tuner.size == 50
+    assert tuner.shrink() and tuner.size == 25
+    assert tuner.shrink() and tuner.size == 20
+    assert not tuner.shrink()
+
+
+class FakeEutils:
+    """
+    retmax 超过 limit 的 esummary 请求超时
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.sizes = []
+
+    def post(self, url, data=None, **kwargs):
+        self.sizes.append(data['retmax'])
+        if data['retmax'] > self.limit:
+            raise requests.Timeout('too large')
+        uids = [str(i) for i in range(data['retstart'], data['retstart'] + data['retmax'])]
+        return _response(body=json.dumps({'result': {'uids': uids}}).encode())
+
+
+def test_resolver_halves_batch_and_retries_same_position():
+    transport = FakeEutils(limit=60)
+    resolver = PubMedIdResolver(transport, 'https://eutils/', initial_batch=200)
+    pages = list(resolver.summary_pages('WEBENV', '1', 150))
+    uids = [uid for _, data in pages for uid in data['result']['uids']]
+    assert uids == [str(i) for i in range(150)]
+    assert transport.sizes[:3] == [150, 100, 50]
+    assert pages[-1][0] == 150
+
+
+def test_resolver_raises_at_minimum_batch():
+    transport = FakeEutils(limit=5)
+    resolver = PubMedIdResolver(transport, 'https://eutils/', initial_batch=40)
+    with pytest.raises(requests.Timeout):
+        list(resolver.summary_pages('WEBENV', '1', 100))
+    assert transport.sizes == [40, 20]
+
+
+class FakeHistoryServer:
+    """
+    epost 保存ID列表，esummary / efetch 按 WebEnv + retstart / retmax 分页返回
+    """
+
+    def __init__(self):
+        self.sets = {}
+        self.calls = []
+
+    def post(self, url, data=None, stream=False, **kwargs):
+        endpoint = url.rsplit('/', 1)[1].split('.')[0]
+        self.calls.append((endpoint, data))
+        if endpoint == 'epost':
+            webenv = f'W{len(self.sets)}'
+            self.sets[webenv] = data['id'].split(',')
+            return _response(body=f'<ePostResult><QueryKey>1</QueryKey><WebEnv>{webenv}</WebEnv></ePostResult>'.encode())
+        ids = self.sets[data['WebEnv']][data['retstart']:data['retstart'] + data['retmax']]
+        if endpoint == 'esummary':
+            return _response(body=json.dumps({'result': {'uids': ids}}).encode())
+        body = ''.join(f'<PubmedArticle><MedlineCitation><PMID>{pmid}</PMID><Article>'
+                       f'<ArticleTitle>Title {pmid}</ArticleTitle></Article></MedlineCitation></PubmedArticle>'
+                       for pmid in ids)
+        response = _response()
+        response.raw = io.BytesIO(f'<PubmedArticleSet>{body}</PubmedArticleSet>'.encode())
+        return response
+
+
+def test_epost_splits_large_id_lists(monkeypatch):
+    monkeypatch.setattr(pubmed_ids, 'EPOST_MAX', 3)
+    server = FakeHistoryServer()
+    resolver = PubMedIdResolver(server, 'https://eutils/', ncbi_params=lambda p: {**p, 'api_key': 'k'})
+    assert resolver.post([str(i) for i in range(7)]) == [('W0', '1', 3), ('W1', '1', 3), ('W2', '1', 1)]
+    assert all(data['api_key'] == 'k' for _, data in server.calls)
+
+
+def test_summaries_and_articles_cover_every_id(monkeypatch):
+    monkeypatch.setattr(pubmed_ids, 'EPOST_MAX', 4)
+    server = FakeHistoryServer()
+    resolver = PubMedIdResolver(server, 'https://eutils/', initial_batch=3)
+    ids = [str(i) for i in range(10)]
+    pages = list(resolver.summaries(ids))
+    assert [uid for _, data in pages for uid in data['result']['uids']] == ids
+    assert pages[-1][0] == 10
+    articles = [a['pmid'] for _, batch in resolver.articles(ids) for a in batch]
+    assert articles == ids
+
+
+def test_epost_without_webenv_raises():
+    class Broken:
+        def post(self, url, **kwargs):
+            return _response(body=b'<ePostResult><ERROR>Invalid uid</ERROR></ePostResult>')
+
+    with pytest.raises(ValueError, match='Invalid uid'):
+        PubMedIdResolver(Broken(), 'https://eutils/').post(['x'])
+
+
+class FailingEutils:
+    def __init__(self, status):
+        self.status = status
+        self.sizes = []
+
+    def post(self, url, data=None, **kwargs):
+        self.sizes.append(data['retmax'])
+        raise requests.HTTPError(response=_response(self.status))
+
+
+def test_client_errors_fail_without_shrinking():
+    transport = FailingEutils(400)
+    resolver = PubMedIdResolver(transport, 'https://eutils/', initial_batch=200)
+    with pytest.raises(requests.HTTPError):
+        list(resolver.summary_pages('WEBENV', '1', 500))
+    assert transport.sizes == [200]
+    assert resolver.tuner('esummary').size == 200
+
+
+@pytest.mark.parametrize('status', [414, 502])
+def test_oversized_or_server_errors_shrink(status):
+    transport = FailingEutils(status)
+    resolver = PubMedIdResolver(transport, 'https://eutils/', initial_batch=80)
+    with pytest.raises(requests.HTTPError):
+        list(resolver.summary_pages('WEBENV', '1', 500))
+    assert transport.sizes == [80, 40, 20]
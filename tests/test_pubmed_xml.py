@@ -0,0 +1,80 @@
+"""
+PubMed efetch XML 流式解析
+"""
+
+import io
+
+from pubmed_xml import iter_pubmed_articles
+
+ARTICLE = '''
+<PubmedArticle>
+  <MedlineCitation>
+    <PMID>{pmid}</PMID>
+    <Article>
+      <Journal><JournalIssue><PubDate><Year>2025</Year><Month>Mar</Month><Day>7</Day></PubDate></JournalIssue>
+        <Title>Nature Medicine</Title></Journal>
+      <ArticleTitle>Deep learning for <i>ECG</i> screening</ArticleTitle>
+      <ELocationID EIdType="pii">S123</ELocationID>
+      <ELocationID EIdType="doi">10.1038/s41591-025-{pmid}</ELocationID>
+      <Abstract>
+        <AbstractText Label="BACKGROUND">Arrhythmia is common.</AbstractText>
+        <AbstractText Label="RESULTS">AUC   0.93.</AbstractText>
+      </Abstract>
+      <AuthorList>
+        <Author><LastName>Smith</LastName><Initials>J</Initials></Author>
+        <Author><CollectiveName>ECG Consortium</CollectiveName></Author>
+        <Author><LastName>Li</LastName><Initials>X</Initials></Author>
+      </AuthorList>
+    </Article>
+    <MedlineJournalInfo><MedlineTA>Nat Med</MedlineTA></MedlineJournalInfo>
+    <MeshHeadingList>
+      <MeshHeading><DescriptorName>Deep Learning</DescriptorName></MeshHeading>
+      <MeshHeading><DescriptorName>Electrocardiography</DescriptorName></MeshHeading>
+    </MeshHeadingList>
+  </MedlineCitation>
+</PubmedArticle>
+'''
+
+
+def _stream(*pmids, extra=''):
+    body = ''.join(ARTICLE.format(pmid=pmid) for pmid in pmids)
+    return io.BytesIO(f'<?xml version="1.0"?><PubmedArticleSet>{body}{extra}</PubmedArticleSet>'.encode())
+
+
+def test_parses_full_record():
+    [article] = iter_pubmed_articles(_stream('101'))
+    assert article.to_dict() == {
+        'pmid': '101',
+        'title': 'Deep learning for ECG screening',
+        'authors': 'Smith J, ECG Consortium, Li X',
+        'journal': 'Nature Medicine',
+        'pub_date': '2025-03-07',
+        'doi': '10.1038/s41591-025-101',
+        'source': 'Nat Med',
+        'abstract': 'BACKGROUND: Arrhythmia is common. RESULTS: AUC 0.93.',
+        'mesh_terms': 'Deep Learning; Electrocardiography',
+    }
+
+
+def test_author_limit():
+    [article] = iter_pubmed_articles(_stream('101'), author_limit=2)
+    assert article['authors'] == 'Smith J, ECG Consortium'
+
+
+def test_streams_many_articles_and_skips_book_articles():
+    book = '<PubmedBookArticle><BookDocument><PMID>9</PMID></BookDocument></PubmedBookArticle>'
+    articles = iter_pubmed_articles(_stream('1', '2', '3', extra=book))
+    assert next(articles)['pmid'] == '1'
+    assert [a['pmid'] for a in articles] == ['2', '3']
+
+
+def test_medline_date_and_article_id_doi():
+    xml = ARTICLE.format(pmid='5').replace(
+        '<Year>2025</Year><Month>Mar</Month><Day>7</Day>', '<MedlineDate>2025 Winter</MedlineDate>'
+    ).replace('<ELocationID EIdType="doi">10.1038/s41591-025-5</ELocationID>', '').replace(
+        '</MedlineCitation>',
+        '</MedlineCitation><PubmedData><ArticleIdList><ArticleId IdType="doi">10.1/x5</ArticleId>'
+        '</ArticleIdList></PubmedData>')
+    [article] = iter_pubmed_articles(io.BytesIO(f'<PubmedArticleSet>{xml}</PubmedArticleSet>'.encode()))
+    assert article['pub_date'] == '2025 Winter'
+    assert article['doi'] == '10.1/x5'
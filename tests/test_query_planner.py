@@ -0,0 +1,109 @@
+"""
+检索计划的拆分与合并
+"""
+
+import json
+from datetime import date
+
+import requests
+
+from query_planner import EsearchProbe, QueryPlanner, QueryShard, journal_clause, search_window
+
+YEAR_START, YEAR_END = date(2025, 1, 1), date(2025, 12, 31)
+
+
+class FakeProbe:
+    """
+    按每个期刊每天的固定篇数返回结果数
+    """
+
+    def __init__(self, per_day):
+        self.per_day = per_day
+        self.calls = 0
+
+    def __call__(self, journals, mindate, maxdate, datetype='pdat'):
+        self.calls += 1
+        days = (maxdate - mindate).days + 1
+        return QueryShard(journals, mindate, maxdate, datetype,
+                          count=sum(self.per_day.get(journal, 0) for journal in journals) * days)
+
+
+def test_small_union_is_a_single_query():
+    probe = FakeProbe({'Nature': 1, 'Cell': 2})
+    shards = QueryPlanner(probe, cap=2000).plan(['Nature', 'Cell'], YEAR_START, YEAR_END)
+    assert [shard.journals for shard in shards] == [('Nature', 'Cell')]
+    assert probe.calls == 1
+
+
+def test_large_journal_is_split_by_date():
+    probe = FakeProbe({'Nature': 10})
+    shards = QueryPlanner(probe, cap=1000).plan(['Nature'], YEAR_START, YEAR_END)
+    assert all(shard.count <= 1000 for shard in shards)
+    assert sum(shard.count for shard in shards) == 3650
+    assert shards[0].mindate == YEAR_START and shards[-1].maxdate == YEAR_END
+    for left, right in zip(shards, shards[1:]):
+        assert (right.mindate - left.maxdate).days == 1
+
+
+def test_small_journals_are_packed_and_empty_ones_dropped():
+    probe = FakeProbe({'Big': 5, 'A': 1, 'B': 1, 'Empty': 0})
+    shards = QueryPlanner(probe, cap=1000).plan(['Big', 'A', 'B', 'Empty'], YEAR_START, YEAR_END)
+    journals = [shard.journals for shard in shards]
+    assert ('A', 'B') in journals or ('B', 'A') in journals
+    assert not any('Empty' in group for group in journals)
+    assert all(shard.count <= 1000 for shard in shards)
+    assert sum(shard.count for shard in shards) == 7 * 365
+
+
+def test_single_day_over_cap_is_kept():
+    day = date(2025, 3, 1)
+    probe = FakeProbe({'Nature': 5000})
+    shards = QueryPlanner(probe, cap=1000).split(probe(['Nature'], day, day))
+    assert len(shards) == 1 and shards[0].count == 5000
+
+
+def test_max_journals_per_query():
+    journals = [f'J{i}' for i in range(5)]
+    probe = FakeProbe({journal: 1 for journal in journals} | {'Big': 2})
+    shards = QueryPlanner(probe, cap=1000, max_journals=2).plan(journals + ['Big'], YEAR_START, YEAR_END)
+    assert all(len(shard.journals) <= 2 for shard in shards)
+    assert sorted(j for shard in shards for j in shard.journals) == sorted(journals + ['Big'])
+
+
+def test_shard_roundtrip_drops_webenv():
+    shard = QueryShard(['Nature', 'Cell'], YEAR_START, date(2025, 6, 30), 'edat', count=42, webenv='W', query_key='1')
+    restored = QueryShard.from_dict(shard.to_dict())
+    assert restored.key == shard.key and restored.count == 42 and restored.webenv is None
+    assert shard.date_params() == {'datetype': 'edat', 'mindate': '2025/01/01', 'maxdate': '2025/06/30'}
+
+
+class FakeEsearch:
+    def __init__(self):
+        self.params = []
+
+    def get(self, url, params=None, **kwargs):
+        self.params.append((params, kwargs))
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps({'esearchresult': {'count': '17', 'webenv': 'W1', 'querykey': '3'}}).encode()
+        return response
+
+
+def test_esearch_probe_uses_history_and_bypasses_cache():
+    transport = FakeEsearch()
+    probe = EsearchProbe(transport, 'https://eutils/', lambda journals: journal_clause(journals))
+    shard = probe(['Nature', 'Cell'], YEAR_START, YEAR_END)
+    assert (shard.count, shard.webenv, shard.query_key) == (17, 'W1', '3')
+    params, kwargs = transport.params[0]
+    assert params['term'] == '"Nature"[Journal] OR "Cell"[Journal]'
+    assert params['retmax'] == 0 and params['usehistory'] == 'y' and params['mindate'] == '2025/01/01'
+    assert kwargs['use_cache'] is False
+    assert probe.ensure_history(shard) is shard
+    assert probe.ensure_history(QueryShard(['Nature'], YEAR_START, YEAR_END, count=5)).webenv == 'W1'
+    assert probe.requests == 2
+
+
+def test_search_window():
+    assert search_window(2024) == (date(2024, 1, 1), date(2024, 12, 31), 'pdat')
+    mindate, maxdate, datetype = search_window(2024, reldate=7)
+    assert (maxdate - mindate).days == 7 and datetype == 'edat'
@@ -0,0 +1,133 @@
+"""
+HTTP响应磁盘缓存：有效期、条件请求重新验证与游标分页
+"""
+
+import json
+from urllib.parse import urlparse
+
+import requests
+
+from http_transport import HttpTransport
+from journalScraper import JournalScraper
+from metrics import Metrics
+from rate_limiter import HostRateLimiter
+from response_cache import ResponseCache, cache_key, cacheable
+
+URL = 'https://api.example.org/items'
+
+
+def _response(status=200, body=b'{}', headers=None, url=URL):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers.update(headers or {})
+    response.url = url
+    return response
+
+
+class FakeSession:
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+
+    def request(self, method, url, params=None, headers=None, **kwargs):
+        self.requests.append((url, dict(params or {}), dict(headers or {})))
+        return self.handler(url, params or {}, headers or {})
+
+
+def _transport(cache, handler):
+    transport = HttpTransport(rate_limiter=HostRateLimiter(default_rate=1000.0), cache=cache, metrics=Metrics())
+    transport.session = FakeSession(handler)
+    return transport
+
+
+def test_cache_key_ignores_param_order_and_credentials():
+    assert cache_key('GET', URL, {'a': 1, 'b': 2}) == cache_key('get', URL + '?b=2', {'a': 1, 'api_key': 'x'})
+    assert cache_key('GET', URL, {'a': 1}) != cache_key('GET', URL, {'a': 2})
+
+
+def test_cursor_requests_are_never_cacheable():
+    assert not cacheable(URL, {'cursor': '*'})
+    assert not cacheable(URL, {'cursor': 'AoJ4x'})
+    assert not cacheable(URL + '?cursor=AoJ4x')
+    assert cacheable(URL, {'rows': 100, 'cursor': None})
+
+
+def test_fresh_entries_are_served_from_cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'))
+    transport = _transport(cache, lambda url, params, headers: _response(body=b'{"n": 1}'))
+    assert transport.get(URL, params={'q': 'x'}).json() == {'n': 1}
+    cached = transport.get(URL, params={'q': 'x'})
+    assert cached.json() == {'n': 1} and cached.from_cache
+    assert len(transport.session.requests) == 1
+    transport.get(URL, params={'q': 'x'}, use_cache=False)
+    assert len(transport.session.requests) == 2
+
+
+def test_ttl_per_host(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'), ttls={'api.example.org': 0}, default_ttl=60)
+    assert cache.ttl_for(URL) == 0
+    assert cache.ttl_for('https://other.example.org/') == 60
+    assert cache.ttl_for('https://api.crossref.org/works') == 24 * 3600
+    key = cache_key('GET', URL)
+    cache.store(key, _response())
+    assert not cache.get(key).fresh
+
+
+def test_expired_entries_are_revalidated_with_etag(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'), ttls={'api.example.org': 0})
+
+    def handler(url, params, headers):
+        if headers.get('If-None-Match') == '"v1"':
+            return _response(304)
+        return _response(body=b'{"v": 1}', headers={'ETag': '"v1"'})
+
+    transport = _transport(cache, handler)
+    transport.get(URL)
+    revalidated = transport.get(URL)
+    assert revalidated.status_code == 200 and revalidated.json() == {'v': 1}
+    assert transport.session.requests[1][2]['If-None-Match'] == '"v1"'
+
+
+def test_lru_eviction(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'), max_bytes=15)
+    for name in ('a', 'b', 'c'):
+        cache.store(name, _response(body=b'x' * 6))
+    assert cache.get('a') is None
+    assert cache.get('b') is not None and cache.get('c') is not None
+
+
+class CrossrefServer:
+    """
+    模拟Crossref游标分页：每次从 cursor=* 开始都签发新游标，旧游标立即失效
+    """
+
+    def __init__(self, total=5):
+        self.total = total
+        self.generation = 0
+
+    def __call__(self, url, params, headers):
+        cursor, rows = params['cursor'], int(params['rows'])
+        if cursor == '*':
+            self.generation += 1
+            offset = 0
+        else:
+            generation, offset = map(int, cursor.split(':'))
+            if generation != self.generation:
+                return _response(400, json.dumps({'message': 'cursor expired'}).encode(), url=url)
+        items = [{'DOI': f'10.1038/n{i}', 'title': [f'Deep learning study {i}']}
+                 for i in range(offset, min(offset + rows, self.total))]
+        message = {'items': items, 'next-cursor': f'{self.generation}:{offset + len(items)}'}
+        return _response(body=json.dumps({'message': message}).encode(), url=url)
+
+
+def test_cursor_crawl_reruns_against_warm_cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'))
+    scraper = JournalScraper()
+    scraper.transport = _transport(cache, CrossrefServer())
+    for _ in range(2):
+        articles = list(scraper.iter_crossref('Nature', ['deep learning'], 2025, rows=2))
+        assert [a['doi'] for a in articles] == [f'10.1038/n{i}' for i in range(5)]
+    assert all(urlparse(url).netloc == 'api.crossref.org' and 'cursor' in params
+               for url, params, _ in scraper.transport.session.requests)
+    assert len(scraper.transport.session.requests) == 6
@@ -0,0 +1,36 @@
+"""
+Google Scholar（SerpAPI）结果解析
+"""
+
+import json
+
+import requests
+
+from combined_scraper import ScholarPubMedScraper
+
+
+class FakeSerpApi:
+    def __init__(self, results):
+        self.results = results
+        self.params = []
+
+    def get(self, url, params=None, **kwargs):
+        self.params.append(params)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps({'organic_results': self.results}).encode()
+        return response
+
+
+def test_scholar_hits_are_kept_without_local_refiltering():
+    transport = FakeSerpApi([
+        {'title': 'Graph neural networks predict drug toxicity', 'link': 'https://x/1',
+         'snippet': 'We benchmark message passing models.', 'publication_info': {'summary': 'Nature, 2025'}},
+        {'title': 'A deep learning model for retinal images', 'link': 'https://x/2', 'snippet': ''},
+    ])
+    scraper = ScholarPubMedScraper()
+    scraper.transport = transport
+    articles = scraper.search_google_scholar_journal('Nature', 2025, 'key', topic='"deep learning" clinical')
+    assert [a['link'] for a in articles] == ['https://x/1', 'https://x/2']
+    assert articles[0]['journal'] == 'Nature' and articles[0]['data_source'] == 'Google Scholar'
+    assert transport.params[0]['q'] == 'source:"Nature" "deep learning" clinical 2025'
@@ -0,0 +1,56 @@
+"""
+全文检索索引的插入与合并
+"""
+
+import pytest
+
+from search_index import ArticleIndex, fts5_available
+
+pytestmark = pytest.mark.skipif(not fts5_available(), reason='SQLite 未编译 FTS5')
+
+
+def test_copies_from_different_sources_share_one_row(tmp_path):
+    with ArticleIndex(str(tmp_path / 'index.db')) as index:
+        index.add([{'doi': '10.1038/abc', 'title': 'Transformers for pathology', 'journal': 'Nature',
+                    'data_source': 'Crossref'}])
+        index.add([{'pmid': '42', 'doi': '10.1038/ABC', 'title': 'Transformers for pathology',
+                    'abstract': 'Whole slide images', 'data_source': 'PubMed'}])
+        assert index.stats()['total'] == 1
+        [row] = index.search('pathology')
+        assert row['pmid'] == '42' and row['journal'] == 'Nature' and row['data_source'] == 'PubMed'
+        assert index.search('slide')
+
+
+def test_bridging_record_merges_existing_rows(tmp_path):
+    with ArticleIndex(str(tmp_path / 'index.db')) as index:
+        index.add([{'pmid': '1', 'title': 'Graph networks for proteins'},
+                   {'doi': '10.1126/x', 'title': 'Protein graph networks', 'journal': 'Science'}])
+        assert index.stats()['total'] == 2
+        index.add([{'pmid': '1', 'doi': '10.1126/x'}])
+        assert index.stats()['total'] == 1
+        [row] = index.search('proteins OR protein')
+        assert row['pmid'] == '1' and row['doi'] == '10.1126/x' and row['journal'] == 'Science'
+
+
+def test_identifier_table_is_backfilled_for_old_indexes(tmp_path):
+    path = str(tmp_path / 'index.db')
+    with ArticleIndex(path) as index:
+        index.add([{'pmid': '7', 'title': 'Federated learning for hospitals'},
+                   {'doi': '10.1016/y', 'title': 'Federated learning for hospitals', 'journal': 'Cell'}])
+        assert index.stats()['total'] == 1
+        index._conn.execute('DELETE FROM article_ids')
+        index._conn.commit()
+    with ArticleIndex(path) as index:
+        index.add([{'doi': '10.1016/Y', 'abstract': 'Privacy preserving training'}])
+        assert index.stats()['total'] == 1
+        assert index.search('privacy')[0]['pmid'] == '7'
+
+
+def test_search_filters(tmp_path):
+    with ArticleIndex(str(tmp_path / 'index.db')) as index:
+        index.add([{'pmid': '1', 'title': 'Cell atlas with deep learning', 'journal': 'Nature', 'pub_date': '2024-05-01'},
+                   {'pmid': '2', 'title': 'Deep learning for cell segmentation', 'journal': 'Cell', 'pub_date': '2025'}])
+        assert {r['pmid'] for r in index.search('deep learning')} == {'1', '2'}
+        assert [r['pmid'] for r in index.search('deep learning', journal='cell')] == ['2']
+        assert [r['pmid'] for r in index.search('deep learning', year=2024)] == ['1']
+        assert [r['pmid'] for r in index.search('title:segmentation')] == ['2']
@@ -0,0 +1,73 @@
+"""
+工作队列的租用、完成与失败重试
+"""
+
+import time
+
+from search_defaults import CROSSREF_KEYWORDS
+from work_queue import DONE, FAILED, LEASED, PENDING, WorkQueue, build_units
+
+
+def _queue(tmp_path, **kwargs):
+    queue = WorkQueue(str(tmp_path / 'queue.db'), job='test', **kwargs)
+    queue.enqueue([{'unit': 'u1', 'source': 'pubmed', 'params': {'year': 2025}}])
+    return queue
+
+
+def test_enqueue_ignores_existing_units(tmp_path):
+    queue = _queue(tmp_path)
+    assert queue.enqueue([{'unit': 'u1', 'source': 'pubmed', 'params': {}},
+                          {'unit': 'u2', 'source': 'rss', 'params': {}}]) == 1
+
+
+def test_lease_and_complete(tmp_path):
+    queue = _queue(tmp_path)
+    unit = queue.lease('a')
+    assert unit['unit'] == 'u1' and unit['params'] == {'year': 2025} and unit['attempts'] == 1
+    assert queue.lease('b') is None
+    assert queue.stats() == {LEASED: 1}
+    assert queue.complete(unit['id'], 'a')
+    assert queue.stats() == {DONE: 1}
+
+
+def test_complete_requires_current_lease_owner(tmp_path):
+    queue = _queue(tmp_path)
+    stale = queue.lease('a', visibility_timeout=0)
+    time.sleep(0.01)
+    taken = queue.lease('b')
+    assert taken['id'] == stale['id'] and taken['attempts'] == 2
+    assert not queue.complete(stale['id'], 'a')
+    assert not queue.heartbeat(stale['id'], 'a')
+    assert queue.complete(taken['id'], 'b')
+    assert not queue.complete(taken['id'], 'b')
+
+
+def test_fail_backs_off_then_gives_up(tmp_path):
+    queue = _queue(tmp_path, max_attempts=2, retry_delay=0.2)
+    unit = queue.lease('a')
+    queue.fail(unit['id'], 'a', 'boom')
+    assert queue.stats() == {PENDING: 1}
+    assert queue.lease('a') is None
+    time.sleep(0.25)
+    unit = queue.lease('a')
+    assert unit['attempts'] == 2
+    queue.fail(unit['id'], 'b', 'not the owner')
+    assert queue.stats() == {LEASED: 1}
+    queue.fail(unit['id'], 'a', 'boom again')
+    assert queue.failures() == [{'unit': 'u1', 'attempts': 2, 'error': 'boom again'}]
+    assert queue.retry_failed() == 1
+    assert queue.lease('a')['attempts'] == 1
+
+
+def test_expired_leases_fail_after_max_attempts(tmp_path):
+    queue = _queue(tmp_path, max_attempts=1)
+    queue.lease('a', visibility_timeout=0)
+    time.sleep(0.01)
+    assert queue.lease('b') is None
+    assert queue.stats() == {FAILED: 1}
+
+
+def test_build_units_uses_shared_defaults():
+    units = build_units([2025], sources=['crossref'])
+    assert units and all(unit['params']['keywords'] == CROSSREF_KEYWORDS for unit in units)
+    assert len({unit['unit'] for unit in units}) == len(units)
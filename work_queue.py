@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+"""
+多节点分布式爬取
+协调者把爬取任务拆成工作单元（年份 × 期刊系列 × 数据源）写入共享卷上的SQLite队列，
+各节点上的工作进程租用单元执行：
+- 租约带可见性超时，执行期间定期续租；进程崩溃后租约过期，单元由其他工作进程重新执行
+- 执行失败的单元按指数退避延迟后才能再次租用；只有当前租约持有者能标记单元完成
+- 每个单元的结果写入共享目录下的 JSON Lines 文件（先写临时文件再改名），写完才标记完成
+- 所有请求经共享限速器（SharedRateLimiter）排队，整个集群对每个主机不超过其速率上限
+- 全部完成后按单元顺序读取结果，经去重索引合并为最终输出
+
+使用方法:
+  python work_queue.py enqueue --queue /shared/queue.sqlite --years 2024 2025 --sources pubmed crossref rss
+  python work_queue.py worker --queue /shared/queue.sqlite --output-dir /shared/harvest --threads 2
+  python work_queue.py status --queue /shared/queue.sqlite
+  python work_queue.py merge --queue /shared/queue.sqlite --output-dir /shared/harvest --jsonl
+"""
+
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from article import FIELDS, Article
+from combined_scraper import ScholarPubMedScraper
+from dedup_index import DiskDedupIndex
+from http_transport import HttpTransport
+from journalScraper import JournalScraper
+from output_sinks import JsonLinesSink, open_sinks
+from rate_limiter import SharedRateLimiter
+from response_cache import get_response_cache
+from search_defaults import CROSSREF_KEYWORDS, JOURNAL_FAMILIES, SOURCES
+from subscription_scraper import SubscriptionScraper
+
+# 单元状态
+PENDING, LEASED, DONE, FAILED = 'pending', 'leased', 'done', 'failed'
+
+# 各数据源在结果中的 data_source 标签
+SOURCE_LABELS = {'pubmed': 'PubMed', 'crossref': 'Crossref', 'scholar': 'Google Scholar', 'rss': 'RSS'}
+
+DEFAULT_VISIBILITY_TIMEOUT = 600
+DEFAULT_MAX_ATTEMPTS = 5
+
+# 失败单元再次可租用前的等待：retry_delay × 2^(已尝试次数-1)，不超过 retry_delay_max
+DEFAULT_RETRY_DELAY = 30.0
+DEFAULT_RETRY_DELAY_MAX = 600.0
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS units (
+    id INTEGER PRIMARY KEY,
+    job TEXT,
+    unit TEXT,
+    source TEXT,
+    params TEXT,
+    status TEXT,
+    owner TEXT,
+    lease_expires REAL,
+    available_at REAL,
+    attempts INTEGER DEFAULT 0,
+    last_error TEXT,
+    updated_at REAL,
+    UNIQUE (job, unit)
+);
+CREATE INDEX IF NOT EXISTS idx_units_status ON units(job, status);
+'''
+
+
+class WorkQueue:
+    """
+    共享卷上的SQLite工作队列
+    租用在 BEGIN IMMEDIATE 事务中进行，多个进程 / 节点同时租用也不会拿到同一个单元
+    （网络文件系统上WAL不可用，使用默认的回滚日志）
+    """
+
+    def __init__(self, path: str, job: str = 'default', max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 retry_delay: float = DEFAULT_RETRY_DELAY, retry_delay_max: float = DEFAULT_RETRY_DELAY_MAX):
+        self.path = path
+        self.job = job
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.retry_delay_max = retry_delay_max
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        # 旧版本创建的队列文件没有 available_at 列
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(units)')}
+        if 'available_at' not in columns:
+            self._conn.execute('ALTER TABLE units ADD COLUMN available_at REAL')
+        self._lock = threading.Lock()
+
+    def _transaction(self, sql: str, args: Sequence = ()) -> sqlite3.Cursor:
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                cursor = self._conn.execute(sql, args)
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            return cursor
+
+    def enqueue(self, units: Sequence[Dict]) -> int:
+        """
+        加入工作单元（{'unit': 唯一键, 'source': 数据源, 'params': {...}}），已存在的单元忽略
+        返回新加入的数量
+        """
+        now = time.time()
+        rows = [(self.job, u['unit'], u['source'], json.dumps(u['params'], ensure_ascii=False), PENDING, now)
+                for u in units]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.executemany('''
+                    INSERT OR IGNORE INTO units (job, unit, source, params, status, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', rows)
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            return self._conn.total_changes - before
+
+    def lease(self, owner: str, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT) -> Optional[Dict]:
+        """
+        租用一个待执行（或租约已过期）的单元，没有可租用的单元时返回None
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                # 多次租约过期（工作进程反复崩溃）的单元不再重试
+                self._conn.execute('''
+                    UPDATE units SET status = ?, last_error = ?, updated_at = ?
+                    WHERE job = ? AND status = ? AND lease_expires < ? AND attempts >= ?
+                ''', (FAILED, '租约过期', now, self.job, LEASED, now, self.max_attempts))
+                row = self._conn.execute('''
+                    SELECT id, unit, source, params, attempts FROM units
+                    WHERE job = ? AND ((status = ? AND COALESCE(available_at, 0) <= ?)
+                                       OR (status = ? AND lease_expires < ?))
+                    ORDER BY id LIMIT 1
+                ''', (self.job, PENDING, now, LEASED, now)).fetchone()
+                if row is not None:
+                    self._conn.execute('''
+                        UPDATE units SET status = ?, owner = ?, lease_expires = ?, attempts = attempts + 1,
+                            updated_at = ? WHERE id = ?
+                    ''', (LEASED, owner, now + visibility_timeout, now, row[0]))
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+        if row is None:
+            return None
+        return {'id': row[0], 'unit': row[1], 'source': row[2], 'params': json.loads(row[3]),
+                'attempts': row[4] + 1}
+
+    def heartbeat(self, unit_id: int, owner: str, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT) -> bool:
+        """
+        续租；租约已被其他工作进程接手时返回False
+        """
+        cursor = self._transaction('''
+            UPDATE units SET lease_expires = ? WHERE id = ? AND owner = ? AND status = ?
+        ''', (time.time() + visibility_timeout, unit_id, owner, LEASED))
+        return cursor.rowcount > 0
+
+    def complete(self, unit_id: int, owner: str) -> bool:
+        """
+        标记完成；租约已过期并被其他工作进程接手时不做修改，返回False
+        """
+        cursor = self._transaction('''
+            UPDATE units SET status = ?, lease_expires = NULL, last_error = NULL, updated_at = ?
+            WHERE id = ? AND owner = ? AND status = ?
+        ''', (DONE, time.time(), unit_id, owner, LEASED))
+        return cursor.rowcount > 0
+
+    def fail(self, unit_id: int, owner: str, error: str):
+        """
+        执行失败：未达到最大尝试次数时延迟一段时间后放回队列（指数退避），否则标记为失败
+        """
+        now = time.time()
+        self._transaction('''
+            UPDATE units SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END,
+                available_at = ? + MIN(? * (1 << MAX(attempts - 1, 0)), ?),
+                lease_expires = NULL, last_error = ?, updated_at = ?
+            WHERE id = ? AND owner = ? AND status = ?
+        ''', (self.max_attempts, FAILED, PENDING, now, self.retry_delay, self.retry_delay_max,
+              error, now, unit_id, owner, LEASED))
+
+    def retry_failed(self) -> int:
+        """
+        把失败的单元放回队列（尝试次数清零）
+        """
+        return self._transaction('''
+            UPDATE units SET status = ?, attempts = 0, available_at = NULL, updated_at = ? WHERE job = ? AND status = ?
+        ''', (PENDING, time.time(), self.job, FAILED)).rowcount
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute('SELECT status, COUNT(*) FROM units WHERE job = ? GROUP BY status',
+                                      (self.job,)).fetchall()
+        return dict(rows)
+
+    def failures(self) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute('''
+                SELECT unit, attempts, last_error FROM units WHERE job = ? AND status = ? ORDER BY id
+            ''', (self.job, FAILED)).fetchall()
+        return [{'unit': unit, 'attempts': attempts, 'error': error} for unit, attempts, error in rows]
+
+    def done_units(self) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute('SELECT id, unit, source FROM units WHERE job = ? AND status = ? ORDER BY id',
+                                      (self.job, DONE)).fetchall()
+        return [{'id': row[0], 'unit': row[1], 'source': row[2]} for row in rows]
+
+    def close(self):
+        self._conn.close()
+
+
+def build_units(years: Sequence[int], sources: Sequence[str] = SOURCES,
+                families: Optional[Dict[str, List[str]]] = None, keywords: Optional[List[str]] = None,
+                reldate: Optional[int] = None) -> List[Dict]:
+    """
+    生成工作单元：
+    - pubmed: 每个年份 × 期刊系列一个单元（系列内按检索计划合并或拆分检索式）
+    - crossref / scholar: 每个年份 × 期刊一个单元
+    - rss: 每个订阅源一个单元（RSS只有最新文章，与年份无关）
+    """
+    families = families or JOURNAL_FAMILIES
+    keywords = keywords or CROSSREF_KEYWORDS
+    units = []
+    for year in years:
+        for family, journals in families.items():
+            if 'pubmed' in sources:
+                units.append({'unit': f'pubmed:{year}:{reldate or 0}:{family}', 'source': 'pubmed',
+                              'params': {'year': year, 'reldate': reldate, 'journals': journals}})
+            for source in ('crossref', 'scholar'):
+                if source not in sources:
+                    continue
+                for journal in journals:
+                    params = {'year': year, 'journal': journal}
+                    if source == 'crossref':
+                        params['keywords'] = keywords
+                    units.append({'unit': f'{source}:{year}:{journal}', 'source': source, 'params': params})
+    if 'rss' in sources:
+        for family, feeds in (('nature', SubscriptionScraper.NATURE_FEEDS),
+                              ('science', SubscriptionScraper.SCIENCE_FEEDS)):
+            for journal, url in feeds.items():
+                units.append({'unit': f'rss:{journal}', 'source': 'rss',
+                              'params': {'journal': journal, 'url': url, 'family': family}})
+    return units
+
+
+class Worker:
+    """
+    工作进程：循环租用单元、执行、写出结果并标记完成
+    threads > 1 时同一进程内多个线程各自租用，共用连接池、响应缓存和共享限速器
+    """
+
+    def __init__(self, queue: WorkQueue, output_dir: str, worker_id: Optional[str] = None,
+                 visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT, poll_interval: float = 5.0,
+                 serpapi_key: Optional[str] = None, transport: Optional[HttpTransport] = None):
+        self.queue = queue
+        self.output_dir = output_dir
+        self.worker_id = worker_id or f'{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}'
+        self.visibility_timeout = visibility_timeout
+        self.poll_interval = poll_interval
+        self.serpapi_key = serpapi_key or os.environ.get('SERPAPI_KEY')
+        self.ncbi_api_key = os.environ.get('NCBI_API_KEY')
+        if transport is None:
+            limiter = SharedRateLimiter(queue.path, ncbi_api_key=self.ncbi_api_key)
+            transport = HttpTransport(rate_limiter=limiter, cache=get_response_cache())
+        self.transport = transport
+        self.completed = 0
+        self.failed = 0
+        self._counts_lock = threading.Lock()
+        os.makedirs(parts_dir(output_dir), exist_ok=True)
+
+    def _attach(self, scraper):
+        scraper.transport = self.transport
+        scraper.rate_limiter = self.transport.rate_limiter
+        return scraper
+
+    def scrapers(self) -> Dict:
+        """
+        每个线程使用独立的爬虫实例（各自的错误计数），传输层共享
+        """
+        return {
+            'journal': self._attach(JournalScraper(self.ncbi_api_key)),
+            'combined': self._attach(ScholarPubMedScraper(self.ncbi_api_key)),
+            'subscription': self._attach(SubscriptionScraper(self.ncbi_api_key)),
+        }
+
+    def execute(self, unit: Dict, scrapers: Dict) -> List[Dict]:
+        """
+        执行一个单元；请求失败（异常或爬虫错误计数增加）时抛出异常，由调用者放回队列
+        """
+        params = unit['params']
+        source = unit['source']
+        errors_before = sum(s.errors for s in scrapers.values())
+
+        if source == 'pubmed':
+            journal = scrapers['journal']
+            probe = journal.pubmed_probe(params['year'])
+            articles = []
+            for shard in journal.plan_pubmed(params['journals'], params['year'], params.get('reldate'), probe):
+                articles.extend(journal.search_pubmed_shard(shard, probe))
+        elif source == 'crossref':
+            articles = scrapers['journal'].search_crossref(params['journal'], params['keywords'], params['year'])
+        elif source == 'scholar':
+            if not self.serpapi_key:
+                raise RuntimeError('未设置 SERPAPI_KEY')
+            articles = scrapers['combined'].search_google_scholar_journal(params['journal'], params['year'],
+                                                                         self.serpapi_key)
+        elif source == 'rss':
+            subscription = scrapers['subscription']
+            scrape = subscription.scrape_nature_rss if params['family'] == 'nature' else subscription.scrape_science_rss
+            articles = scrape(params['journal'], params['url'])
+        else:
+            raise ValueError(f'未知的数据源: {source}')
+
+        if sum(s.errors for s in scrapers.values()) > errors_before:
+            raise RuntimeError('部分请求失败')
+        return articles
+
+    def _write_part(self, unit: Dict, articles: List[Dict]):
+        """
+        结果先写临时文件再改名：文件存在即内容完整，重复执行的单元覆盖同一个文件
+        """
+        path = part_path(self.output_dir, unit['id'])
+        tmp = f'{path}.{self.worker_id}.tmp'
+        with JsonLinesSink(tmp, batch_size=1000) as sink:
+            for article in articles:
+                record = article.to_dict() if isinstance(article, Article) else dict(article)
+                record.setdefault('data_source', SOURCE_LABELS[unit['source']])
+                sink.write(record)
+        os.replace(tmp, path)
+
+    def _heartbeat(self, unit: Dict, stop: threading.Event):
+        while not stop.wait(self.visibility_timeout / 3):
+            if not self.queue.heartbeat(unit['id'], self.worker_id, self.visibility_timeout):
+                print(f"⚠️  {unit['unit']} 的租约已被其他工作进程接手")
+                return
+
+    def run_once(self, scrapers: Dict) -> bool:
+        """
+        租用并执行一个单元，没有可租用的单元时返回False
+        """
+        unit = self.queue.lease(self.worker_id, self.visibility_timeout)
+        if unit is None:
+            return False
+        print(f"▶ [{self.worker_id}] {unit['unit']}（第 {unit['attempts']} 次）")
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(unit, stop), daemon=True)
+        heartbeat.start()
+        try:
+            articles = self.execute(unit, scrapers)
+            self._write_part(unit, articles)
+            self.transport.metrics.record_articles(SOURCE_LABELS[unit['source']], articles)
+        except Exception as e:
+            self.queue.fail(unit['id'], self.worker_id, f'{e.__class__.__name__}: {e}')
+            print(f"✗ {unit['unit']} 失败: {e}")
+            with self._counts_lock:
+                self.failed += 1
+        else:
+            if not self.queue.complete(unit['id'], self.worker_id):
+                print(f"⚠️  {unit['unit']} 的租约已过期并被其他工作进程接手，由接手者标记完成")
+            else:
+                print(f"✓ {unit['unit']}: {len(articles)} 篇")
+                with self._counts_lock:
+                    self.completed += 1
+        finally:
+            stop.set()
+            heartbeat.join()
+        return True
+
+    def _loop(self):
+        scrapers = self.scrapers()
+        while True:
+            if self.run_once(scrapers):
+                continue
+            # 没有可租用的单元；仍有其他进程持有租约（其租约可能过期）或失败单元在等待重试时继续等待
+            stats = self.queue.stats()
+            if not stats.get(LEASED) and not stats.get(PENDING):
+                return
+            time.sleep(self.poll_interval)
+
+    def run(self, threads: int = 1):
+        """
+        持续执行直到队列中没有待执行和执行中的单元
+        """
+        print(f"工作进程 {self.worker_id} 启动（{threads} 个线程）")
+        workers = [threading.Thread(target=self._loop, name=f'worker-{i}') for i in range(max(1, threads))]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        print(f"工作进程 {self.worker_id} 结束: 完成 {self.completed} 个单元，失败 {self.failed} 次")
+
+
+def parts_dir(output_dir: str) -> str:
+    return os.path.join(output_dir, 'parts')
+
+
+def part_path(output_dir: str, unit_id: int) -> str:
+    return os.path.join(parts_dir(output_dir), f'unit-{unit_id:06d}.jsonl')
+
+
+def iter_part(path: str) -> Iterator[Dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def merge_parts(queue: WorkQueue, output_dir: str, output_file: str = 'distributed_results.csv',
+                formats=('csv', 'json'), dedup_path: str = None) -> int:
+    """
+    按单元加入队列的顺序读取已完成单元的结果，流式去重后写出最终结果
+    返回写出的记录数
+    """
+    stats = queue.stats()
+    if stats.get(PENDING) or stats.get(LEASED):
+        print(f"⚠️  仍有 {stats.get(PENDING, 0)} 个待执行、{stats.get(LEASED, 0)} 个执行中的单元，只合并已完成部分")
+    if stats.get(FAILED):
+        print(f"⚠️  {stats[FAILED]} 个单元失败，结果中不包含")
+
+    index = DiskDedupIndex(dedup_path)
+    counts: Dict[str, int] = {}
+    duplicates = 0
+    try:
+        with open_sinks(os.path.join(output_dir, output_file), FIELDS, formats, encoding='utf-8-sig',
+                        batch_size=1000) as sink:
+            for unit in queue.done_units():
+                path = part_path(output_dir, unit['id'])
+                if not os.path.exists(path):
+                    print(f"⚠️  缺少 {unit['unit']} 的结果文件")
+                    continue
+                for record in iter_part(path):
+                    label = SOURCE_LABELS[unit['source']]
+                    counts[label] = counts.get(label, 0) + 1
+                    if not index.add(record):
+                        duplicates += 1
+                        continue
+                    sink.write(record)
+    finally:
+        index.close()
+
+    print(f"\n合并统计:")
+    for source, count in counts.items():
+        print(f"  {source}记录: {count}")
+    print(f"  重复记录: {duplicates}")
+    print(f"  合并后: {sink.count}")
+    print()
+    for path in sink.paths:
+        print(f"✓ 结果已保存: {path}")
+    return sink.count
+
+
+def print_status(queue: WorkQueue):
+    stats = queue.stats()
+    total = sum(stats.values())
+    print(f"任务 {queue.job}: 共 {total} 个单元")
+    for status in (PENDING, LEASED, DONE, FAILED):
+        print(f"  {status:<8}{stats.get(status, 0):>6}")
+    for failure in queue.failures():
+        print(f"  ✗ {failure['unit']}（{failure['attempts']} 次）: {failure['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='多节点分布式爬取')
+    parser.add_argument('command', choices=['enqueue', 'worker', 'status', 'merge', 'retry'])
+    parser.add_argument('--queue', required=True, help='共享卷上的队列文件（SQLite）')
+    parser.add_argument('--job', default='default', help='任务名（同一队列文件可容纳多个任务）')
+    parser.add_argument('--years', type=int, nargs='+', default=[2025])
+    parser.add_argument('--sources', nargs='+', choices=SOURCES, default=['pubmed', 'crossref', 'rss'])
+    parser.add_argument('--reldate', type=int, default=None, help='PubMed只检索最近N天收录的记录')
+    parser.add_argument('--output-dir', default='/mnt/user-data/outputs/distributed', help='共享输出目录')
+    parser.add_argument('--threads', type=int, default=1, help='每个工作进程的线程数')
+    parser.add_argument('--visibility-timeout', type=float, default=DEFAULT_VISIBILITY_TIMEOUT,
+                        help='租约时长（秒），超时未续租的单元由其他工作进程重新执行')
+    parser.add_argument('--worker-id', default=None)
+    parser.add_argument('--output', default='distributed_results.csv', help='合并结果文件名')
+    parser.add_argument('--jsonl', action='store_true', help='合并时同时输出 JSON Lines')
+    parser.add_argument('--parquet', action='store_true', help='合并时同时输出 Parquet（需 pyarrow）')
+    args = parser.parse_args()
+
+    queue = WorkQueue(args.queue, args.job)
+    try:
+        if args.command == 'enqueue':
+            units = build_units(args.years, args.sources, reldate=args.reldate)
+            added = queue.enqueue(units)
+            print(f"✓ 加入 {added} 个工作单元（{len(units) - added} 个已存在）")
+        elif args.command == 'worker':
+            Worker(queue, args.output_dir, args.worker_id, args.visibility_timeout).run(args.threads)
+        elif args.command == 'status':
+            print_status(queue)
+        elif args.command == 'merge':
+            formats = ['csv', 'json'] + (['jsonl'] if args.jsonl else []) + (['parquet'] if args.parquet else [])
+            merge_parts(queue, args.output_dir, args.output, formats)
+        elif args.command == 'retry':
+            print(f"✓ {queue.retry_failed()} 个失败单元已放回队列")
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()